@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script to add lookup indexes for QR check-in, attendance cooldown checks and analytics date ranges
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+# (table, index name, definition)
+ATTENDANCE_INDEXES = [
+    ("attendance_logs", "ix_attendance_emp_ts", "attendance_logs (employee_id, timestamp DESC)"),
+    ("attendance_logs", "ix_attendance_ts_emp", "attendance_logs (timestamp, employee_id)"),
+    ("employees", "ix_employees_qr_code_token", "employees (qr_code_token)"),
+]
+
+def add_attendance_indexes():
+    print("=== Adding Attendance Lookup Indexes ===\n")
+
+    db = next(get_db())
+
+    try:
+        inspector = inspect(db.bind)
+
+        for table, name, definition in ATTENDANCE_INDEXES:
+            existing = {idx['name'] for idx in inspector.get_indexes(table)}
+            unique_columns = [
+                tuple(constraint['column_names']) for constraint in inspector.get_unique_constraints(table)
+            ]
+
+            if name in existing:
+                print(f"✅ Index '{name}' already exists")
+                continue
+
+            # UNIQUE constraints (e.g. qr_code_token) are already backed by an index
+            if name == "ix_employees_qr_code_token" and ("qr_code_token",) in unique_columns:
+                print(f"✅ qr_code_token is UNIQUE (already indexed), skipping '{name}'")
+                continue
+
+            print(f"📝 Creating index '{name}'...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition};"))
+
+        db.commit()
+
+        print("✅ Attendance lookup indexes are in place")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_attendance_indexes()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the indexes used by event listings and event stats
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+EVENT_INDEXES = {
+    "ix_events_active_date": "events (is_active, event_date)",
+    "ix_events_active_status_date": "events (is_active, status, event_date)",
+}
+
+def add_event_indexes():
+    print("=== Adding Event Indexes ===\n")
+
+    db = next(get_db())
+
+    try:
+        inspector = inspect(db.bind)
+        existing = {idx['name'] for idx in inspector.get_indexes('events')}
+
+        for name, definition in EVENT_INDEXES.items():
+            if name in existing:
+                print(f"✅ Index '{name}' already exists")
+                continue
+
+            print(f"📝 Creating index '{name}'...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition};"))
+
+        db.commit()
+
+        print("✅ Event indexes are in place")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_event_indexes()
+    sys.exit(0 if success else 1)
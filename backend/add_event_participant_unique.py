@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migration script to add a unique constraint on event_participants (event_id, employee_id)
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+def add_event_participant_unique():
+    print("=== Adding Unique Constraint on Event Participants ===\n")
+
+    db = next(get_db())
+
+    try:
+        inspector = inspect(db.bind)
+        constraints = [c['name'] for c in inspector.get_unique_constraints('event_participants')]
+
+        if 'uq_event_participant' in constraints:
+            print("✅ Constraint 'uq_event_participant' already exists")
+            print("   No migration needed.")
+            return True
+
+        # Remove duplicate participants, keeping the earliest row for each (event, employee)
+        print("🧹 Removing duplicate participants...")
+        result = db.execute(text("""
+            DELETE FROM event_participants
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY event_id, employee_id
+                        ORDER BY created_at, id
+                    ) AS row_num
+                    FROM event_participants
+                ) ranked
+                WHERE ranked.row_num > 1
+            );
+        """))
+        print(f"   Removed {result.rowcount} duplicate(s)")
+
+        print("📝 Adding constraint 'uq_event_participant'...")
+        db.execute(text("""
+            ALTER TABLE event_participants
+            ADD CONSTRAINT uq_event_participant UNIQUE (event_id, employee_id);
+        """))
+        db.commit()
+
+        print("✅ Successfully added 'uq_event_participant'")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_event_participant_unique()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to add a partial unique index on open invitations (email, event_id)
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+INDEX_NAME = "uq_invitation_open_email_event"
+
+def add_invitation_open_unique():
+    print("=== Adding Unique Index on Open Invitations ===\n")
+
+    db = next(get_db())
+
+    try:
+        inspector = inspect(db.bind)
+        indexes = [idx['name'] for idx in inspector.get_indexes('invitations')]
+
+        if INDEX_NAME in indexes:
+            print(f"✅ Index '{INDEX_NAME}' already exists")
+            print("   No migration needed.")
+            return True
+
+        # Remove duplicate open invitations, keeping the latest-expiring one per (email, event)
+        print("🧹 Removing duplicate open invitations...")
+        result = db.execute(text("""
+            DELETE FROM invitations
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY email, event_id
+                        ORDER BY expires_at DESC, created_at DESC, id
+                    ) AS row_num
+                    FROM invitations
+                    WHERE is_used = false AND event_id IS NOT NULL
+                ) ranked
+                WHERE ranked.row_num > 1
+            );
+        """))
+        print(f"   Removed {result.rowcount} duplicate(s)")
+
+        print(f"📝 Creating index '{INDEX_NAME}'...")
+        db.execute(text(f"""
+            CREATE UNIQUE INDEX {INDEX_NAME}
+            ON invitations (email, event_id)
+            WHERE is_used = false;
+        """))
+        db.commit()
+
+        print(f"✅ Successfully added '{INDEX_NAME}'")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_invitation_open_unique()
+    sys.exit(0 if success else 1)
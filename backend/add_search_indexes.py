@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Migration script to add search and lookup indexes on employees (PostgreSQL)
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+SEARCH_INDEXES = {
+    "idx_employees_name_trgm": "employees USING gin (name gin_trgm_ops)",
+    "idx_employees_employee_id_trgm": "employees USING gin (employee_id gin_trgm_ops)",
+    "ix_employees_email": "employees (email)",
+}
+
+def add_search_indexes():
+    print("=== Adding Employee Search Indexes ===\n")
+
+    db = next(get_db())
+
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("⚠️ Trigram indexes require PostgreSQL. Skipping.")
+            return True
+
+        inspector = inspect(db.bind)
+        existing = {idx['name'] for idx in inspector.get_indexes('employees')}
+
+        print("📝 Enabling pg_trgm extension...")
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+
+        for name, definition in SEARCH_INDEXES.items():
+            if name in existing:
+                print(f"✅ Index '{name}' already exists")
+                continue
+
+            print(f"📝 Creating index '{name}'...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition};"))
+
+        db.commit()
+
+        print("✅ Search indexes are in place")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_search_indexes()
+    sys.exit(0 if success else 1)
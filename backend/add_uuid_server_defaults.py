@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Migration script to let PostgreSQL generate attendance log and event participant ids
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+# UUID primary keys filled in by gen_random_uuid() (built in since PostgreSQL 13)
+UUID_DEFAULT_COLUMNS = [
+    ("attendance_logs", "id"),
+    ("event_participants", "id"),
+]
+
+def add_uuid_server_defaults():
+    print("=== Adding gen_random_uuid() Defaults ===\n")
+
+    db = next(get_db())
+
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("⚠️ gen_random_uuid() defaults require PostgreSQL. Skipping.")
+            return True
+
+        inspector = inspect(db.bind)
+
+        for table, column in UUID_DEFAULT_COLUMNS:
+            columns = {col['name']: col for col in inspector.get_columns(table)}
+
+            if column not in columns:
+                print(f"⚠️ Column '{table}.{column}' not found, skipping")
+                continue
+
+            if columns[column].get('default'):
+                print(f"✅ '{table}.{column}' already has a default")
+                continue
+
+            print(f"📝 Setting default on '{table}.{column}'...")
+            db.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT gen_random_uuid();"
+            ))
+
+        db.commit()
+
+        print("✅ UUID defaults are in place")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("   Run migrate_ids_to_uuid.py first so the columns are native UUID.")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = add_uuid_server_defaults()
+    sys.exit(0 if success else 1)
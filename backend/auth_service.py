@@ -2,12 +2,12 @@
 Authentication Service
 Handles password hashing, JWT token creation and verification
 """
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from zoneinfo import ZoneInfo
 from config import settings
+from database import get_ph_time
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,6 +17,13 @@ SECRET_KEY = settings.JWT_SECRET_KEY if hasattr(settings, 'JWT_SECRET_KEY') else
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Role hierarchy: admin > manager > viewer (unknown roles get level 0)
+ROLE_LEVELS = {
+    'admin': 3,
+    'manager': 2,
+    'viewer': 1
+}
+
 class AuthService:
     """Authentication service for user management"""
 
@@ -39,10 +46,7 @@ class AuthService:
         """Create JWT access token"""
         to_encode = data.copy()
 
-        if expires_delta:
-            expire = datetime.now(ZoneInfo(settings.TIMEZONE)) + expires_delta
-        else:
-            expire = datetime.now(ZoneInfo(settings.TIMEZONE)) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = get_ph_time() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -63,13 +67,7 @@ class AuthService:
         Check if user role has required permission
         Role hierarchy: admin > manager > viewer
         """
-        roles_hierarchy = {
-            'admin': 3,
-            'manager': 2,
-            'viewer': 1
-        }
-
-        user_level = roles_hierarchy.get(user_role.lower(), 0)
-        required_level = roles_hierarchy.get(required_role.lower(), 0)
+        user_level = ROLE_LEVELS.get(user_role.lower(), 0)
+        required_level = ROLE_LEVELS.get(required_role.lower(), 0)
 
         return user_level >= required_level
@@ -2,17 +2,23 @@
 Camera Monitoring Service
 Automatically monitors Dahua cameras for face detection events and logs attendance
 """
+import logging
 import threading
 import time
 from typing import Dict, Optional
 from datetime import datetime
 from dahua_face_service import DahuaFaceService
-from database import get_db, Camera, Employee, AttendanceLog, Event
+from database import get_db, with_row_ids, Camera, Employee, AttendanceLog, Event
+from face_processor import unpack_embeddings
+from response_cache import analytics_cache
 import face_recognition as fr
 import numpy as np
 import cv2
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
 
 class CameraMonitor:
     """Monitors a single camera for face detection and logs attendance"""
@@ -31,7 +37,7 @@ class CameraMonitor:
         try:
             # Initialize Dahua service for this camera
             if self.camera.camera_type != 'rtsp':
-                print(f"⚠️ Camera {self.camera.name} is not RTSP type, skipping")
+                logger.warning("⚠️ Camera %s is not RTSP type, skipping", self.camera.name)
                 return False
 
             # Extract credentials and IP from RTSP URL
@@ -46,19 +52,19 @@ class CameraMonitor:
                 username = unquote(creds_match.group(1))
                 password = unquote(creds_match.group(2))
                 ip = creds_match.group(3)
-                print(f"🔑 Extracted credentials from URL: {username}/***")
+                logger.debug("🔑 Extracted credentials from URL: %s/***", username)
             else:
                 # Fallback: try to extract just IP
                 ip_match = re.search(r'@([0-9.]+):', self.camera.stream_url)
                 if not ip_match:
-                    print(f"❌ Could not extract IP from {self.camera.stream_url}")
+                    logger.error("❌ Could not extract IP from %s", self.camera.stream_url)
                     return False
                 ip = ip_match.group(1)
                 username = self.camera.username or 'admin'
                 password = self.camera.password or 'admin'
-                print(f"🔑 Using credentials: {username}/***")
+                logger.debug("🔑 Using credentials: %s/***", username)
 
-            print(f"🎥 Starting monitor for camera: {self.camera.name} ({ip})")
+            logger.info("🎥 Starting monitor for camera: %s (%s)", self.camera.name, ip)
 
             # Initialize Dahua service
             self.dahua_service = DahuaFaceService(ip, username, password)
@@ -66,7 +72,7 @@ class CameraMonitor:
             # Test connection
             caps = self.dahua_service.get_capabilities()
             if not caps.get('face_analysis_enabled'):
-                print(f"⚠️ Face analysis not enabled on {self.camera.name}, enabling...")
+                logger.warning("⚠️ Face analysis not enabled on %s, enabling...", self.camera.name)
                 self.dahua_service.enable_face_analysis()
 
             # Load known faces from database
@@ -76,11 +82,11 @@ class CameraMonitor:
             self.dahua_service.subscribe_to_face_events(self._on_face_detected)
 
             self.is_running = True
-            print(f"✅ Camera monitor started: {self.camera.name}")
+            logger.info("✅ Camera monitor started: %s", self.camera.name)
             return True
 
         except Exception as e:
-            print(f"❌ Error starting camera monitor for {self.camera.name}: {e}")
+            logger.exception("❌ Error starting camera monitor for %s: %s", self.camera.name, e)
             return False
 
     def stop(self):
@@ -88,7 +94,7 @@ class CameraMonitor:
         self.is_running = False
         if self.dahua_service:
             self.dahua_service.stop_event_listener()
-        print(f"🛑 Camera monitor stopped: {self.camera.name}")
+        logger.info("🛑 Camera monitor stopped: %s", self.camera.name)
 
     def _load_known_faces(self):
         """Load all employee face encodings from database"""
@@ -99,92 +105,81 @@ class CameraMonitor:
             self.known_faces = {}
             for emp in employees:
                 try:
-                    # Embeddings are stored as JSON list, convert to numpy array
-                    if isinstance(emp.embeddings, list):
-                        encoding = np.array(emp.embeddings, dtype=np.float64)
-                    else:
-                        # Fallback for binary format
-                        encoding = np.frombuffer(emp.embeddings, dtype=np.float64)
-
-                    if encoding.shape[0] == 128:
-                        self.known_faces[emp.employee_id] = encoding
+                    # Embeddings are stored as packed float16 bytes, use the first face
+                    encoding = unpack_embeddings(emp.embeddings)[0].astype(np.float64)
+                    self.known_faces[emp.employee_id] = encoding
                 except Exception as e:
-                    print(f"⚠️ Could not load face encoding for {emp.employee_id}: {e}")
+                    logger.warning("⚠️ Could not load face encoding for %s: %s", emp.employee_id, e)
 
             db.close()
-            print(f"📋 Loaded {len(self.known_faces)} known faces for {self.camera.name}")
+            logger.info("📋 Loaded %d known faces for %s", len(self.known_faces), self.camera.name)
 
         except Exception as e:
-            print(f"❌ Error loading known faces: {e}")
+            logger.exception("❌ Error loading known faces: %s", e)
 
     def _on_face_detected(self, event: Dict):
         """Callback when camera detects a face"""
         try:
-            print(f"\n{'='*60}")
-            print(f"🎯 FACE DETECTED by {self.camera.name}!")
-            print(f"{'='*60}")
-            print(f"   Event Code: {event.get('Code', 'Unknown')}")
-            print(f"   Event Data: {event}")
+            logger.info("🎯 FACE DETECTED by %s! (event code: %s)", self.camera.name, event.get('Code', 'Unknown'))
+            logger.debug("   Event Data: %s", event)
 
             # Get snapshot from camera
-            print(f"📸 Requesting snapshot from camera...")
+            logger.debug("📸 Requesting snapshot from camera...")
             snapshot = self.dahua_service.get_snapshot()
             if not snapshot:
-                print("❌ Failed to get snapshot from camera")
+                logger.error("❌ Failed to get snapshot from camera")
                 return
 
-            print(f"   ✅ Snapshot received ({len(snapshot)} bytes)")
+            logger.debug("   ✅ Snapshot received (%d bytes)", len(snapshot))
 
             # Save snapshot for debugging
             timestamp = int(time.time())
             snapshot_path = f"/tmp/face_detection_{self.camera.id}_{timestamp}.jpg"
             with open(snapshot_path, 'wb') as f:
                 f.write(snapshot)
-            print(f"   📁 Snapshot saved: {snapshot_path}")
+            logger.debug("   📁 Snapshot saved: %s", snapshot_path)
 
             # Perform face recognition
-            print(f"🔍 Starting face recognition...")
+            logger.debug("🔍 Starting face recognition...")
             self._recognize_and_log_attendance(snapshot, timestamp)
 
         except Exception as e:
-            print(f"❌ Error processing face detection event: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error processing face detection event: %s", e)
 
     def _recognize_and_log_attendance(self, image_bytes: bytes, timestamp: int):
         """Perform face recognition and log attendance"""
         try:
-            print(f"   Step 1: Decoding image...")
+            logger.debug("   Step 1: Decoding image...")
             # Decode image
             nparr = np.frombuffer(image_bytes, np.uint8)
             image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             if image is None:
-                print("   ❌ Failed to decode image")
+                logger.warning("   ❌ Failed to decode image")
                 return
 
-            print(f"   ✅ Image decoded: {image.shape}")
+            logger.debug("   ✅ Image decoded: %s", image.shape)
 
             # Convert to RGB for face_recognition
-            print(f"   Step 2: Converting to RGB...")
+            logger.debug("   Step 2: Converting to RGB...")
             rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
             # Detect faces in image
-            print(f"   Step 3: Detecting faces in image...")
+            logger.debug("   Step 3: Detecting faces in image...")
             face_locations = fr.face_locations(rgb_image, model='hog')
-            print(f"   ✅ Found {len(face_locations)} face location(s)")
+            logger.debug("   ✅ Found %d face location(s)", len(face_locations))
 
-            print(f"   Step 4: Extracting face encodings...")
+            logger.debug("   Step 4: Extracting face encodings...")
             face_encodings = fr.face_encodings(rgb_image, face_locations)
-            print(f"   ✅ Extracted {len(face_encodings)} face encoding(s)")
+            logger.debug("   ✅ Extracted %d face encoding(s)", len(face_encodings))
 
             if len(face_encodings) == 0:
-                print("   ⚠️ No face encodings could be extracted")
+                logger.debug("   ⚠️ No face encodings could be extracted")
                 return
 
             # Try to match each detected face
-            print(f"   Step 5: Matching against {len(self.known_faces)} known faces...")
+            logger.debug("   Step 5: Matching against %d known faces...", len(self.known_faces))
             for idx, face_encoding in enumerate(face_encodings):
-                print(f"   \n   Face #{idx + 1}:")
+                logger.debug("   Face #%d:", idx + 1)
                 employee_id = self._match_face(face_encoding)
 
                 if employee_id:
@@ -193,35 +188,31 @@ class CameraMonitor:
                     time_since_last = time.time() - last_time
 
                     if time_since_last < self.recognition_cooldown:
-                        print(f"      ⏱️ Skipping {employee_id} (cooldown: {int(self.recognition_cooldown - time_since_last)}s remaining)")
+                        logger.debug("      ⏱️ Skipping %s (cooldown: %ds remaining)", employee_id, self.recognition_cooldown - time_since_last)
                         continue
 
                     # Log attendance
-                    print(f"      ✅ Proceeding to log attendance...")
+                    logger.debug("      ✅ Proceeding to log attendance...")
                     self._log_attendance(employee_id, timestamp, image_bytes)
                     self.last_recognition[employee_id] = time.time()
 
                 else:
-                    print("      ❓ Unknown person - no match found")
-
-            print(f"{'='*60}\n")
+                    logger.info("      ❓ Unknown person - no match found")
 
         except Exception as e:
-            print(f"   ❌ Error in face recognition: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("   ❌ Error in face recognition: %s", e)
 
     def _match_face(self, face_encoding: np.ndarray) -> Optional[str]:
         """Match a face encoding against known faces"""
         if not self.known_faces:
-            print(f"      ⚠️ No known faces loaded to match against")
+            logger.warning("      ⚠️ No known faces loaded to match against")
             return None
 
         try:
             known_encodings = list(self.known_faces.values())
             known_ids = list(self.known_faces.keys())
 
-            print(f"      Comparing against {len(known_ids)} employees...")
+            logger.debug("      Comparing against %d employees...", len(known_ids))
 
             # Compare with known faces
             matches = fr.compare_faces(known_encodings, face_encoding, tolerance=0.6)
@@ -230,28 +221,26 @@ class CameraMonitor:
             # Show top 3 matches for debugging
             if len(face_distances) > 0:
                 sorted_indices = np.argsort(face_distances)
-                print(f"      Top matches:")
-                for i in range(min(3, len(sorted_indices))):
-                    idx = sorted_indices[i]
-                    distance = face_distances[idx]
-                    confidence = 1 - distance
-                    match_status = "✅ MATCH" if matches[idx] else "❌ No match"
-                    print(f"        {i+1}. {known_ids[idx]}: {confidence:.2%} ({match_status}, distance: {distance:.3f})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("      Top matches:")
+                    for i in range(min(3, len(sorted_indices))):
+                        idx = sorted_indices[i]
+                        distance = face_distances[idx]
+                        match_status = "✅ MATCH" if matches[idx] else "❌ No match"
+                        logger.debug("        %d. %s: %.2f%% (%s, distance: %.3f)", i + 1, known_ids[idx], (1 - distance) * 100, match_status, distance)
 
                 # Check if best match is valid
                 best_match_index = sorted_indices[0]
                 if matches[best_match_index]:
                     employee_id = known_ids[best_match_index]
                     confidence = 1 - face_distances[best_match_index]
-                    print(f"      ✅ RECOGNIZED: {employee_id} (confidence: {confidence:.2%})")
+                    logger.info("      ✅ RECOGNIZED: %s (confidence: %.2f%%)", employee_id, confidence * 100)
                     return employee_id
                 else:
-                    print(f"      ❌ Best match {known_ids[best_match_index]} below threshold (confidence: {(1-face_distances[best_match_index]):.2%})")
+                    logger.debug("      ❌ Best match %s below threshold (confidence: %.2f%%)", known_ids[best_match_index], (1 - face_distances[best_match_index]) * 100)
 
         except Exception as e:
-            print(f"      ❌ Error matching face: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("      ❌ Error matching face: %s", e)
 
         return None
 
@@ -263,31 +252,31 @@ class CameraMonitor:
             # Get employee
             employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
             if not employee:
-                print(f"❌ Employee {employee_id} not found in database")
+                logger.warning("❌ Employee %s not found in database", employee_id)
                 db.close()
                 return
 
-            # Create attendance log
-            log = AttendanceLog(
-                employee_id=employee.id,
-                camera_id=self.camera.id,
-                timestamp=datetime.fromtimestamp(timestamp),
-                status='present',
-                confidence=0.95,  # We could calculate actual confidence
-            )
-            db.add(log)
+            # Create attendance log (id from gen_random_uuid() on PostgreSQL)
+            db.execute(insert(AttendanceLog), with_row_ids(db, [{
+                "employee_id": employee.id,
+                "camera_id": self.camera.id,
+                "timestamp": datetime.fromtimestamp(timestamp),
+                "status": 'present',
+                "confidence": 0.95,  # We could calculate actual confidence
+            }]))
 
             # Save snapshot image to database or file system
             # For now, we'll skip saving the image to keep DB small
             # You could upload to S3 or save to disk here
 
             db.commit()
-            print(f"   📝 Attendance logged for {employee.name}")
+            analytics_cache.invalidate()
+            logger.info("   📝 Attendance logged for %s", employee.name)
 
             db.close()
 
         except Exception as e:
-            print(f"❌ Error logging attendance: {e}")
+            logger.exception("❌ Error logging attendance: %s", e)
 
     def reload_faces(self):
         """Reload known faces from database (call when faces are updated)"""
@@ -305,7 +294,7 @@ class CameraMonitoringService:
         """Start monitoring a specific camera"""
         with self.lock:
             if camera.id in self.monitors:
-                print(f"⚠️ Camera {camera.name} is already being monitored")
+                logger.info("⚠️ Camera %s is already being monitored", camera.name)
                 return True
 
             monitor = CameraMonitor(camera, get_db)
@@ -325,7 +314,7 @@ class CameraMonitoringService:
         """Start monitoring all active cameras"""
         cameras = db.query(Camera).filter(Camera.is_active == True).all()
 
-        print(f"\n🎥 Starting monitoring for {len(cameras)} camera(s)...")
+        logger.info("🎥 Starting monitoring for %d camera(s)...", len(cameras))
 
         for camera in cameras:
             self.start_camera_monitoring(camera)
@@ -3,6 +3,7 @@ Camera Streaming Service
 Handles live video streaming from RTSP, HTTP, and Webcam sources
 """
 import cv2
+import logging
 import numpy as np
 import threading
 import time
@@ -10,6 +11,8 @@ from typing import Dict, Optional
 from database import get_db, Camera
 import face_recognition as fr
 
+logger = logging.getLogger(__name__)
+
 
 class CameraStreamManager:
     """Manages multiple camera streams"""
@@ -99,7 +102,7 @@ class CameraStream:
                 # HTTP/MJPEG stream
                 source = self.camera.stream_url
             else:
-                print(f"❌ Unknown camera type: {self.camera.camera_type}")
+                logger.error("❌ Unknown camera type: %s", self.camera.camera_type)
                 return False
 
             # Open video capture
@@ -110,13 +113,13 @@ class CameraStream:
 
             # Check if camera opened successfully
             if not self.capture.isOpened():
-                print(f"❌ Failed to open camera: {self.camera.name}")
+                logger.error("❌ Failed to open camera: %s", self.camera.name)
                 return False
 
             # Read first frame to verify
             ret, frame = self.capture.read()
             if not ret or frame is None:
-                print(f"❌ Failed to read frame from camera: {self.camera.name}")
+                logger.error("❌ Failed to read frame from camera: %s", self.camera.name)
                 self.capture.release()
                 return False
 
@@ -127,11 +130,11 @@ class CameraStream:
             self.thread = threading.Thread(target=self._capture_loop, daemon=True)
             self.thread.start()
 
-            print(f"✅ Camera stream started: {self.camera.name}")
+            logger.info("✅ Camera stream started: %s", self.camera.name)
             return True
 
         except Exception as e:
-            print(f"❌ Error starting camera {self.camera.name}: {e}")
+            logger.exception("❌ Error starting camera %s: %s", self.camera.name, e)
             if self.capture:
                 self.capture.release()
             return False
@@ -146,7 +149,7 @@ class CameraStream:
                 ret, frame = self.capture.read()
 
                 if not ret or frame is None:
-                    print(f"⚠️ Failed to read frame from {self.camera.name}")
+                    logger.warning("⚠️ Failed to read frame from %s", self.camera.name)
                     time.sleep(0.1)
                     continue
 
@@ -164,7 +167,7 @@ class CameraStream:
                 time.sleep(0.01)
 
             except Exception as e:
-                print(f"❌ Error in capture loop for {self.camera.name}: {e}")
+                logger.exception("❌ Error in capture loop for %s: %s", self.camera.name, e)
                 time.sleep(0.5)
 
     def get_frame(self) -> Optional[np.ndarray]:
@@ -240,7 +243,7 @@ class CameraStream:
                                 name = employee_id
                                 color = (0, 255, 0)  # Green for recognized
                 except Exception as e:
-                    print(f"Error matching face: {e}")
+                    logger.warning("Error matching face: %s", e)
                     # Continue with Unknown label
 
             # Draw rectangle
@@ -285,7 +288,7 @@ class CameraStream:
         if self.capture:
             self.capture.release()
 
-        print(f"🛑 Camera stream stopped: {self.camera.name}")
+        logger.info("🛑 Camera stream stopped: %s", self.camera.name)
 
 
 # Global stream manager instance
@@ -1,20 +1,50 @@
 """
 Database Configuration and Models
 """
-from sqlalchemy import create_engine, Column, String, DateTime, JSON, Boolean, Text, ForeignKey, Float
+from sqlalchemy import create_engine, func, Column, String, DateTime, Boolean, Text, ForeignKey, Float, LargeBinary, Index, Uuid, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from typing import List
 from zoneinfo import ZoneInfo
 from config import settings
+import uuid
+
+# Resolved once; every timestamp in the app is taken in this zone
+PH_TZ = ZoneInfo(settings.TIMEZONE)
 
 # Helper function to get current time in Philippines timezone
 def get_ph_time():
     """Get current datetime in Philippines timezone (UTC+8)"""
-    return datetime.now(ZoneInfo(settings.TIMEZONE))
+    return datetime.now(PH_TZ)
+
+def with_row_ids(db, rows: List[dict]) -> List[dict]:
+    """
+    Fill in ids for AttendanceLog / EventParticipant rows where the database can't
+
+    Their id columns default to gen_random_uuid(), which only PostgreSQL has; on any
+    other database each row without an id gets a Python-generated UUID.
+
+    Args:
+        db: Database session
+        rows: Column-value dicts to insert (updated in place)
+
+    Returns:
+        The same rows
+    """
+    if db.bind.dialect.name != "postgresql":
+        for row in rows:
+            row.setdefault("id", str(uuid.uuid4()))
+    return rows
 
 # Create database engine
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,  # Sync endpoints run in the thread pool, each holding a connection
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -26,15 +56,15 @@ Base = declarative_base()
 class Employee(Base):
     __tablename__ = "employees"
 
-    id = Column(String(255), primary_key=True, index=True)
+    id = Column(Uuid(as_uuid=False), primary_key=True, index=True)  # Native UUID on PostgreSQL, str in Python
     name = Column(String(255), nullable=False)
     firstname = Column(String(255), nullable=False)
     lastname = Column(String(255), nullable=False)
     employee_id = Column(String(255), unique=True, nullable=False, index=True)
     department = Column(String(255))
-    email = Column(String(255))
-    embeddings = Column(JSON, nullable=False)  # Store face embeddings as JSON array
-    qr_code_token = Column(String(255), unique=True, nullable=True)  # Unique QR code token
+    email = Column(String(255), index=True)
+    embeddings = Column(LargeBinary, nullable=False)  # Face embeddings as packed float16 bytes (128 values per face)
+    qr_code_token = Column(Uuid(as_uuid=False), unique=True, nullable=True)  # Unique QR code token
     created_at = Column(DateTime, default=get_ph_time)
     updated_at = Column(DateTime, default=get_ph_time, onupdate=get_ph_time)
     is_active = Column(Boolean, default=True)
@@ -42,7 +72,7 @@ class Employee(Base):
 class AttendanceLog(Base):
     __tablename__ = "attendance_logs"
 
-    id = Column(String(255), primary_key=True, index=True)
+    id = Column(Uuid(as_uuid=False), primary_key=True, index=True, server_default=func.gen_random_uuid())  # Generated by PostgreSQL on insert (see with_row_ids)
     employee_id = Column(String(255), nullable=False, index=True)
     timestamp = Column(DateTime, default=get_ph_time, index=True)
     confidence = Column(String(50))
@@ -52,6 +82,11 @@ class AttendanceLog(Base):
     notes = Column(Text, nullable=True)  # Optional notes (e.g., "Late by 25 minutes")
     camera_id = Column(String, nullable=True)  # Camera that captured the attendance
 
+# Cooldown checks look up an employee's most recent logs
+Index("ix_attendance_emp_ts", AttendanceLog.employee_id, AttendanceLog.timestamp.desc())
+# Analytics scan a day range and count distinct employees; employee_id makes the scan index-only
+Index("ix_attendance_ts_emp", AttendanceLog.timestamp, AttendanceLog.employee_id)
+
 class Event(Base):
     __tablename__ = "events"
 
@@ -68,10 +103,17 @@ class Event(Base):
     updated_at = Column(DateTime, default=get_ph_time, onupdate=get_ph_time)
     is_active = Column(Boolean, default=True)
 
+# Event listings filter active events by date; the stats summary counts them by status
+Index("ix_events_active_date", Event.is_active, Event.event_date)
+Index("ix_events_active_status_date", Event.is_active, Event.status, Event.event_date)
+
 class EventParticipant(Base):
     __tablename__ = "event_participants"
+    __table_args__ = (
+        UniqueConstraint("event_id", "employee_id", name="uq_event_participant"),
+    )
 
-    id = Column(String(255), primary_key=True, index=True)
+    id = Column(Uuid(as_uuid=False), primary_key=True, index=True, server_default=func.gen_random_uuid())  # Generated by PostgreSQL on insert (see with_row_ids)
     event_id = Column(String(255), ForeignKey('events.id'), nullable=False, index=True)
     employee_id = Column(String(255), ForeignKey('employees.employee_id'), nullable=False, index=True)
     is_required = Column(Boolean, default=True)  # Is attendance mandatory?
@@ -122,6 +164,23 @@ class Invitation(Base):
     employee_id = Column(String(255), nullable=True)  # Employee ID created from this invitation
     event_id = Column(String(255), nullable=True, index=True)  # Event ID if invitation is for an event
 
+    # Event this invitation is for (no FK constraint in the schema, so the join is explicit)
+    event = relationship(
+        "Event",
+        primaryjoin="foreign(Invitation.event_id) == Event.id",
+        viewonly=True,
+        lazy="select"
+    )
+
+# At most one open invitation per (email, event), so sending again can upsert in place
+Index(
+    "uq_invitation_open_email_event",
+    Invitation.email, Invitation.event_id,
+    unique=True,
+    postgresql_where=Invitation.is_used == False,
+    sqlite_where=Invitation.is_used == False
+)
+
 class Camera(Base):
     __tablename__ = "cameras"
 
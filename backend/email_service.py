@@ -1,12 +1,15 @@
 """
 Email Service for sending invitations and notifications
 """
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
 from config import settings
+from smtp_pool import smtp_pool
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 class EmailService:
     """Service for sending emails"""
@@ -48,18 +51,14 @@ class EmailService:
             part2 = MIMEText(html_body, 'html')
             msg.attach(part2)
 
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                if self.smtp_user and self.smtp_password:
-                    server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Send email over a pooled (already logged-in) SMTP connection
+            smtp_pool.send_message(msg)
 
-            print(f"✅ Email sent successfully to {to_email}")
+            logger.info("✅ Email sent successfully to %s", to_email)
             return True
 
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
+            logger.error("❌ Failed to send email to %s: %s", to_email, e)
             return False
 
     def send_event_invitation(
@@ -1,10 +1,15 @@
 """
 Export Service - Generate attendance reports in CSV, Excel, and PDF formats
 """
+import re
+import zipfile
+import numpy as np
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Sequence
+from xml.sax.saxutils import escape as xml_escape
+from openpyxl.utils import get_column_letter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -13,6 +18,81 @@ from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 
+# Attendance report columns (CSV and Excel), with Excel column widths
+ATTENDANCE_EXPORT_COLUMNS = ['Employee ID', 'Date', 'Time', 'Confidence', 'Status', 'Notes', 'Method']
+ATTENDANCE_EXPORT_WIDTHS = [14, 12, 13, 12, 10, 40, 18]
+
+# Static parts of a minimal single-sheet .xlsx package
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Cell formats: 0 default, 1 header, 2 on_time, 3 late, 4 half_day
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="12"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+    '<fills count="6"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF4472C4"/></patternFill></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFC6EFCE"/></patternFill></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFFFEB9C"/></patternFill></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFFFC7CE"/></patternFill></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+    '<xf numFmtId="0" fontId="0" fillId="3" borderId="0" xfId="0" applyFill="1"/>'
+    '<xf numFmtId="0" fontId="0" fillId="4" borderId="0" xfId="0" applyFill="1"/>'
+    '<xf numFmtId="0" fontId="0" fillId="5" borderId="0" xfId="0" applyFill="1"/></cellXfs>'
+    '</styleSheet>'
+)
+XLSX_STATUS_STYLES = {'on_time': 2, 'late': 3, 'half_day': 4}
+
+# PDF attendance tables: rows per table, shared style commands, and status colors
+PDF_TABLE_CHUNK_ROWS = 500
+PDF_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+]
+PDF_STATUS_COLORS = {
+    'on_time': colors.lightgreen,
+    'late': colors.yellow,
+    'half_day': colors.lightcoral,
+}
+
+# Characters XML 1.0 does not allow, even escaped
+XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
 class ExportService:
     """Service for exporting attendance data in various formats"""
 
@@ -27,8 +107,9 @@ class ExportService:
 
         # Format datetime columns
         if 'timestamp' in df.columns:
-            df['Date'] = pd.to_datetime(df['timestamp']).dt.strftime('%Y-%m-%d')
-            df['Time'] = pd.to_datetime(df['timestamp']).dt.strftime('%I:%M:%S %p')
+            timestamps = pd.to_datetime(df['timestamp'])  # Parsed once, formatted per column
+            df['Date'] = timestamps.dt.strftime('%Y-%m-%d')
+            df['Time'] = timestamps.dt.strftime('%I:%M:%S %p')
 
         # Select and rename columns
         column_mapping = {
@@ -59,51 +140,77 @@ class ExportService:
         return buffer
 
     @staticmethod
-    def export_to_excel(attendance_records: List[Dict]) -> BytesIO:
-        """Export attendance data to Excel format with formatting"""
-        df = ExportService.prepare_attendance_data(attendance_records)
+    def export_to_excel_fastxml(rows: Iterable[Sequence], sheet_name: str = 'Attendance Report') -> BytesIO:
+        """
+        Export attendance rows to Excel by writing the sheet XML directly
+
+        Rows are streamed into the zipped sheet as inline-string cells, with no
+        per-cell objects. The header is always written, and columns have fixed widths.
+
+        Args:
+            rows: Rows in ATTENDANCE_EXPORT_COLUMNS order (None leaves a cell empty)
+            sheet_name: Worksheet name
+
+        Returns:
+            .xlsx file buffer
+        """
+        letters = [get_column_letter(idx) for idx in range(1, len(ATTENDANCE_EXPORT_COLUMNS) + 1)]
+        status_col_idx = ATTENDANCE_EXPORT_COLUMNS.index('Status')
+
+        def row_xml(row_num: int, values: Sequence, header: bool = False) -> str:
+            cells = []
+            for col_idx, value in enumerate(values):
+                if value is None or value == '':
+                    continue
+                text = xml_escape(XML_ILLEGAL_CHARS.sub('', str(value)))
+                if header:
+                    style = 1
+                elif col_idx == status_col_idx:
+                    style = XLSX_STATUS_STYLES.get(str(value).lower(), 0)
+                else:
+                    style = 0
+                style_attr = f' s="{style}"' if style else ''
+                cells.append(
+                    f'<c r="{letters[col_idx]}{row_num}"{style_attr} t="inlineStr">'
+                    f'<is><t xml:space="preserve">{text}</t></is></c>'
+                )
+            return f'<row r="{row_num}">{"".join(cells)}</row>'
 
         buffer = BytesIO()
-
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Attendance Report', index=False)
-
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Attendance Report']
-
-            # Format header row
-            for cell in worksheet[1]:
-                cell.font = cell.font.copy(bold=True, size=12)
-                cell.fill = cell.fill.copy(fgColor='4472C4', patternType='solid')
-                cell.font = cell.font.copy(color='FFFFFF')
-
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-
-            # Apply status color coding
-            if 'Status' in df.columns:
-                status_col_idx = df.columns.get_loc('Status') + 1
-                for row_idx in range(2, len(df) + 2):
-                    cell = worksheet.cell(row=row_idx, column=status_col_idx)
-                    status = str(cell.value).lower()
-
-                    if status == 'on_time':
-                        cell.fill = cell.fill.copy(fgColor='C6EFCE', patternType='solid')
-                    elif status == 'late':
-                        cell.fill = cell.fill.copy(fgColor='FFEB9C', patternType='solid')
-                    elif status == 'half_day':
-                        cell.fill = cell.fill.copy(fgColor='FFC7CE', patternType='solid')
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+            archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+            archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+            archive.writestr('xl/styles.xml', XLSX_STYLES)
+            archive.writestr('xl/workbook.xml', (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{xml_escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            ))
+
+            with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                cols = ''.join(
+                    f'<col min="{idx}" max="{idx}" width="{width}" customWidth="1"/>'
+                    for idx, width in enumerate(ATTENDANCE_EXPORT_WIDTHS, start=1)
+                )
+                sheet.write((
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    f'<cols>{cols}</cols><sheetData>'
+                    + row_xml(1, ATTENDANCE_EXPORT_COLUMNS, header=True)
+                ).encode())
+
+                # Write in chunks of rows to keep the number of zip writes down
+                chunk = []
+                for row_num, row in enumerate(rows, start=2):
+                    chunk.append(row_xml(row_num, row))
+                    if len(chunk) >= 1000:
+                        sheet.write(''.join(chunk).encode())
+                        chunk = []
+                chunk.append('</sheetData></worksheet>')
+                sheet.write(''.join(chunk).encode())
 
         buffer.seek(0)
         return buffer
@@ -113,6 +220,27 @@ class ExportService:
         """Export attendance data to PDF format"""
         df = ExportService.prepare_attendance_data(attendance_records)
 
+        # Select by name so the values line up with ATTENDANCE_EXPORT_COLUMNS
+        df = df.reindex(columns=ATTENDANCE_EXPORT_COLUMNS).astype(object)
+        df = df.where(df.notna(), None)
+        return ExportService.export_rows_to_pdf(df.values.tolist(), title)
+
+    @staticmethod
+    def export_rows_to_pdf(rows: Iterable[Sequence], title: str = "Attendance Report") -> BytesIO:
+        """
+        Export attendance rows to PDF format
+
+        Rows are laid out as a series of tables of PDF_TABLE_CHUNK_ROWS rows,
+        which ReportLab splits across pages far more cheaply than one table
+        holding every row. The whole document is still built in memory.
+
+        Args:
+            rows: Rows in ATTENDANCE_EXPORT_COLUMNS order
+            title: Report title
+
+        Returns:
+            PDF file buffer
+        """
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         elements = []
@@ -128,6 +256,40 @@ class ExportService:
             alignment=TA_CENTER
         )
 
+        # Same widths on every chunk, so the tables line up across pages
+        total_width = sum(ATTENDANCE_EXPORT_WIDTHS)
+        col_widths = [doc.width * width / total_width for width in ATTENDANCE_EXPORT_WIDTHS]
+        status_col_idx = ATTENDANCE_EXPORT_COLUMNS.index('Status')
+
+        def build_table(chunk: List[Sequence]) -> Table:
+            table = Table([ATTENDANCE_EXPORT_COLUMNS] + chunk, colWidths=col_widths, repeatRows=1)
+
+            # Table style
+            table_style = TableStyle(PDF_TABLE_STYLE)
+
+            # Apply status-based coloring
+            for row_idx, row in enumerate(chunk, start=1):
+                color = PDF_STATUS_COLORS.get(row[status_col_idx])
+                if color:
+                    table_style.add('BACKGROUND', (status_col_idx, row_idx), (status_col_idx, row_idx), color)
+
+            table.setStyle(table_style)
+            return table
+
+        # Table data
+        tables = []
+        total_records = 0
+        chunk = []
+        for row in rows:
+            chunk.append(list(row))
+            if len(chunk) == PDF_TABLE_CHUNK_ROWS:
+                tables.append(build_table(chunk))
+                total_records += len(chunk)
+                chunk = []
+        if chunk:
+            tables.append(build_table(chunk))
+            total_records += len(chunk)
+
         # Title
         elements.append(Paragraph(title, title_style))
         elements.append(Spacer(1, 0.2*inch))
@@ -135,45 +297,11 @@ class ExportService:
         # Metadata
         metadata_style = styles['Normal']
         elements.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}", metadata_style))
-        elements.append(Paragraph(f"Total Records: {len(df)}", metadata_style))
+        elements.append(Paragraph(f"Total Records: {total_records}", metadata_style))
         elements.append(Spacer(1, 0.3*inch))
 
-        # Table data
-        if not df.empty:
-            # Prepare table data
-            table_data = [df.columns.tolist()] + df.values.tolist()
-
-            # Create table
-            table = Table(table_data)
-
-            # Table style
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ])
-
-            # Apply status-based coloring
-            if 'Status' in df.columns:
-                status_col_idx = df.columns.get_loc('Status')
-                for row_idx, status in enumerate(df['Status'], start=1):
-                    if status == 'on_time':
-                        table_style.add('BACKGROUND', (status_col_idx, row_idx), (status_col_idx, row_idx), colors.lightgreen)
-                    elif status == 'late':
-                        table_style.add('BACKGROUND', (status_col_idx, row_idx), (status_col_idx, row_idx), colors.yellow)
-                    elif status == 'half_day':
-                        table_style.add('BACKGROUND', (status_col_idx, row_idx), (status_col_idx, row_idx), colors.lightcoral)
-
-            table.setStyle(table_style)
-            elements.append(table)
+        if tables:
+            elements.extend(tables)
         else:
             elements.append(Paragraph("No attendance records found.", styles['Normal']))
 
@@ -187,7 +315,34 @@ class EventExportService:
     """Service for exporting event attendance reports"""
 
     @staticmethod
-    def export_event_attendance(event_data: Dict, participants: List[Dict], format: str = 'pdf') -> BytesIO:
+    def prepare_participant_data(rows: List[Sequence]) -> pd.DataFrame:
+        """
+        Build the participant table column by column
+
+        Each column is converted once as a whole (vectorized date formatting and
+        Yes/No mapping) instead of cell by cell through per-row dicts.
+
+        Args:
+            rows: (employee_id, employee_name, status, attended_at, is_required) tuples
+
+        Returns:
+            DataFrame with employee_id, employee_name, status, attended_at, is_required columns
+        """
+        employee_ids, names, statuses, attended_at, is_required = (
+            zip(*rows) if rows else ((), (), (), (), ())
+        )
+
+        return pd.DataFrame({
+            'employee_id': list(employee_ids),
+            'employee_name': pd.Series(names, dtype=object).fillna('Unknown'),
+            'status': list(statuses),
+            'attended_at': pd.to_datetime(pd.Series(attended_at, dtype=object))
+                .dt.strftime('%Y-%m-%d %I:%M %p').fillna('N/A'),
+            'is_required': np.where(np.array(is_required, dtype=bool), 'Yes', 'No')
+        })
+
+    @staticmethod
+    def export_event_attendance(event_data: Dict, participants: pd.DataFrame, format: str = 'pdf') -> BytesIO:
         """Export event attendance in specified format"""
 
         if format == 'csv':
@@ -198,7 +353,7 @@ class EventExportService:
             return EventExportService._export_event_pdf(event_data, participants)
 
     @staticmethod
-    def _export_event_csv(event_data: Dict, participants: List[Dict]) -> BytesIO:
+    def _export_event_csv(event_data: Dict, participants: pd.DataFrame) -> BytesIO:
         """Export event attendance to CSV"""
         df = pd.DataFrame(participants)
 
@@ -214,7 +369,7 @@ class EventExportService:
         return buffer
 
     @staticmethod
-    def _export_event_excel(event_data: Dict, participants: List[Dict]) -> BytesIO:
+    def _export_event_excel(event_data: Dict, participants: pd.DataFrame) -> BytesIO:
         """Export event attendance to Excel with formatting"""
         df = pd.DataFrame(participants)
 
@@ -246,7 +401,7 @@ class EventExportService:
         return buffer
 
     @staticmethod
-    def _export_event_pdf(event_data: Dict, participants: List[Dict]) -> BytesIO:
+    def _export_event_pdf(event_data: Dict, participants: pd.DataFrame) -> BytesIO:
         """Export event attendance to PDF certificate"""
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
@@ -274,7 +429,7 @@ class EventExportService:
         elements.append(Spacer(1, 0.3*inch))
 
         # Participants table
-        if participants:
+        if len(participants):
             df = pd.DataFrame(participants)
             table_data = [df.columns.tolist()] + df.values.tolist()
 
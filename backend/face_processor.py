@@ -7,10 +7,93 @@ import cv2
 from PIL import Image
 import io
 import base64
+import logging
 from typing import List, Tuple, Optional, Any, Dict
 from config import settings
 from liveness_detector import LivenessDetector
 
+logger = logging.getLogger(__name__)
+
+# face_recognition (dlib) encodings are 128-d
+EMBEDDING_DIM = 128
+
+# On-disk dtype for Employee.embeddings. float16 halves row size versus float32; the
+# rounding error (~1e-4 in distance) is far below FACE_RECOGNITION_TOLERANCE.
+# Matching always runs in float32.
+EMBEDDING_STORAGE_DTYPE = np.float16
+
+# Keep at most this many face encodings per employee (multi-face registration)
+MAX_FACES_PER_EMPLOYEE = 5
+
+
+def pack_embeddings(embeddings: Any) -> bytes:
+    """
+    Serialize one or more face encodings to raw float16 bytes for storage
+
+    Args:
+        embeddings: A single encoding or a stack of encodings
+
+    Returns:
+        Row-major float16 bytes (EMBEDDING_DIM values per face)
+    """
+    return np.ascontiguousarray(embeddings, dtype=EMBEDDING_STORAGE_DTYPE).reshape(-1, EMBEDDING_DIM).tobytes()
+
+
+def unpack_embeddings(stored: Any) -> np.ndarray:
+    """
+    View stored face encodings as a (faces, EMBEDDING_DIM) matrix
+
+    Args:
+        stored: Raw bytes from Employee.embeddings (legacy JSON lists are also accepted)
+
+    Returns:
+        Read-only float16 matrix, zero-copy for byte input (cast before doing math on it)
+    """
+    if isinstance(stored, (list, tuple)):
+        return np.asarray(stored, dtype=EMBEDDING_STORAGE_DTYPE).reshape(-1, EMBEDDING_DIM)
+    return np.frombuffer(stored, dtype=EMBEDDING_STORAGE_DTYPE).reshape(-1, EMBEDDING_DIM)
+
+
+class FaceGallery:
+    """All registered face encodings packed into a single float32 matrix"""
+
+    def __init__(self, employees: List[Tuple[str, str, Any]] = (), signature: Any = None):
+        """
+        Args:
+            employees: List of (employee_id, name, stored_embeddings) tuples
+            signature: Opaque value identifying the employee set this gallery was built from
+        """
+        self.signature = signature
+        self.employee_ids: List[str] = []
+        self.names: List[str] = []
+        blocks = []
+        owners = []
+
+        for employee_id, name, stored in employees:
+            if not stored:
+                continue
+            block = unpack_embeddings(stored)
+            owners.append(np.full(len(block), len(self.employee_ids), dtype=np.int32))
+            blocks.append(block)
+            self.employee_ids.append(employee_id)
+            self.names.append(name)
+
+        self.names_by_id = dict(zip(self.employee_ids, self.names))
+
+        if blocks:
+            self.matrix = np.vstack(blocks, dtype=np.float32)
+            self.owners = np.concatenate(owners)
+        else:
+            self.matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+            self.owners = np.empty(0, dtype=np.int32)
+
+        # Squared row norms, so distances reduce to one matrix-vector product per query
+        self.sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+
+    def __len__(self) -> int:
+        return len(self.employee_ids)
+
+
 class FaceProcessor:
     """Handle face detection, recognition, and embedding generation"""
 
@@ -18,6 +101,7 @@ class FaceProcessor:
         self.tolerance = settings.FACE_RECOGNITION_TOLERANCE
         self.model = settings.FACE_DETECTION_MODEL
         self.liveness_detector = LivenessDetector()
+        self.gallery = FaceGallery()
 
     @staticmethod
     def convert_numpy_types(obj: Any) -> Any:
@@ -74,7 +158,7 @@ class FaceProcessor:
             return np.array(image)
 
         except Exception as e:
-            print(f"❌ Error decoding image: {e}")
+            logger.warning("❌ Error decoding image: %s", e)
             raise ValueError(f"Invalid image data: {e}")
 
     def detect_faces(self, image: np.ndarray) -> List[Tuple]:
@@ -88,14 +172,14 @@ class FaceProcessor:
             List of tuples: (face_location, face_encoding)
         """
         try:
-            print(f"🔍 Detecting faces in image...")
-            print(f"   Image shape: {image.shape}")
-            print(f"   Image dtype: {image.dtype}")
-            print(f"   Image range: {image.min()} - {image.max()}")
-            print(f"   Detection model: {self.model}")
+            # min()/max() scan the whole image, so only compute them when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "🔍 Detecting faces: shape=%s, dtype=%s, range=%s-%s, model=%s",
+                    image.shape, image.dtype, image.min(), image.max(), self.model
+                )
 
             # Detect face locations
-            print(f"   Running face_recognition.face_locations()...")
             face_locations = face_recognition.face_locations(
                 image,
                 model=self.model,
@@ -103,17 +187,14 @@ class FaceProcessor:
             )
 
             if not face_locations:
-                print("   ❌ No faces detected by face_recognition library")
-                print("   💡 Possible issues:")
-                print("      - Face too small (minimum ~80x80 pixels)")
-                print("      - Poor lighting or image quality")
-                print("      - Face not looking forward")
-                print("      - Try changing model from 'hog' to 'cnn' in config.py")
+                # Usual causes: face smaller than ~80x80 px, poor lighting, not facing forward
+                # (the 'cnn' detection model in config.py is more sensitive than 'hog')
+                logger.debug("❌ No faces detected by face_recognition library")
                 return []
 
             # Limit number of faces
             if len(face_locations) > settings.MAX_FACES_PER_IMAGE:
-                print(f"⚠️ Too many faces detected ({len(face_locations)}), limiting to {settings.MAX_FACES_PER_IMAGE}")
+                logger.warning("⚠️ Too many faces detected (%d), limiting to %d", len(face_locations), settings.MAX_FACES_PER_IMAGE)
                 face_locations = face_locations[:settings.MAX_FACES_PER_IMAGE]
 
             # Generate face encodings (embeddings)
@@ -123,12 +204,12 @@ class FaceProcessor:
                 num_jitters=1
             )
 
-            print(f"✅ Detected {len(face_locations)} face(s)")
+            logger.debug("✅ Detected %d face(s)", len(face_locations))
 
             return list(zip(face_locations, face_encodings))
 
         except Exception as e:
-            print(f"❌ Face detection error: {e}")
+            logger.exception("❌ Face detection error: %s", e)
             return []
 
     def extract_face_crop(self, image: np.ndarray, face_location: Tuple) -> np.ndarray:
@@ -157,68 +238,111 @@ class FaceProcessor:
 
         return face_crop
 
-    def match_face(self, face_encoding: np.ndarray, employee_embeddings: List[Tuple[str, List[float]]]) -> Optional[Tuple[str, float]]:
+    def load_gallery(self, employees: List[Tuple[str, str, Any]], signature: Any = None) -> FaceGallery:
         """
-        Match face encoding against database of employee embeddings
+        Rebuild the cached embedding gallery
 
         Args:
-            face_encoding: 128-d face encoding vector
-            employee_embeddings: List of (employee_id, embedding) tuples
+            employees: List of (employee_id, name, stored_embeddings) tuples
+            signature: Value identifying the employee set (used to detect staleness)
 
         Returns:
-            Tuple of (employee_id, confidence) or None if no match
+            The new gallery
         """
-        if not employee_embeddings:
-            return None
-
-        best_match_id = None
-        best_distance = float('inf')
-
-        for employee_id, stored_embedding in employee_embeddings:
-            # Convert stored embedding to numpy array
-            stored_array = np.array(stored_embedding)
+        self.gallery = FaceGallery(employees, signature)
+        logger.info("📋 Loaded %d face encoding(s) for %d employee(s)", len(self.gallery.matrix), len(self.gallery))
+        return self.gallery
+
+    def _best_matches(self, face_encodings: np.ndarray, gallery: FaceGallery) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (employee indices, distances) of the closest gallery row for each encoding"""
+        queries = np.ascontiguousarray(face_encodings, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        # ||m - q||^2 = ||m||^2 - 2 m.q + ||q||^2 (one BLAS gemm for all faces in the frame)
+        sq_distances = gallery.sq_norms - 2.0 * (queries @ gallery.matrix.T)
+        best_rows = np.argmin(sq_distances, axis=1)
+        best_sq_distances = sq_distances[np.arange(len(queries)), best_rows] + np.einsum('ij,ij->i', queries, queries)
+        return gallery.owners[best_rows], np.sqrt(np.maximum(best_sq_distances, 0.0))
+
+    def match_faces(self, face_encodings: List[np.ndarray], gallery: FaceGallery) -> List[Optional[Tuple[str, float]]]:
+        """
+        Match several face encodings against the employee embedding gallery at once
 
-            # Calculate face distance (lower = better match)
-            distance = face_recognition.face_distance([stored_array], face_encoding)[0]
+        Args:
+            face_encodings: 128-d face encoding vectors
+            gallery: Packed employee embeddings
 
-            if distance < best_distance:
-                best_distance = distance
-                best_match_id = employee_id
+        Returns:
+            List of (employee_id, confidence) or None per encoding
+        """
+        if not len(gallery) or not len(face_encodings):
+            return [None] * len(face_encodings)
+
+        best_indices, best_distances = self._best_matches(face_encodings, gallery)
+
+        matches = []
+        for best_index, best_distance in zip(best_indices.tolist(), best_distances.tolist()):
+            # Check if best match is within tolerance
+            if best_distance <= self.tolerance:
+                best_match_id = gallery.employee_ids[best_index]
+                # Convert distance to confidence (0-1)
+                confidence = 1.0 - best_distance
+                logger.debug("✅ Match found: %s (confidence: %.2f)", best_match_id, confidence)
+                matches.append((best_match_id, confidence))
+            else:
+                logger.debug("ℹ️ No match found (best distance: %.2f)", best_distance)
+                matches.append(None)
+
+        return matches
+
+    def match_face(self, face_encoding: np.ndarray, gallery: FaceGallery) -> Optional[Tuple[str, float]]:
+        """
+        Match face encoding against the employee embedding gallery
 
-        # Check if best match is within tolerance
-        if best_distance <= self.tolerance:
-            # Convert distance to confidence (0-1)
-            confidence = 1.0 - best_distance
-            print(f"✅ Match found: {best_match_id} (confidence: {confidence:.2f})")
-            return (best_match_id, confidence)
+        Args:
+            face_encoding: 128-d face encoding vector
+            gallery: Packed employee embeddings
 
-        print(f"ℹ️ No match found (best distance: {best_distance:.2f})")
-        return None
+        Returns:
+            Tuple of (employee_id, confidence) or None if no match
+        """
+        return self.match_faces([face_encoding], gallery)[0]
 
-    def process_image_for_recognition(self, base64_image: str, employee_embeddings: List[Tuple[str, str, List[float]]]) -> List[dict]:
+    def process_image_for_recognition(self, base64_image: str, gallery: FaceGallery) -> List[dict]:
         """
         Complete face detection and recognition pipeline
 
         Args:
             base64_image: Base64 encoded image
-            employee_embeddings: List of (employee_id, name, embedding) tuples
+            gallery: Packed employee embeddings
 
         Returns:
             List of detected face results
         """
-        try:
-            # Decode image
-            image = self.decode_base64_image(base64_image)
+        return self.recognize_faces_in_image(self.decode_base64_image(base64_image), gallery)
 
+    def recognize_faces_in_image(self, image: np.ndarray, gallery: FaceGallery) -> List[dict]:
+        """
+        Face detection and recognition pipeline for an already decoded image
+
+        Args:
+            image: numpy array (RGB)
+            gallery: Packed employee embeddings
+
+        Returns:
+            List of detected face results
+        """
+        try:
             # Detect faces
             detected_faces = self.detect_faces(image)
 
             if not detected_faces:
                 return []
 
+            # Match all faces against database in one pass
+            matches = self.match_faces([face_encoding for _, face_encoding in detected_faces], gallery)
+
             results = []
 
-            for face_location, face_encoding in detected_faces:
+            for (face_location, _), match_result in zip(detected_faces, matches):
                 # Extract face crop for liveness detection
                 face_crop = self.extract_face_crop(image, face_location)
 
@@ -234,14 +358,11 @@ class FaceProcessor:
                     "height": int(bottom - top)
                 }
 
-                # Match face against database
-                match_result = self.match_face(face_encoding, [(emp_id, emb) for emp_id, _, emb in employee_embeddings])
-
                 if match_result:
                     employee_id, confidence = match_result
 
                     # Find employee name
-                    employee_name = next((name for eid, name, _ in employee_embeddings if eid == employee_id), "Unknown")
+                    employee_name = gallery.names_by_id.get(employee_id, "Unknown")
 
                     results.append({
                         "boundingBox": bounding_box,
@@ -266,10 +387,10 @@ class FaceProcessor:
             return self.convert_numpy_types(results)
 
         except Exception as e:
-            print(f"❌ Processing error: {e}")
+            logger.error("❌ Processing error: %s", e)
             raise
 
-    def generate_face_embedding(self, base64_image: str) -> Tuple[Optional[List[float]], Optional[Tuple]]:
+    def generate_face_embedding(self, base64_image: str) -> Tuple[Optional[np.ndarray], Optional[Tuple]]:
         """
         Generate face embedding from image (for registration)
 
@@ -277,32 +398,46 @@ class FaceProcessor:
             base64_image: Base64 encoded image
 
         Returns:
-            Tuple of (embedding, face_location) or (None, None) if no face
+            Tuple of (float32 embedding, face_location) or (None, None) if no face
         """
         try:
-            # Decode image
             image = self.decode_base64_image(base64_image)
+        except ValueError:
+            return None, None
+
+        return self.generate_face_embedding_from_image(image)
+
+    def generate_face_embedding_from_image(self, image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple]]:
+        """
+        Generate face embedding from an already decoded image (for registration)
+
+        Args:
+            image: numpy array (RGB)
 
+        Returns:
+            Tuple of (float32 embedding, face_location) or (None, None) if no face
+        """
+        try:
             # Detect faces
             detected_faces = self.detect_faces(image)
 
             if not detected_faces:
-                print("❌ No face detected in registration image")
+                logger.debug("❌ No face detected in registration image")
                 return None, None
 
             if len(detected_faces) > 1:
-                print("⚠️ Multiple faces detected, using first face")
+                logger.debug("⚠️ Multiple faces detected, using first face")
 
             # Use first face
             face_location, face_encoding = detected_faces[0]
 
-            # Convert to list for JSON storage
-            embedding_list = face_encoding.tolist()
+            # float32 is the matching dtype (pack_embeddings narrows it for storage)
+            embedding = face_encoding.astype(np.float32)
 
-            print(f"✅ Generated embedding: {len(embedding_list)} dimensions")
+            logger.debug("✅ Generated embedding: %d dimensions", len(embedding))
 
-            return embedding_list, face_location
+            return embedding, face_location
 
         except Exception as e:
-            print(f"❌ Embedding generation error: {e}")
+            logger.exception("❌ Embedding generation error: %s", e)
             return None, None
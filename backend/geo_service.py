@@ -3,9 +3,37 @@ Geofencing Service
 Handles GPS coordinate validation and distance calculations
 """
 import math
-from typing import Tuple, Optional, List
+import numpy as np
+from typing import Tuple, Optional, List, Union
 from database import Location
 
+# Earth's radius in meters
+EARTH_RADIUS_METERS = 6371000
+
+
+class LocationIndex:
+    """Active geofence locations as NumPy arrays for vectorized distance checks"""
+
+    def __init__(self, locations: List[Location]):
+        """
+        Args:
+            locations: Location rows (inactive ones are ignored)
+        """
+        active = [location for location in locations if location.is_active]
+
+        # Whether any geofence was configured at all (even if none are active)
+        self.configured = bool(locations)
+        self.names = [location.name for location in active]
+        self.lat_rad = np.radians(np.array([location.latitude for location in active], dtype=np.float64))
+        self.lon_rad = np.radians(np.array([location.longitude for location in active], dtype=np.float64))
+        self.cos_lat = np.cos(self.lat_rad)
+        self.radii = np.array([location.radius_meters for location in active], dtype=np.float64)
+        # Radii as haversine terms, so range checks compare against `a` without an arcsin per row
+        self.radii_hav = np.sin(np.minimum(self.radii / (2 * EARTH_RADIUS_METERS), np.pi / 2)) ** 2
+
+    def __len__(self) -> int:
+        return len(self.names)
+
 
 class GeoService:
     """Service for geolocation and distance calculations"""
@@ -24,8 +52,7 @@ class GeoService:
         Returns:
             Distance in meters
         """
-        # Earth's radius in meters
-        R = 6371000
+        R = EARTH_RADIUS_METERS
 
         # Convert latitude and longitude to radians
         lat1_rad = math.radians(lat1)
@@ -42,11 +69,52 @@ class GeoService:
         distance = R * c
         return distance
 
+    @staticmethod
+    def haversine_terms(lat: float, lon: float, locations: LocationIndex) -> np.ndarray:
+        """
+        Haversine `a` term from one point to every location in the index
+
+        `a` grows monotonically with distance, so it can be compared and ranked directly.
+
+        Args:
+            lat: Latitude of the point
+            lon: Longitude of the point
+            locations: Indexed locations
+
+        Returns:
+            Haversine terms in [0, 1] (one per location)
+        """
+        lat_rad = math.radians(lat)
+        delta_lat = locations.lat_rad - lat_rad
+        delta_lon = locations.lon_rad - math.radians(lon)
+
+        a = (np.sin(delta_lat * 0.5) ** 2 +
+             math.cos(lat_rad) * locations.cos_lat *
+             np.sin(delta_lon * 0.5) ** 2)
+
+        return np.minimum(a, 1.0)
+
+    @staticmethod
+    def calculate_distances(lat: float, lon: float, locations: LocationIndex) -> np.ndarray:
+        """
+        Haversine distance from one point to every location in the index
+
+        Args:
+            lat: Latitude of the point
+            lon: Longitude of the point
+            locations: Indexed locations
+
+        Returns:
+            Distances in meters (one per location)
+        """
+        a = GeoService.haversine_terms(lat, lon, locations)
+        return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
     @staticmethod
     def verify_location(
         lat: float,
         lon: float,
-        allowed_locations: List[Location]
+        allowed_locations: Union[List[Location], LocationIndex]
     ) -> Tuple[bool, Optional[float], Optional[str]]:
         """
         Verify if GPS coordinates are within any allowed location's radius
@@ -54,38 +122,30 @@ class GeoService:
         Args:
             lat: User's latitude
             lon: User's longitude
-            allowed_locations: List of allowed Location objects
+            allowed_locations: List of allowed Location objects, or a prebuilt LocationIndex
 
         Returns:
             Tuple of (is_verified, distance_from_nearest, nearest_location_name)
         """
-        if not allowed_locations:
+        if not isinstance(allowed_locations, LocationIndex):
+            allowed_locations = LocationIndex(allowed_locations)
+
+        if not allowed_locations.configured:
             # No geofencing configured, allow all locations
             return True, None, None
 
-        min_distance = float('inf')
-        nearest_location_name = None
-        is_within_range = False
-
-        for location in allowed_locations:
-            if not location.is_active:
-                continue
-
-            distance = GeoService.calculate_distance(
-                lat, lon,
-                location.latitude, location.longitude
-            )
+        if not len(allowed_locations):
+            return False, float('inf'), None
 
-            # Track nearest location
-            if distance < min_distance:
-                min_distance = distance
-                nearest_location_name = location.name
+        # Rank and range-check on the haversine term; only the nearest distance needs an arcsin
+        a = GeoService.haversine_terms(lat, lon, allowed_locations)
+        nearest = int(np.argmin(a))
+        distance = 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a[nearest]))
 
-            # Check if within allowed radius
-            if distance <= location.radius_meters:
-                is_within_range = True
+        # Within range of any location's radius (not necessarily the nearest one)
+        is_within_range = bool(np.any(a <= allowed_locations.radii_hav))
 
-        return is_within_range, min_distance, nearest_location_name
+        return is_within_range, distance, allowed_locations.names[nearest]
 
     @staticmethod
     def validate_coordinates(lat: Optional[float], lon: Optional[float]) -> bool:
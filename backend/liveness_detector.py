@@ -4,9 +4,12 @@ Detects if face is from a real person or a photo/video
 """
 import cv2
 import numpy as np
+import logging
 from scipy import ndimage
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 class LivenessDetector:
     """Simple liveness detection using texture analysis"""
 
@@ -51,19 +54,17 @@ class LivenessDetector:
 
             is_live = combined_score > self.threshold
 
-            print(f"🔍 Liveness Analysis:")
-            print(f"   Texture: {texture_score:.3f}")
-            print(f"   Frequency: {frequency_score:.3f}")
-            print(f"   Color: {color_score:.3f}")
-            print(f"   Blur: {blur_score:.3f}")
-            print(f"   Reflection: {reflection_score:.3f}")
-            print(f"   Combined: {combined_score:.3f} (Threshold: {self.threshold})")
-            print(f"   Result: {'✅ LIVE' if is_live else '❌ PHOTO/SCREEN'}")
+            logger.debug(
+                "🔍 Liveness: texture=%.3f frequency=%.3f color=%.3f blur=%.3f reflection=%.3f "
+                "combined=%.3f (threshold %s) -> %s",
+                texture_score, frequency_score, color_score, blur_score, reflection_score,
+                combined_score, self.threshold, "LIVE" if is_live else "PHOTO/SCREEN"
+            )
 
             return is_live, combined_score, "multi_method"
 
         except Exception as e:
-            print(f"❌ Liveness detection error: {e}")
+            logger.exception("❌ Liveness detection error: %s", e)
             # SECURITY: Fail closed (reject) to prevent spoofing attacks
             # Better to reject a real user temporarily than allow photo spoofing
             return False, 0.0, "error"
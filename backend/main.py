@@ -2,32 +2,75 @@
 Face Recognition Backend API
 FastAPI application with face detection, recognition, and attendance tracking
 """
-from fastapi import FastAPI, HTTPException, Depends, Header, UploadFile, File, Query
+from fastapi import FastAPI, HTTPException, Depends, Header, UploadFile, File, Query, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime, timedelta, time as datetime_time
-from database import get_ph_time
-from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, date as date_type, timedelta, time as datetime_time
+from database import get_ph_time, SessionLocal, with_row_ids
+from sqlalchemy.orm import Session, joinedload, raiseload, load_only
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import func, and_, or_, insert, exists, update, case, select, extract, Date
+import os
+import re
 import uuid
 import csv
 import io
+import zlib
+from itertools import chain
 import base64
+import ipaddress
+from urllib.parse import quote
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import asyncio
+import threading
+import time
+from functools import lru_cache
 
 from config import settings
 from database import init_db, get_db, Employee, AttendanceLog, Event, EventParticipant, User, Location, Invitation, Camera, EventCamera
-from face_processor import FaceProcessor
+from face_processor import FaceProcessor, FaceGallery, pack_embeddings, unpack_embeddings, MAX_FACES_PER_EMPLOYEE
 import secrets
-from export_service import ExportService, EventExportService
+from export_service import ExportService, EventExportService, ATTENDANCE_EXPORT_COLUMNS
 from auth_service import AuthService
-from geo_service import GeoService
+from geo_service import GeoService, LocationIndex
 from notification_service import NotificationService
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from camera_stream_service import stream_manager
 from camera_monitoring_service import monitoring_service
 from polling_attendance_service import PollingAttendanceService
 import numpy as np
+import pandas as pd
 from email_service import email_service
+from smtp_pool import smtp_pool
+from response_cache import events_cache, analytics_cache
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+# Started on application startup (see start_log_listener)
+log_listener: Optional[QueueListener] = None
+
+def start_log_listener():
+    """Move the root handlers onto a background thread; request threads only enqueue log records"""
+    global log_listener
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, *logging.root.handlers, respect_handler_level=True)
+    logging.root.handlers = [QueueHandler(log_queue)]
+    log_listener.start()
+
+def stop_log_listener():
+    """Flush queued log records and give the root logger its handlers back"""
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    logging.root.handlers = list(log_listener.handlers)
+    log_listener = None
 
 # Initialize polling attendance service
 polling_service = PollingAttendanceService(get_db)
@@ -51,16 +94,126 @@ app.add_middleware(
 # Initialize face processor
 face_processor = FaceProcessor()
 
+def get_face_gallery(db: Session) -> FaceGallery:
+    """
+    Return the cached embedding gallery of active employees
+
+    The gallery is rebuilt only when the active employee set changes
+    (detected via row count and latest update time).
+    """
+    signature = tuple(db.query(
+        func.count(Employee.id),
+        func.max(Employee.updated_at)
+    ).filter(Employee.is_active == True).one())
+
+    if face_processor.gallery.signature != signature:
+        employees = db.query(
+            Employee.employee_id,
+            Employee.name,
+            Employee.embeddings
+        ).filter(Employee.is_active == True).all()
+        face_processor.load_gallery(employees, signature)
+
+    return face_processor.gallery
+
+# Base URL for registration links in invitation emails and responses
+FRONTEND_URL = getattr(settings, 'FRONTEND_URL', "http://localhost")
+
+# Parses "Late by N minutes" attendance notes
+MINUTES_LATE_RE = re.compile(r'(\d+) minutes')
+
+# Active geofence locations change rarely; cache them between check-ins
+LOCATIONS_CACHE_TTL_SECONDS = 60
+_locations_cache = {"index": None, "expires": 0.0}
+
+def get_active_locations(db: Session) -> LocationIndex:
+    """
+    Return the cached index of active locations, refreshing it when expired
+
+    Location create/update/delete endpoints invalidate the cache immediately.
+    """
+    if _locations_cache["index"] is None or time.monotonic() >= _locations_cache["expires"]:
+        locations = db.query(Location).filter(Location.is_active == True).all()
+        _locations_cache["index"] = LocationIndex(locations)
+        _locations_cache["expires"] = time.monotonic() + LOCATIONS_CACHE_TTL_SECONDS
+
+    return _locations_cache["index"]
+
+def invalidate_locations_cache():
+    """Force the next get_active_locations call to reload from the database"""
+    _locations_cache["index"] = None
+
+# Columns returned by the location create/update endpoints (via INSERT/UPDATE ... RETURNING)
+LOCATION_RESPONSE_COLUMNS = (
+    Location.id,
+    Location.name,
+    Location.address,
+    Location.latitude,
+    Location.longitude,
+    Location.radius_meters,
+    Location.is_active,
+)
+
+# Bounds concurrent face detection/encoding jobs so the thread pool doesn't oversubscribe the CPU/GPU.
+# The asyncio semaphore queues async handlers without tying up threads; the thread semaphore is
+# shared with sync handlers (already running in the thread pool) so the limit holds across both.
+face_processing_semaphore = asyncio.Semaphore(settings.FACE_PROCESSING_WORKERS)
+face_processing_slots = threading.BoundedSemaphore(settings.FACE_PROCESSING_WORKERS)
+
+def run_face_task_sync(func, *args):
+    """
+    Run a blocking face processing call from a sync handler, bounded by the shared worker slots
+
+    Args:
+        func: FaceProcessor / LivenessDetector method to call
+        *args: Positional arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    with face_processing_slots:
+        return func(*args)
+
+async def run_face_task(func, *args):
+    """
+    Run a blocking face processing call in the thread pool
+
+    Args:
+        func: FaceProcessor / LivenessDetector method to call
+        *args: Positional arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    async with face_processing_semaphore:
+        return await run_in_threadpool(run_face_task_sync, func, *args)
+
 # Utility Functions
-def calculate_attendance_status(check_in_time: datetime) -> tuple[str, str]:
+def generate_uuids(count: int) -> List[str]:
     """
-    Calculate attendance status based on check-in time
+    Generate a batch of random (version 4) UUID strings
+
+    Draws all random bytes with a single os.urandom call.
 
     Args:
-        check_in_time: DateTime when employee checked in
+        count: Number of UUIDs to generate
 
     Returns:
-        tuple: (status, notes) where status is on_time/late/half_day
+        List of UUID strings
+    """
+    random_bytes = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=random_bytes[i:i + 16], version=4))
+        for i in range(0, 16 * count, 16)
+    ]
+
+@lru_cache(maxsize=1)
+def get_work_schedule() -> tuple[datetime_time, datetime_time, datetime_time]:
+    """
+    Parse work hour settings once
+
+    Returns:
+        tuple: (work_start, grace_period_end, half_day_cutoff)
     """
     # Parse work start time
     work_start_hour, work_start_min = map(int, settings.WORK_START_TIME.split(':'))
@@ -70,13 +223,27 @@ def calculate_attendance_status(check_in_time: datetime) -> tuple[str, str]:
     half_day_hour, half_day_min = map(int, settings.HALF_DAY_CUTOFF_TIME.split(':'))
     half_day_cutoff = datetime_time(half_day_hour, half_day_min)
 
-    # Get check-in time as time object
-    check_in_time_only = check_in_time.time()
-
     # Calculate grace period end time
     grace_period_end = (datetime.combine(datetime.today(), work_start) +
                        timedelta(minutes=settings.LATE_GRACE_PERIOD_MINUTES)).time()
 
+    return work_start, grace_period_end, half_day_cutoff
+
+def calculate_attendance_status(check_in_time: datetime) -> tuple[str, str]:
+    """
+    Calculate attendance status based on check-in time
+
+    Args:
+        check_in_time: DateTime when employee checked in
+
+    Returns:
+        tuple: (status, notes) where status is on_time/late/half_day
+    """
+    work_start, grace_period_end, half_day_cutoff = get_work_schedule()
+
+    # Get check-in time as time object
+    check_in_time_only = check_in_time.time()
+
     # Determine status
     if check_in_time_only <= grace_period_end:
         return "on_time", None
@@ -94,6 +261,179 @@ def calculate_attendance_status(check_in_time: datetime) -> tuple[str, str]:
         hours_late = (check_in_dt - work_start_dt).total_seconds() / 3600
         return "half_day", f"Arrived {hours_late:.1f} hours late (Half-day)"
 
+def send_late_arrival_email(employee_name: str, employee_email: str, check_in_time: datetime, notes: str):
+    """
+    Send a late arrival notification (run as a background task after check-in)
+
+    Args:
+        employee_name: Employee's name
+        employee_email: Employee's email address
+        check_in_time: Check-in time
+        notes: Attendance notes (e.g. "Late by 25 minutes")
+    """
+    try:
+        # Extract minutes late from notes
+        match = MINUTES_LATE_RE.search(notes)
+        minutes_late = int(match.group(1)) if match else 0
+
+        if minutes_late > 0:
+            NotificationService.send_late_arrival_notification(
+                employee_name=employee_name,
+                employee_email=employee_email,
+                check_in_time=check_in_time,
+                minutes_late=minutes_late
+            )
+    except Exception as email_error:
+        logger.warning("⚠️ Email notification failed (non-critical): %s", email_error)
+
+def add_event_participant(db: Session, event_id: str, employee_id: str, **values) -> None:
+    """
+    Add an employee to an event unless they are already a participant
+
+    Uses INSERT ... ON CONFLICT DO NOTHING (uq_event_participant) where supported,
+    so the check and insert are a single atomic statement.
+
+    Args:
+        db: Database session
+        event_id: Event ID
+        employee_id: Employee ID
+        **values: Extra EventParticipant columns (is_required, status, ...)
+    """
+    row = with_row_ids(db, [{"event_id": event_id, "employee_id": employee_id, **values}])[0]
+    dialect = db.bind.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        db.execute(
+            dialect_insert(EventParticipant).values(**row).on_conflict_do_nothing(
+                index_elements=["event_id", "employee_id"]
+            )
+        )
+        return
+
+    participant_exists = db.query(exists().where(
+        EventParticipant.event_id == event_id,
+        EventParticipant.employee_id == employee_id
+    )).scalar()
+    if not participant_exists:
+        db.add(EventParticipant(**row))
+
+def upsert_event_invitations(
+    db: Session,
+    event_id: str,
+    emails: List[str],
+    expires_at: datetime,
+    created_by: Optional[str]
+) -> Dict[str, str]:
+    """
+    Create or refresh the open invitation for each email to an event
+
+    Uses a single INSERT ... ON CONFLICT (uq_invitation_open_email_event) DO UPDATE
+    where supported: new emails get a fresh token, open invitations keep theirs and
+    only have expires_at pushed out.
+
+    Args:
+        db: Database session
+        event_id: Event ID
+        emails: Invitee emails (duplicates are skipped)
+        expires_at: New expiration time for every invitation
+        created_by: User ID sending the invitations
+
+    Returns:
+        Invitation token for each email
+    """
+    emails = list(dict.fromkeys(emails))  # ON CONFLICT can't touch the same row twice
+    if not emails:
+        return {}
+
+    dialect = db.bind.dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = dialect_insert(Invitation).values([
+            {
+                "id": invitation_id,
+                "email": email,
+                "token": secrets.token_urlsafe(32),
+                "expires_at": expires_at,
+                "event_id": event_id,
+                "created_by": created_by,
+                "is_used": False
+            }
+            for invitation_id, email in zip(generate_uuids(len(emails)), emails)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["email", "event_id"],
+            index_where=Invitation.is_used == False,
+            set_={"expires_at": stmt.excluded.expires_at}
+        ).returning(Invitation.email, Invitation.token)
+        return dict(db.execute(stmt).all())
+
+    # Existing open invitations for these emails (one query)
+    invitation_tokens = {}
+    for invitation in db.query(Invitation).filter(
+        Invitation.email.in_(emails),
+        Invitation.event_id == event_id,
+        Invitation.is_used == False
+    ):
+        invitation.expires_at = expires_at
+        invitation_tokens.setdefault(invitation.email, invitation.token)
+
+    for email in emails:
+        if email not in invitation_tokens:
+            invitation_tokens[email] = secrets.token_urlsafe(32)
+            db.add(Invitation(
+                id=str(uuid.uuid4()),
+                email=email,
+                token=invitation_tokens[email],
+                expires_at=expires_at,
+                event_id=event_id,
+                created_by=created_by,
+                is_used=False
+            ))
+
+    return invitation_tokens
+
+def add_invited_participants(db: Session, event_id: str, employee_ids: List[str]) -> List[str]:
+    """
+    Invite active employees to a new or freshly cleared event
+
+    Existence is checked with one IN query and all participants go in with one INSERT;
+    row ids come from the column's gen_random_uuid() default on PostgreSQL.
+
+    Args:
+        db: Database session
+        event_id: Event ID (must have no participants yet)
+        employee_ids: Requested employee IDs (duplicates and unknown/inactive IDs are skipped)
+
+    Returns:
+        Employee IDs that were added, in request order
+    """
+    requested = list(dict.fromkeys(employee_ids))  # Skip duplicate IDs (uq_event_participant)
+    if not requested:
+        return []
+
+    active_ids = {
+        emp_id for (emp_id,) in db.query(Employee.employee_id).filter(
+            Employee.employee_id.in_(requested),
+            Employee.is_active == True
+        )
+    }
+    added = [emp_id for emp_id in requested if emp_id in active_ids]
+
+    if added:
+        db.execute(insert(EventParticipant), with_row_ids(db, [
+            {
+                "event_id": event_id,
+                "employee_id": emp_id,
+                "is_required": True,
+                "status": "invited"
+            }
+            for emp_id in added
+        ]))
+
+    return added
+
 # Pydantic Models for API
 class DetectRecognizeRequest(BaseModel):
     image: str  # Base64 encoded image
@@ -182,10 +522,11 @@ class ValidateInvitationRequest(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and camera monitoring on startup"""
+    start_log_listener()
     init_db()
-    print("🚀 Face Recognition Backend Started")
-    print(f"📍 API running at: http://{settings.API_HOST}:{settings.API_PORT}")
-    print(f"🔍 Liveness detection: {'✅ Enabled' if settings.ENABLE_LIVENESS else '❌ Disabled'}")
+    logger.info("🚀 Face Recognition Backend Started")
+    logger.info("📍 API running at: http://%s:%s", settings.API_HOST, settings.API_PORT)
+    logger.info("🔍 Liveness detection: %s", '✅ Enabled' if settings.ENABLE_LIVENESS else '❌ Disabled')
 
     # Start event-based camera monitoring (if camera supports event push)
     db = next(get_db())
@@ -195,18 +536,20 @@ async def startup_event():
         db.close()
 
     # Start polling-based attendance monitoring (always works, doesn't rely on camera events)
-    print("\n🔄 Starting polling-based attendance monitoring...")
+    logger.info("🔄 Starting polling-based attendance monitoring...")
     polling_service.start_all()
-    print("✅ Polling service active - will check camera every 3 seconds during active events\n")
+    logger.info("✅ Polling service active - will check camera every 3 seconds during active events")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    print("🛑 Shutting down camera monitoring...")
+    logger.info("🛑 Shutting down camera monitoring...")
     monitoring_service.stop_all_cameras()
     polling_service.stop_all()
     stream_manager.stop_all()
-    print("👋 Face Recognition Backend Stopped")
+    smtp_pool.close_all()
+    logger.info("👋 Face Recognition Backend Stopped")
+    stop_log_listener()
 
 @app.get("/")
 async def root():
@@ -258,7 +601,7 @@ async def get_current_user(authorization: Optional[str] = Header(None), db: Sess
 
         # Get user from database
         user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
 
         if not user or not user.is_active:
             raise HTTPException(status_code=401, detail="User not found or inactive")
@@ -304,7 +647,7 @@ async def get_current_user_from_token_or_query(
 
         # Get user from database
         user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
 
         if not user or not user.is_active:
             raise HTTPException(status_code=401, detail="User not found or inactive")
@@ -372,7 +715,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Login error: {e}")
+        logger.error("Login error: %s", e)
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 @app.post("/api/auth/register")
@@ -382,10 +725,10 @@ async def register_first_admin(request: CreateUserRequest, db: Session = Depends
     For creating additional users, use /api/users endpoint with admin role
     """
     try:
-        # Check if any users exist
-        existing_users = db.query(User).count()
+        # Check if any users exist (stops at the first row instead of counting them all)
+        users_exist = db.scalar(select(User.id).limit(1)) is not None
 
-        if existing_users > 0:
+        if users_exist:
             raise HTTPException(
                 status_code=403,
                 detail="Registration disabled. First admin already exists. Use /api/users to create new users."
@@ -430,7 +773,7 @@ async def register_first_admin(request: CreateUserRequest, db: Session = Depends
         raise
     except Exception as e:
         db.rollback()
-        print(f"Registration error: {e}")
+        logger.error("Registration error: %s", e)
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @app.get("/api/auth/me")
@@ -459,18 +802,23 @@ async def get_all_users(
     Get all users (requires manager or admin role)
     """
     try:
-        users = db.query(User).all()
+        # Only the listed columns (password hashes never leave the database)
+        statement = select(
+            User.id,
+            User.username,
+            User.email,
+            User.full_name,
+            User.role,
+            User.is_active,
+            User.created_at,
+            User.last_login
+        )
 
         users_data = [{
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "full_name": user.full_name,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None,
-            "last_login": user.last_login.isoformat() if user.last_login else None
-        } for user in users]
+            **row,
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "last_login": row["last_login"].isoformat() if row["last_login"] else None
+        } for row in db.execute(statement).mappings()]
 
         return {
             "success": True,
@@ -481,7 +829,7 @@ async def get_all_users(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching users: {e}")
+        logger.error("Error fetching users: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
 
 @app.post("/api/users")
@@ -542,7 +890,7 @@ async def create_user(
         raise
     except Exception as e:
         db.rollback()
-        print(f"Error creating user: {e}")
+        logger.error("Error creating user: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
 @app.put("/api/users/{user_id}")
@@ -556,7 +904,7 @@ async def update_user(
     Update a user (requires admin role)
     """
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -606,7 +954,7 @@ async def update_user(
         raise
     except Exception as e:
         db.rollback()
-        print(f"Error updating user: {e}")
+        logger.error("Error updating user: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
 
 @app.delete("/api/users/{user_id}")
@@ -624,7 +972,7 @@ async def delete_user(
         if user_id == current_user.id:
             raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -640,7 +988,7 @@ async def delete_user(
         raise
     except Exception as e:
         db.rollback()
-        print(f"Error deleting user: {e}")
+        logger.error("Error deleting user: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
 
 # ========================================
@@ -664,98 +1012,101 @@ async def detect_and_recognize(
         List of detected faces with recognition results
     """
     try:
-        print("\n" + "="*60)
-        print("🔍 Processing detection request...")
-        print(f"📊 Image length: {len(request.image)} characters")
-        print(f"📊 Image preview: {request.image[:100]}...")
+        logger.debug("🔍 Processing detection request (%d characters)", len(request.image))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📊 Image preview: %s...", request.image[:100])
 
-        # DEBUG: Test image decoding
+        # Decode image once; the array is reused for recognition
         try:
-            test_decode = face_processor.decode_base64_image(request.image)
-            print(f"✅ Image decoded successfully: shape={test_decode.shape}, dtype={test_decode.dtype}")
+            image = await run_face_task(face_processor.decode_base64_image, request.image)
+            logger.debug("✅ Image decoded successfully: shape=%s, dtype=%s", image.shape, image.dtype)
         except Exception as decode_error:
-            print(f"❌ Image decoding failed: {decode_error}")
+            logger.warning("❌ Image decoding failed: %s", decode_error)
             return {"faces": []}
 
-        # Get all employees from database
-        employees = db.query(Employee).filter(Employee.is_active == True).all()
+        # Get packed employee embeddings (cached between requests)
+        gallery = get_face_gallery(db)
 
-        if not employees:
-            print("⚠️ No employees in database")
-            print("="*60 + "\n")
+        if not len(gallery):
+            logger.debug("⚠️ No employees in database")
             return {"faces": []}
 
-        # Prepare employee embeddings
-        employee_data = [
-            (emp.employee_id, emp.name, emp.embeddings)
-            for emp in employees
-        ]
-
-        print(f"📋 Found {len(employee_data)} employee(s) in database")
+        logger.debug("📋 Found %d employee(s) in database", len(gallery))
 
         # Process image
-        print("🔄 Starting face detection and recognition...")
-        results = face_processor.process_image_for_recognition(
-            request.image,
-            employee_data
+        results = await run_face_task(
+            face_processor.recognize_faces_in_image,
+            image,
+            gallery
         )
 
-        print(f"📊 Detection results: {len(results)} face(s) found")
-        if results:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📊 Detection results: %d face(s) found", len(results))
             for idx, face in enumerate(results):
-                print(f"   Face {idx+1}: {face['name']} (Live: {face['isLive']})")
+                logger.debug("   Face %d: %s (Live: %s)", idx + 1, face['name'], face['isLive'])
+
+        # Find recognized live faces that already have attendance within the cooldown (one query)
+        candidate_ids = {
+            face['employeeId'] for face in results
+            if face['name'] != 'Unknown' and face['isLive']
+        }
+        recently_marked = set()
+        if candidate_ids:
+            now = get_ph_time()
+            cooldown = timedelta(minutes=settings.ATTENDANCE_COOLDOWN_MINUTES)
+            recently_marked = {
+                emp_id for (emp_id,) in db.query(AttendanceLog.employee_id).filter(
+                    AttendanceLog.employee_id.in_(candidate_ids),
+                    AttendanceLog.timestamp > now - cooldown
+                ).distinct()
+            }
+
+            # Calculate attendance status (on_time, late, half_day) once for this frame
+            status, notes = calculate_attendance_status(now)
 
         # Mark attendance for recognized live faces
+        new_logs = []
         for face in results:
             if face['name'] != 'Unknown' and face['isLive']:
                 employee_id = face['employeeId']
 
-                # Check if already marked attendance recently (cooldown)
-                cooldown = timedelta(minutes=settings.ATTENDANCE_COOLDOWN_MINUTES)
-                recent_attendance = db.query(AttendanceLog).filter(
-                    AttendanceLog.employee_id == employee_id,
-                    AttendanceLog.timestamp > get_ph_time() - cooldown
-                ).first()
-
-                if not recent_attendance:
-                    # Calculate attendance status (on_time, late, half_day)
-                    current_time = get_ph_time()
-                    status, notes = calculate_attendance_status(current_time)
-
+                if employee_id not in recently_marked:
                     # Mark new attendance
-                    attendance = AttendanceLog(
-                        id=str(uuid.uuid4()),
-                        employee_id=employee_id,
-                        confidence=f"{face['confidence']:.2f}",
-                        method="face_recognition",
-                        event_id=event_id if event_id else None,
-                        status=status,
-                        notes=notes
-                    )
-                    db.add(attendance)
-                    db.commit()
+                    new_logs.append({
+                        "employee_id": employee_id,
+                        "timestamp": now,
+                        "confidence": f"{face['confidence']:.2f}",
+                        "method": "face_recognition",
+                        "event_id": event_id if event_id else None,
+                        "status": status,
+                        "notes": notes
+                    })
+                    recently_marked.add(employee_id)
 
-                    status_emoji = "✅" if status == "on_time" else "⚠️" if status == "late" else "🕐"
-                    status_msg = f" [{status.upper()}" + (f": {notes}" if notes else "") + "]"
-                    print(f"{status_emoji} Attendance marked for: {face['name']} ({employee_id}){status_msg}" + (f" - Event: {event_id}" if event_id else ""))
+                    logger.info(
+                        "✅ Attendance marked for: %s (%s) [%s] %s event=%s",
+                        face['name'], employee_id, status.upper(), notes or "", event_id
+                    )
                     face['attendanceMarked'] = True
                     face['attendanceStatus'] = status
                 else:
-                    print(f"ℹ️ Attendance already marked recently for: {face['name']}")
+                    logger.debug("ℹ️ Attendance already marked recently for: %s", face['name'])
                     face['attendanceMarked'] = False
             else:
                 face['attendanceMarked'] = False
 
-        print(f"✅ Processed {len(results)} face(s)")
-        print("="*60 + "\n")
+        if new_logs:
+            # One executemany INSERT; ids come from gen_random_uuid() on PostgreSQL
+            db.execute(insert(AttendanceLog), with_row_ids(db, new_logs))
+            db.commit()
+            analytics_cache.invalidate()
+
+        logger.debug("✅ Processed %d face(s)", len(results))
 
         return {"faces": results}
 
     except Exception as e:
-        print(f"❌ Error in detect-recognize: {e}")
-        import traceback
-        traceback.print_exc()
-        print("="*60 + "\n")
+        logger.error("❌ Error in detect-recognize: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/employees/register-with-image")
@@ -773,7 +1124,7 @@ async def register_employee_with_image(
         Registration result
     """
     try:
-        print(f"\n📝 Registering employee: {request.name}")
+        logger.debug("📝 Registering employee: %s", request.name)
 
         # Check if employee ID already exists
         existing = db.query(Employee).filter(
@@ -786,8 +1137,14 @@ async def register_employee_with_image(
                 detail=f"Employee ID {request.employeeId} already exists"
             )
 
+        # Decode image once for embedding and liveness check
+        try:
+            image = await run_face_task(face_processor.decode_base64_image, request.image)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # Generate face embedding
-        embedding, face_location = face_processor.generate_face_embedding(request.image)
+        embedding, face_location = await run_face_task(face_processor.generate_face_embedding_from_image, image)
 
         if embedding is None:
             raise HTTPException(
@@ -796,19 +1153,19 @@ async def register_employee_with_image(
             )
 
         # SECURITY: Check liveness to prevent photo registration
-        # Decode image for liveness check
-        image = face_processor.decode_base64_image(request.image)
         face_crop = face_processor.extract_face_crop(image, face_location)
-        is_live, liveness_confidence, liveness_method = face_processor.liveness_detector.check_liveness(face_crop)
+        is_live, liveness_confidence, liveness_method = await run_face_task(
+            face_processor.liveness_detector.check_liveness, face_crop
+        )
 
         if not is_live:
-            print(f"❌ Registration rejected: Photo/screen detected (confidence: {liveness_confidence:.3f})")
+            logger.warning("❌ Registration rejected: Photo/screen detected (confidence: %.3f)", liveness_confidence)
             raise HTTPException(
                 status_code=400,
                 detail=f"Liveness check failed. Please use a live camera, not a photo or screen. (Score: {liveness_confidence:.2f})"
             )
 
-        print(f"✅ Liveness check passed (confidence: {liveness_confidence:.3f})")
+        logger.debug("✅ Liveness check passed (confidence: %.3f)", liveness_confidence)
 
         # Create new employee with QR code token
         employee = Employee(
@@ -819,7 +1176,7 @@ async def register_employee_with_image(
             employee_id=request.employeeId,
             department=request.department,
             email=request.email,
-            embeddings=embedding,
+            embeddings=pack_embeddings(embedding),
             qr_code_token=str(uuid.uuid4()),  # Generate QR code token for attendance
             is_active=True
         )
@@ -828,11 +1185,11 @@ async def register_employee_with_image(
         db.commit()
         db.refresh(employee)
 
-        print(f"✅ Employee registered successfully: {request.name} ({request.employeeId})")
+        logger.info("✅ Employee registered successfully: %s (%s)", request.name, request.employeeId)
 
         # Reload faces for camera monitoring
         monitoring_service.reload_all_faces()
-        print(f"🔄 Face encodings reloaded for monitored cameras")
+        logger.debug("🔄 Face encodings reloaded for monitored cameras")
 
         return {
             "success": True,
@@ -848,7 +1205,7 @@ async def register_employee_with_image(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Registration error: {e}")
+        logger.error("❌ Registration error: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -867,10 +1224,10 @@ async def match_employee(
         Match result
     """
     try:
-        # Get all employees
-        employees = db.query(Employee).filter(Employee.is_active == True).all()
+        # Get packed employee embeddings (cached between requests)
+        gallery = get_face_gallery(db)
 
-        if not employees:
+        if not len(gallery):
             return {
                 "match": {
                     "isMatch": False,
@@ -879,28 +1236,18 @@ async def match_employee(
                 }
             }
 
-        # Prepare embeddings
-        employee_embeddings = [
-            (emp.employee_id, emp.embeddings)
-            for emp in employees
-        ]
-
         # Match face
-        import numpy as np
-        face_encoding = np.array(request.embedding)
-        match_result = face_processor.match_face(face_encoding, employee_embeddings)
+        face_encoding = np.asarray(request.embedding, dtype=np.float32)
+        match_result = face_processor.match_face(face_encoding, gallery)
 
         if match_result:
             employee_id, confidence = match_result
-            employee = db.query(Employee).filter(
-                Employee.employee_id == employee_id
-            ).first()
 
             return {
                 "match": {
                     "isMatch": True,
-                    "name": employee.name,
-                    "employeeId": employee.employee_id,
+                    "name": gallery.names_by_id[employee_id],
+                    "employeeId": employee_id,
                     "score": confidence
                 }
             }
@@ -914,10 +1261,10 @@ async def match_employee(
         }
 
     except Exception as e:
-        print(f"❌ Match error: {e}")
+        logger.error("❌ Match error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/employees")
+@app.get("/api/employees", response_class=ORJSONResponse)
 async def get_all_employees(
     search: Optional[str] = None,
     department: Optional[str] = None,
@@ -936,40 +1283,34 @@ async def get_all_employees(
         List of employees
     """
     try:
-        query = db.query(Employee).filter(Employee.is_active == True)
+        # Select response columns directly (no ORM object hydration)
+        query = db.query(
+            Employee.id,
+            Employee.name,
+            Employee.firstname,
+            Employee.lastname,
+            Employee.employee_id.label("employeeId"),
+            func.coalesce(Employee.department, "").label("department"),
+            func.coalesce(Employee.email, "").label("email"),
+            Employee.created_at.label("createdAt")
+        ).filter(Employee.is_active == True)
 
         # Filter by department
         if department:
             query = query.filter(Employee.department == department)
 
-        employees = query.limit(limit).all()
-
-        # Build response
-        employees_data = [
-            {
-                "id": emp.id,
-                "name": emp.name,
-                "firstname": emp.firstname,
-                "lastname": emp.lastname,
-                "employeeId": emp.employee_id,
-                "department": emp.department or "",
-                "email": emp.email or "",
-                "createdAt": emp.created_at.isoformat()
-            }
-            for emp in employees
-        ]
-
-        # Apply search filter
+        # Search by name, employee ID, email or department (case-insensitive, in SQL)
         if search:
-            search_lower = search.lower()
-            employees_data = [
-                emp for emp in employees_data
-                if (search_lower in emp['name'].lower() or
-                    search_lower in emp['employeeId'].lower() or
-                    search_lower in emp['email'].lower() or
-                    search_lower in (emp['department'] or '').lower())
-            ]
+            query = query.filter(or_(
+                Employee.name.icontains(search, autoescape=True),
+                Employee.employee_id.icontains(search, autoescape=True),
+                Employee.email.icontains(search, autoescape=True),
+                Employee.department.icontains(search, autoescape=True)
+            ))
+
+        employees_data = [row._asdict() for row in query.limit(limit).all()]
 
+        # Plain column rows; the route's ORJSONResponse encodes them
         return {
             "success": True,
             "count": len(employees_data),
@@ -978,7 +1319,7 @@ async def get_all_employees(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/attendance")
+@app.get("/api/attendance", response_class=ORJSONResponse)
 async def get_attendance_logs(
     date: Optional[str] = None,
     employee_id: Optional[str] = None,
@@ -1007,7 +1348,19 @@ async def get_attendance_logs(
         List of attendance logs
     """
     try:
-        query = db.query(AttendanceLog)
+        # Select response columns directly, joining employee names in the same query
+        query = db.query(
+            AttendanceLog.id,
+            AttendanceLog.employee_id.label("employeeId"),
+            func.coalesce(Employee.name, "Unknown").label("employeeName"),
+            AttendanceLog.timestamp,
+            AttendanceLog.confidence,
+            AttendanceLog.method,
+            func.coalesce(AttendanceLog.status, "on_time").label("status"),
+            func.coalesce(AttendanceLog.notes, "").label("notes")
+        ).outerjoin(
+            Employee, Employee.employee_id == AttendanceLog.employee_id
+        )
 
         # Apply date filters
         if date:
@@ -1037,39 +1390,18 @@ async def get_attendance_logs(
         if method:
             query = query.filter(AttendanceLog.method == method)
 
+        # Search by employee name or ID (case-insensitive, in SQL)
+        if search:
+            query = query.filter(or_(
+                Employee.name.icontains(search, autoescape=True),
+                AttendanceLog.employee_id.icontains(search, autoescape=True)
+            ))
+
         # Get logs
         logs = query.order_by(AttendanceLog.timestamp.desc()).limit(limit).all()
+        logs_data = [row._asdict() for row in logs]
 
-        # Get employee details
-        employee_ids = list(set([log.employee_id for log in logs]))
-        employees = db.query(Employee).filter(
-            Employee.employee_id.in_(employee_ids)
-        ).all()
-        employee_map = {emp.employee_id: emp for emp in employees}
-
-        # Build response with all details
-        logs_data = [
-            {
-                "id": log.id,
-                "employeeId": log.employee_id,
-                "employeeName": employee_map.get(log.employee_id).name if log.employee_id in employee_map else "Unknown",
-                "timestamp": log.timestamp.isoformat(),
-                "confidence": log.confidence,
-                "method": log.method,
-                "status": log.status or "on_time",
-                "notes": log.notes or ""
-            }
-            for log in logs
-        ]
-
-        # Apply search filter on employee name or ID
-        if search:
-            search_lower = search.lower()
-            logs_data = [
-                log for log in logs_data
-                if search_lower in log['employeeName'].lower() or search_lower in log['employeeId'].lower()
-            ]
-
+        # Plain column rows; the route's ORJSONResponse encodes them
         return {
             "success": True,
             "count": len(logs_data),
@@ -1109,6 +1441,36 @@ async def delete_employee(employee_id: str, db: Session = Depends(get_db)):
 # BULK OPERATIONS & MULTI-FACE REGISTRATION
 # ========================================
 
+BULK_IMPORT_TEMPLATE_ROWS = [
+    ['employee_id', 'name', 'email', 'department', 'position', 'phone', 'address'],
+    ['EMP001', 'John Doe', 'john.doe@company.com', 'Engineering', 'Software Engineer', '+1234567890', '123 Main St, City, Country'],
+    ['EMP002', 'Jane Smith', 'jane.smith@company.com', 'Marketing', 'Marketing Manager', '+0987654321', '456 Oak Ave, City, Country'],
+]
+
+
+CSV_STREAM_CHUNK_ROWS = 500
+
+def iter_csv_rows(rows):
+    """Yield CSV-encoded rows in chunks of CSV_STREAM_CHUNK_ROWS lines"""
+    buffer = io.StringIO()
+    # Bound methods hoisted out of the per-row loop
+    writerow = csv.writer(buffer).writerow
+    getvalue, seek, truncate = buffer.getvalue, buffer.seek, buffer.truncate
+
+    pending = 0
+    for row in rows:
+        writerow(row)
+        pending += 1
+        if pending == CSV_STREAM_CHUNK_ROWS:
+            yield getvalue().encode()
+            seek(0)
+            truncate(0)
+            pending = 0
+
+    if pending:
+        yield getvalue().encode()
+
+
 @app.get("/api/employees/bulk-import/template")
 async def download_bulk_import_template():
     """
@@ -1117,48 +1479,8 @@ async def download_bulk_import_template():
     Returns a CSV file with required columns for importing employees
     """
     try:
-        # Create CSV template in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header row
-        writer.writerow([
-            'employee_id',
-            'name',
-            'email',
-            'department',
-            'position',
-            'phone',
-            'address'
-        ])
-
-        # Write example row
-        writer.writerow([
-            'EMP001',
-            'John Doe',
-            'john.doe@company.com',
-            'Engineering',
-            'Software Engineer',
-            '+1234567890',
-            '123 Main St, City, Country'
-        ])
-
-        # Write another example
-        writer.writerow([
-            'EMP002',
-            'Jane Smith',
-            'jane.smith@company.com',
-            'Marketing',
-            'Marketing Manager',
-            '+0987654321',
-            '456 Oak Ave, City, Country'
-        ])
-
-        # Get CSV content
-        output.seek(0)
-
         return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
+            iter_csv_rows(BULK_IMPORT_TEMPLATE_ROWS),
             media_type="text/csv",
             headers={
                 "Content-Disposition": "attachment; filename=employee_import_template.csv"
@@ -1173,6 +1495,107 @@ class BulkImportRequest(BaseModel):
     csv_data: str  # Base64 encoded CSV content
 
 
+def import_employees_from_csv(csv_source, db: Session) -> dict:
+    """
+    Create employees from CSV content
+
+    Args:
+        csv_source: Binary file-like object with the CSV content
+        db: Database session
+
+    Returns:
+        Bulk import result summary
+    """
+    try:
+        df = pd.read_csv(csv_source, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV data: {str(e)}")
+
+    # Validate required columns
+    required_columns = ['employee_id', 'name', 'email']
+    if not all(col in df.columns for col in required_columns):
+        raise HTTPException(
+            status_code=400,
+            detail=f"CSV must contain columns: {', '.join(required_columns)}"
+        )
+
+    df = df.apply(lambda col: col.str.strip())
+    for col in ('department', 'firstname', 'lastname'):
+        if col not in df.columns:
+            df[col] = ''
+
+    # Validate required fields, then drop IDs that exist in the database or earlier in the file
+    missing = (df['employee_id'] == '') | (df['name'] == '')
+    candidate_ids = set(df.loc[~missing, 'employee_id'])
+    existing_ids = {
+        emp_id for (emp_id,) in db.query(Employee.employee_id).filter(
+            Employee.employee_id.in_(candidate_ids)
+        )
+    } if candidate_ids else set()
+    duplicate = ~missing & (
+        df['employee_id'].isin(existing_ids) | df['employee_id'].where(~missing).duplicated()
+    )
+
+    errors = []
+    for row_num, employee_id, is_missing in zip(
+        df.index[missing | duplicate] + 2,  # Row 1 is the header
+        df.loc[missing | duplicate, 'employee_id'],
+        missing[missing | duplicate]
+    ):
+        if is_missing:
+            errors.append(f"Row {row_num}: Missing employee_id or name")
+        else:
+            errors.append(f"Row {row_num}: Employee ID '{employee_id}' already exists")
+
+    new_rows = df[~(missing | duplicate)]
+
+    # Split names for rows without explicit first/last names
+    name_parts = new_rows['name'].str.split(n=1)
+    firstnames = new_rows['firstname'].where(new_rows['firstname'] != '', name_parts.str[0])
+    lastnames = new_rows['lastname'].where(new_rows['lastname'] != '', name_parts.str[1].fillna(''))
+
+    # Create new employees (without face encodings - must be added later)
+    now = get_ph_time()
+    employee_ids = generate_uuids(len(new_rows))
+    records = [
+        {
+            "id": row_id,
+            "employee_id": employee_id,
+            "name": name,
+            "firstname": firstname,
+            "lastname": lastname,
+            "email": email or None,
+            "department": department or None,
+            "embeddings": b"",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        }
+        for row_id, employee_id, name, firstname, lastname, email, department in zip(
+            employee_ids, new_rows['employee_id'], new_rows['name'], firstnames, lastnames,
+            new_rows['email'], new_rows['department']
+        )
+    ]
+
+    # Insert all successful rows in one statement
+    try:
+        if records:
+            db.execute(insert(Employee), records)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    return {
+        "success": True,
+        "message": f"Bulk import completed",
+        "imported_count": len(records),
+        "skipped_count": len(errors),
+        "errors": errors[:20],  # Limit to first 20 errors
+        "note": "Face images must be added separately for each employee via registration"
+    }
+
+
 @app.post("/api/employees/bulk-import")
 async def bulk_import_employees(
     request: BulkImportRequest,
@@ -1192,84 +1615,37 @@ async def bulk_import_employees(
 
         # Decode CSV data
         try:
-            csv_content = base64.b64decode(request.csv_data).decode('utf-8')
+            csv_content = base64.b64decode(request.csv_data)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid CSV data encoding: {str(e)}")
 
-        # Parse CSV
-        csv_file = io.StringIO(csv_content)
-        reader = csv.DictReader(csv_file)
-
-        # Validate required columns
-        required_columns = ['employee_id', 'name', 'email']
-        if not all(col in reader.fieldnames for col in required_columns):
-            raise HTTPException(
-                status_code=400,
-                detail=f"CSV must contain columns: {', '.join(required_columns)}"
-            )
+        return import_employees_from_csv(io.BytesIO(csv_content), db)
 
-        imported_count = 0
-        skipped_count = 0
-        errors = []
-
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-            try:
-                employee_id = row.get('employee_id', '').strip()
-                name = row.get('name', '').strip()
-                email = row.get('email', '').strip()
-
-                # Validate required fields
-                if not employee_id or not name:
-                    errors.append(f"Row {row_num}: Missing employee_id or name")
-                    skipped_count += 1
-                    continue
-
-                # Check if employee already exists
-                existing = db.query(Employee).filter(
-                    Employee.employee_id == employee_id
-                ).first()
-
-                if existing:
-                    errors.append(f"Row {row_num}: Employee ID '{employee_id}' already exists")
-                    skipped_count += 1
-                    continue
-
-                # Create new employee (without face encoding - must be added later)
-                new_employee = Employee(
-                    employee_id=employee_id,
-                    name=name,
-                    email=email or None,
-                    department=row.get('department', '').strip() or None,
-                    position=row.get('position', '').strip() or None,
-                    phone=row.get('phone', '').strip() or None,
-                    address=row.get('address', '').strip() or None,
-                    is_active=True,
-                    created_at=get_ph_time()
-                )
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Bulk import failed: {str(e)}")
 
-                db.add(new_employee)
-                imported_count += 1
 
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                skipped_count += 1
-                continue
+@app.post("/api/employees/bulk-import-file")
+async def bulk_import_employees_file(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import employees from an uploaded CSV file
 
-        # Commit all successful imports
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    Same columns as /api/employees/bulk-import, but sent as multipart/form-data
+    so the CSV is parsed straight from the upload without Base64 decoding.
+    """
+    try:
+        # Check admin/manager permission
+        if not AuthService.check_permission(current_user.role, "manager"):
+            raise HTTPException(status_code=403, detail="Manager or Admin access required")
 
-        return {
-            "success": True,
-            "message": f"Bulk import completed",
-            "imported_count": imported_count,
-            "skipped_count": skipped_count,
-            "errors": errors[:20],  # Limit to first 20 errors
-            "note": "Face images must be added separately for each employee via registration"
-        }
+        return import_employees_from_csv(file.file, db)
 
     except HTTPException:
         raise
@@ -1299,22 +1675,21 @@ async def bulk_delete_employees(
         if not request.employee_ids:
             raise HTTPException(status_code=400, detail="No employee IDs provided")
 
-        deleted_count = 0
-        not_found = []
-
-        for employee_id in request.employee_ids:
-            employee = db.query(Employee).filter(
-                Employee.employee_id == employee_id
-            ).first()
-
-            if employee:
-                employee.is_active = False
-                deleted_count += 1
-            else:
-                not_found.append(employee_id)
+        # Find which of the requested employees exist, then deactivate them in one UPDATE
+        found_ids = {
+            emp_id for (emp_id,) in db.query(Employee.employee_id).filter(
+                Employee.employee_id.in_(request.employee_ids)
+            )
+        }
+        not_found = [emp_id for emp_id in request.employee_ids if emp_id not in found_ids]
 
+        db.query(Employee).filter(
+            Employee.employee_id.in_(found_ids)
+        ).update({Employee.is_active: False}, synchronize_session=False)
         db.commit()
 
+        deleted_count = len(found_ids)
+
         return {
             "success": True,
             "message": f"Bulk delete completed",
@@ -1379,44 +1754,20 @@ async def add_face_to_employee(
                     detail=result.get('message', 'Face processing failed')
                 )
 
-            new_encoding = result['encoding']
-
-            # Merge with existing encodings
-            if employee.face_encoding:
-                try:
-                    # Parse existing encoding
-                    import json
-                    existing_encodings = json.loads(employee.face_encoding)
+            new_encoding = np.asarray(result['encoding'], dtype=np.float32)
 
-                    # If it's a single encoding (old format), convert to array
-                    if isinstance(existing_encodings, list) and len(existing_encodings) == 128:
-                        existing_encodings = [existing_encodings]
-
-                    # Add new encoding
-                    existing_encodings.append(new_encoding)
-
-                    # Limit to 5 encodings per person
-                    if len(existing_encodings) > 5:
-                        existing_encodings = existing_encodings[-5:]
-
-                    # Save updated encodings
-                    employee.face_encoding = json.dumps(existing_encodings)
-
-                except Exception as e:
-                    # If parsing fails, replace with new encoding
-                    employee.face_encoding = json.dumps([new_encoding])
+            # Merge with existing encodings, keeping the most recent faces
+            if employee.embeddings:
+                encodings = np.vstack([unpack_embeddings(employee.embeddings), new_encoding])
             else:
-                # No existing encoding, save as array
-                import json
-                employee.face_encoding = json.dumps([new_encoding])
+                encodings = new_encoding.reshape(1, -1)
+            encodings = encodings[-MAX_FACES_PER_EMPLOYEE:]
 
+            employee.embeddings = pack_embeddings(encodings)
             employee.updated_at = get_ph_time()
             db.commit()
 
-            # Count total encodings
-            import json
-            encodings = json.loads(employee.face_encoding)
-            face_count = len(encodings) if isinstance(encodings[0], list) else 1
+            face_count = len(encodings)
 
             return {
                 "success": True,
@@ -1457,43 +1808,14 @@ async def get_employee_face_count(
         if not employee:
             raise HTTPException(status_code=404, detail="Employee not found")
 
-        if not employee.face_encoding:
-            return {
-                "success": True,
-                "employee_id": employee_id,
-                "face_count": 0,
-                "has_faces": False
-            }
-
-        try:
-            import json
-            encodings = json.loads(employee.face_encoding)
-
-            # Check if it's multiple encodings or single encoding
-            if isinstance(encodings, list):
-                if len(encodings) > 0 and isinstance(encodings[0], list):
-                    # Multiple encodings (array of arrays)
-                    face_count = len(encodings)
-                else:
-                    # Single encoding (flat array)
-                    face_count = 1
-            else:
-                face_count = 1
+        face_count = len(unpack_embeddings(employee.embeddings)) if employee.embeddings else 0
 
-            return {
-                "success": True,
-                "employee_id": employee_id,
-                "face_count": face_count,
-                "has_faces": face_count > 0
-            }
-
-        except Exception:
-            return {
-                "success": True,
-                "employee_id": employee_id,
-                "face_count": 1,
-                "has_faces": True
-            }
+        return {
+            "success": True,
+            "employee_id": employee_id,
+            "face_count": face_count,
+            "has_faces": face_count > 0
+        }
 
     except HTTPException:
         raise
@@ -1504,44 +1826,52 @@ async def get_employee_face_count(
 # QR CODE ATTENDANCE
 # ========================================
 
-@app.get("/api/employees/{employee_id}/qr-code")
-async def get_employee_qr_code(employee_id: str, db: Session = Depends(get_db)):
+# QR code and online registration endpoints use the blocking DB session, so they are
+# plain `def` handlers: FastAPI runs them in its thread pool instead of on the event loop.
+@app.get("/api/employees/{employee_id}/qr-code", response_class=ORJSONResponse)
+def get_employee_qr_code(employee_id: str, db: Session = Depends(get_db)):
     """
     Get or generate QR code token for an employee
 
     Returns a unique token that can be encoded in a QR code
     """
     try:
-        employee = db.query(Employee).filter(
-            Employee.employee_id == employee_id,
-            Employee.is_active == True
+        # Fetch the token, generating one if it doesn't exist, in a single UPDATE ... RETURNING.
+        # COALESCE keeps an existing token, so concurrent first-time fetches agree on one value.
+        has_token = Employee.qr_code_token.isnot(None)
+        row = db.execute(
+            update(Employee)
+            .where(Employee.employee_id == employee_id, Employee.is_active == True)
+            .values(
+                qr_code_token=func.coalesce(Employee.qr_code_token, str(uuid.uuid4())),
+                updated_at=case((has_token, Employee.updated_at), else_=get_ph_time())
+            )
+            .returning(Employee.employee_id, Employee.name, Employee.qr_code_token)
+            .execution_options(synchronize_session=False)
         ).first()
+        db.commit()
 
-        if not employee:
+        if not row:
             raise HTTPException(status_code=404, detail="Employee not found")
 
-        # Generate QR code token if it doesn't exist
-        if not employee.qr_code_token:
-            employee.qr_code_token = str(uuid.uuid4())
-            db.commit()
-            db.refresh(employee)
-
         return {
             "success": True,
-            "employee_id": employee.employee_id,
-            "employee_name": employee.name,
-            "qr_token": employee.qr_code_token,
-            "qr_data": f"ATTENDANCE:{employee.qr_code_token}"  # Format for QR code
+            "employee_id": row.employee_id,
+            "employee_name": row.name,
+            "qr_token": row.qr_code_token,
+            "qr_data": f"ATTENDANCE:{row.qr_code_token}"  # Format for QR code
         }
 
     except HTTPException:
         raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/attendance/qr-check-in")
-async def qr_code_check_in(
+@app.post("/api/attendance/qr-check-in", response_class=ORJSONResponse)
+def qr_code_check_in(
     qr_token: str,
+    background_tasks: BackgroundTasks,
     event_id: Optional[str] = None,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
@@ -1557,25 +1887,40 @@ async def qr_code_check_in(
         longitude: Optional GPS longitude for location verification
     """
     try:
-        # Find employee by QR token
-        employee = db.query(Employee).filter(
-            Employee.qr_code_token == qr_token,
-            Employee.is_active == True
-        ).first()
-
-        if not employee:
+        # QR tokens are random UUIDs; reject anything else before it reaches the UUID column.
+        # The lookup below is a probe on the unique qr_code_token index, the same cost as a
+        # lookup by employee_id, and per-employee random tokens are what lets regenerate-qr
+        # revoke a single leaked code (a stateless HMAC(employee_id) token could not).
+        try:
+            uuid.UUID(qr_token)
+        except ValueError:
             raise HTTPException(status_code=404, detail="Invalid QR code or employee not found")
 
-        # Check cooldown period (prevent duplicate check-ins)
+        # One timestamp for the whole request (cooldown window and check-in time)
+        now = get_ph_time()
+
+        # Cooldown period (prevent duplicate check-ins)
         cooldown_minutes = settings.ATTENDANCE_COOLDOWN_MINUTES
-        cooldown_time = get_ph_time() - timedelta(minutes=cooldown_minutes)
+        cooldown_time = now - timedelta(minutes=cooldown_minutes)
 
-        recent_log = db.query(AttendanceLog).filter(
-            AttendanceLog.employee_id == employee.employee_id,
+        # Find employee by QR token and whether they checked in inside the cooldown (one query).
+        # EXISTS stops at the first matching log (ix_attendance_emp_ts) instead of aggregating.
+        has_recent = exists().where(
+            AttendanceLog.employee_id == Employee.employee_id,
             AttendanceLog.timestamp >= cooldown_time
+        ).correlate(Employee)
+
+        row = db.query(Employee, has_recent.label("has_recent")).filter(
+            Employee.qr_code_token == qr_token,
+            Employee.is_active == True
         ).first()
 
-        if recent_log and not event_id:
+        if not row:
+            raise HTTPException(status_code=404, detail="Invalid QR code or employee not found")
+
+        employee, recent_check_in = row
+
+        if recent_check_in and not event_id:
             raise HTTPException(
                 status_code=400,
                 detail=f"Attendance already recorded. Please wait {cooldown_minutes} minutes before checking in again."
@@ -1590,81 +1935,74 @@ async def qr_code_check_in(
             if not GeoService.validate_coordinates(latitude, longitude):
                 raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
 
-            # Get all active locations
-            allowed_locations = db.query(Location).filter(Location.is_active == True).all()
+            # Get all active locations (cached)
+            allowed_locations = get_active_locations(db)
 
             # Verify location
             location_verified, distance_from_office, nearest_location = GeoService.verify_location(
                 latitude, longitude, allowed_locations
             )
 
-            print(f"📍 GPS Verification: verified={location_verified}, distance={distance_from_office}m, nearest={nearest_location}")
+            logger.debug("📍 GPS Verification: verified=%s, distance=%sm, nearest=%s", location_verified, distance_from_office, nearest_location)
 
         # Calculate attendance status
-        check_in_time = get_ph_time()
+        check_in_time = now
         status, notes = calculate_attendance_status(check_in_time)
 
-        # Create attendance log
-        log_id = str(uuid.uuid4())
-        new_log = AttendanceLog(
-            id=log_id,
-            employee_id=employee.employee_id,
-            timestamp=check_in_time,
-            confidence="100.0",  # QR code is 100% confident
-            method="qr_code",
-            event_id=event_id,
-            status=status,
-            notes=notes,
-            latitude=latitude,
-            longitude=longitude,
-            location_verified=location_verified,
-            distance_from_office=distance_from_office
-        )
-
-        db.add(new_log)
+        # Create attendance log (Core INSERT: no ORM object to track or re-read after commit)
+        db.execute(insert(AttendanceLog), with_row_ids(db, [{
+            "employee_id": employee.employee_id,
+            "timestamp": check_in_time,
+            "confidence": "100.0",  # QR code is 100% confident
+            "method": "qr_code",
+            "event_id": event_id,
+            "status": status,
+            "notes": notes
+        }]))
 
-        # Update event participant if event_id provided
+        # Update event participant if event_id provided (single UPDATE, no SELECT first)
         if event_id:
-            participant = db.query(EventParticipant).filter(
-                EventParticipant.event_id == event_id,
-                EventParticipant.employee_id == employee.employee_id
-            ).first()
-
-            if participant:
-                participant.status = "attended"
-                participant.attended_at = check_in_time
+            db.execute(
+                update(EventParticipant)
+                .where(
+                    EventParticipant.event_id == event_id,
+                    EventParticipant.employee_id == employee.employee_id
+                )
+                .values(status="attended", attended_at=check_in_time)
+                .execution_options(synchronize_session=False)
+            )
 
+        # The employee row isn't modified; detach it so commit doesn't expire it and force a reload
+        db.expunge(employee)
         db.commit()
+        analytics_cache.invalidate()
 
-        # Send email notifications (non-blocking - won't fail check-in if email fails)
-        if employee.email:
-            try:
-                # Send late arrival notification if late
-                if status == "late" and notes:
-                    # Extract minutes late from notes
-                    import re
-                    match = re.search(r'(\d+) minutes', notes)
-                    minutes_late = int(match.group(1)) if match else 0
-
-                    if minutes_late > 0:
-                        NotificationService.send_late_arrival_notification(
-                            employee_name=employee.name,
-                            employee_email=employee.email,
-                            check_in_time=check_in_time,
-                            minutes_late=minutes_late
-                        )
+        if event_id:
+            events_cache.invalidate()
 
-                # Optionally send check-in confirmation for all (can be disabled in settings)
-                # NotificationService.send_check_in_confirmation(
-                #     employee_name=employee.name,
-                #     employee_email=employee.email,
-                #     check_in_time=check_in_time,
-                #     status=status,
-                #     method="qr_code"
-                # )
-            except Exception as email_error:
-                print(f"⚠️ Email notification failed (non-critical): {email_error}")
+        # Send email notifications after the response (won't fail or delay check-in)
+        if employee.email:
+            # Send late arrival notification if late
+            if status == "late" and notes:
+                background_tasks.add_task(
+                    send_late_arrival_email,
+                    employee_name=employee.name,
+                    employee_email=employee.email,
+                    check_in_time=check_in_time,
+                    notes=notes
+                )
 
+            # Optionally send check-in confirmation for all (can be disabled in settings)
+            # background_tasks.add_task(
+            #     NotificationService.send_check_in_confirmation,
+            #     employee_name=employee.name,
+            #     employee_email=employee.email,
+            #     check_in_time=check_in_time,
+            #     status=status,
+            #     method="qr_code"
+            # )
+
+        # Datetimes are encoded to ISO 8601 when the response is serialized
         return {
             "success": True,
             "message": f"Attendance recorded successfully for {employee.name}",
@@ -1674,7 +2012,7 @@ async def qr_code_check_in(
                 "department": employee.department
             },
             "attendance": {
-                "timestamp": check_in_time.isoformat(),
+                "timestamp": check_in_time,
                 "method": "qr_code",
                 "status": status,
                 "notes": notes,
@@ -1687,11 +2025,11 @@ async def qr_code_check_in(
         raise
     except Exception as e:
         db.rollback()
-        print(f"QR check-in error: {e}")
+        logger.error("QR check-in error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/employees/{employee_id}/regenerate-qr")
-async def regenerate_qr_code(employee_id: str, db: Session = Depends(get_db)):
+@app.post("/api/employees/{employee_id}/regenerate-qr", response_class=ORJSONResponse)
+def regenerate_qr_code(employee_id: str, db: Session = Depends(get_db)):
     """
     Regenerate QR code token for an employee (useful if compromised)
     """
@@ -1704,16 +2042,16 @@ async def regenerate_qr_code(employee_id: str, db: Session = Depends(get_db)):
         if not employee:
             raise HTTPException(status_code=404, detail="Employee not found")
 
-        # Generate new token
-        employee.qr_code_token = str(uuid.uuid4())
+        # Generate new token (kept in a local so the response needs no reload after commit)
+        qr_token = str(uuid.uuid4())
+        employee.qr_code_token = qr_token
         db.commit()
-        db.refresh(employee)
 
         return {
             "success": True,
             "message": "QR code regenerated successfully",
-            "qr_token": employee.qr_code_token,
-            "qr_data": f"ATTENDANCE:{employee.qr_code_token}"
+            "qr_token": qr_token,
+            "qr_data": f"ATTENDANCE:{qr_token}"
         }
 
     except HTTPException:
@@ -1726,8 +2064,8 @@ async def regenerate_qr_code(employee_id: str, db: Session = Depends(get_db)):
 # ONLINE REGISTRATION
 # ========================================
 
-@app.post("/api/register/online")
-async def online_registration(
+@app.post("/api/register/online", response_class=ORJSONResponse)
+def online_registration(
     request: OnlineRegistrationRequest,
     db: Session = Depends(get_db)
 ):
@@ -1742,7 +2080,7 @@ async def online_registration(
         Registration result with success message
     """
     try:
-        print(f"\n🌐 Online registration request: {request.firstname} {request.lastname}")
+        logger.info("🌐 Online registration request: %s %s", request.firstname, request.lastname)
 
         # Validate required fields
         if not request.firstname or not request.lastname:
@@ -1763,31 +2101,32 @@ async def online_registration(
                 detail="Email is required"
             )
 
-        # Check if employee ID already exists
-        existing = db.query(Employee).filter(
-            Employee.employee_id == request.employeeId
-        ).first()
+        # Check if employee ID or email already exists (one query)
+        conflicts = db.query(Employee.employee_id, Employee.email).filter(or_(
+            Employee.employee_id == request.employeeId,
+            Employee.email == request.email
+        )).all()
 
-        if existing:
+        if any(emp_id == request.employeeId for emp_id, _ in conflicts):
             raise HTTPException(
                 status_code=409,
                 detail="This Employee ID is already registered. Please contact HR if this is an error."
             )
 
-        # Check if email already exists
-        existing_email = db.query(Employee).filter(
-            Employee.email == request.email
-        ).first()
-
-        if existing_email:
+        if conflicts:
             raise HTTPException(
                 status_code=409,
                 detail="This email is already registered. Please use a different email."
             )
 
         # Generate face embedding from image
-        print("🔍 Detecting face in uploaded image...")
-        embedding, face_location = face_processor.generate_face_embedding(request.image)
+        logger.debug("🔍 Detecting face in uploaded image...")
+        try:
+            image = run_face_task_sync(face_processor.decode_base64_image, request.image)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        embedding, face_location = run_face_task_sync(face_processor.generate_face_embedding_from_image, image)
 
         if embedding is None:
             raise HTTPException(
@@ -1796,106 +2135,111 @@ async def online_registration(
             )
 
         # SECURITY: Check liveness to prevent photo registration
-        # Decode image for liveness check
-        image = face_processor.decode_base64_image(request.image)
         face_crop = face_processor.extract_face_crop(image, face_location)
-        is_live, liveness_confidence, liveness_method = face_processor.liveness_detector.check_liveness(face_crop)
+        is_live, liveness_confidence, liveness_method = run_face_task_sync(
+            face_processor.liveness_detector.check_liveness, face_crop
+        )
 
         if not is_live:
-            print(f"❌ Online registration rejected: Photo/screen detected (confidence: {liveness_confidence:.3f})")
+            logger.warning("❌ Online registration rejected: Photo/screen detected (confidence: %.3f)", liveness_confidence)
             raise HTTPException(
                 status_code=400,
                 detail=f"Registration rejected: Please use a live camera to take your photo, not a picture or screenshot. Anti-spoofing score: {liveness_confidence:.2f}"
             )
 
-        print(f"✅ Liveness check passed for online registration (confidence: {liveness_confidence:.3f})")
+        logger.info("✅ Liveness check passed for online registration (confidence: %.3f)", liveness_confidence)
 
         # Create full name
         full_name = f"{request.firstname} {request.lastname}"
 
+        # Set id and created_at up front so the response is built without re-reading the row.
+        # Stored as naive PH wall-clock time, which is what the DateTime column holds.
+        employee_uuid = str(uuid.uuid4())
+        now = get_ph_time()
+        registered_at = now.replace(tzinfo=None)
+
         # Create new employee record with QR code token
         employee = Employee(
-            id=str(uuid.uuid4()),
+            id=employee_uuid,
             name=full_name,
             firstname=request.firstname,
             lastname=request.lastname,
             employee_id=request.employeeId,
             department=request.department,
             email=request.email,
-            embeddings=embedding,
+            embeddings=pack_embeddings(embedding),
             qr_code_token=str(uuid.uuid4()),  # Generate QR code token for attendance
-            is_active=True
+            is_active=True,
+            created_at=registered_at,
+            updated_at=registered_at
         )
 
         db.add(employee)
         db.commit()
-        db.refresh(employee)
 
-        print(f"✅ Online registration successful: {full_name} ({request.employeeId})")
+        logger.info("✅ Online registration successful: %s (%s)", full_name, request.employeeId)
 
         # Handle invitation token if provided
         event_info = None
         if request.invitation_token:
             try:
-                invitation = db.query(Invitation).filter(
+                # Load the invitation together with its event (one query)
+                invitation = db.query(Invitation).options(
+                    joinedload(Invitation.event)
+                ).filter(
                     Invitation.token == request.invitation_token
                 ).first()
 
-                if invitation and not invitation.is_used and invitation.expires_at > get_ph_time():
+                if invitation and not invitation.is_used and invitation.expires_at > now:
                     # Mark invitation as used
                     invitation.is_used = True
-                    invitation.used_at = get_ph_time()
-                    invitation.employee_id = employee.employee_id
+                    invitation.used_at = now
+                    invitation.employee_id = request.employeeId
 
                     # Add employee as participant to the event if invitation is for an event
                     if invitation.event_id:
-                        # Check if participant already exists
-                        existing_participant = db.query(EventParticipant).filter(
-                            EventParticipant.event_id == invitation.event_id,
-                            EventParticipant.employee_id == employee.employee_id
-                        ).first()
-
-                        if not existing_participant:
-                            participant = EventParticipant(
-                                id=str(uuid.uuid4()),
-                                event_id=invitation.event_id,
-                                employee_id=employee.employee_id,
-                                is_required=True,
-                                status="confirmed"
-                            )
-                            db.add(participant)
+                        # Add as participant (no-op if already one)
+                        add_event_participant(
+                            db,
+                            invitation.event_id,
+                            request.employeeId,
+                            is_required=True,
+                            status="confirmed"
+                        )
 
                         # Get event details for response
-                        event = db.query(Event).filter(Event.id == invitation.event_id).first()
+                        event = invitation.event
                         if event:
                             event_info = {
                                 "id": event.id,
                                 "name": event.name,
-                                "event_date": event.event_date.isoformat(),
+                                "event_date": event.event_date,
                                 "location": event.location
                             }
 
                     db.commit()
-                    print(f"✅ Invitation processed for {request.email}")
+                    events_cache.invalidate()
+                    logger.info("✅ Invitation processed for %s", request.email)
 
             except Exception as e:
-                print(f"⚠️ Failed to process invitation: {str(e)}")
+                logger.warning("⚠️ Failed to process invitation: %s", e)
                 # Don't fail the registration if invitation processing fails
 
         response_message = "Registration successful! You can now use face recognition to mark attendance."
         if event_info:
             response_message += f" You have been registered for the event: {event_info['name']}."
 
+        # Datetimes are encoded to ISO 8601 when the response is serialized
         return {
             "success": True,
             "message": response_message,
             "data": {
-                "id": employee.id,
+                "id": employee_uuid,
                 "name": full_name,
-                "employeeId": employee.employee_id,
-                "email": employee.email,
-                "department": employee.department,
-                "registrationDate": employee.created_at.isoformat()
+                "employeeId": request.employeeId,
+                "email": request.email,
+                "department": request.department,
+                "registrationDate": registered_at
             },
             "event": event_info
         }
@@ -1903,9 +2247,7 @@ async def online_registration(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Online registration error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Online registration error: %s", e)
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -1916,17 +2258,68 @@ async def online_registration(
 # EVENT MANAGEMENT ENDPOINTS
 # ============================================
 
-def calculate_event_status(event_date, start_time, end_time):
+@lru_cache(maxsize=1024)
+def parse_event_time(value: str, default_hour: int, label: str) -> datetime_time:
+    """
+    Parse an event's "HH:MM" start/end time (cached; events share a handful of distinct times)
+
+    Args:
+        value: Time string from the Event row
+        default_hour: Hour to use if the stored hour is out of range
+        label: Field name for the warning message
+
+    Returns:
+        Parsed time
+    """
+    # Fast path for the canonical zero-padded form
+    if len(value) == 5 and value[2] == ':':
+        try:
+            return datetime_time.fromisoformat(value)
+        except ValueError:
+            pass
+
+    parts = value.split(':')
+    hour = int(parts[0])
+    minute = int(parts[1]) if len(parts) > 1 else 0
+    # Validate hour
+    if hour < 0 or hour > 23:
+        logger.warning("⚠️ Invalid %s hour: %s, defaulting to %s", label, hour, default_hour)
+        hour = default_hour
+    return datetime_time(hour, minute)
+
+def format_event_time(value, default: str) -> str:
+    """
+    Render an event start/end time as "HH:MM"
+
+    Args:
+        value: Stored "HH:MM" string (returned as is) or time object
+        default: Returned when no time is set
+
+    Returns:
+        Time string
+    """
+    if isinstance(value, str):
+        return value
+    if not value:
+        return default
+    return f"{value.hour:02d}:{value.minute:02d}"
+
+def calculate_event_status(event_date, start_time, end_time, now: Optional[datetime] = None):
     """
     Calculate real-time event status based on current datetime
 
+    Args:
+        event_date: Event date (date or datetime)
+        start_time: Start time ("HH:MM" string or time), start of day if empty
+        end_time: End time ("HH:MM" string or time), end of day if empty
+        now: Current naive Philippines datetime; pass one value when computing status for many events
+
     Returns: 'upcoming', 'ongoing', or 'completed'
     """
-    from datetime import datetime, time as datetime_time
-
     try:
-        # Get current datetime in local timezone
-        now = datetime.now()
+        # Event dates and times are naive Philippines wall-clock values
+        if now is None:
+            now = get_ph_time().replace(tzinfo=None)
         current_date = now.date()
         current_time = now.time()
 
@@ -1934,14 +2327,7 @@ def calculate_event_status(event_date, start_time, end_time):
         if isinstance(start_time, datetime_time):
             start_time_obj = start_time
         elif isinstance(start_time, str):
-            parts = start_time.split(':')
-            start_hour = int(parts[0])
-            start_minute = int(parts[1]) if len(parts) > 1 else 0
-            # Validate hour
-            if start_hour < 0 or start_hour > 23:
-                print(f"⚠️ Invalid start_time hour: {start_hour}, defaulting to 0")
-                start_hour = 0
-            start_time_obj = datetime_time(start_hour, start_minute)
+            start_time_obj = parse_event_time(start_time, 0, "start_time")
         else:
             # Default to start of day
             start_time_obj = datetime_time(0, 0)
@@ -1949,14 +2335,7 @@ def calculate_event_status(event_date, start_time, end_time):
         if isinstance(end_time, datetime_time):
             end_time_obj = end_time
         elif isinstance(end_time, str):
-            parts = end_time.split(':')
-            end_hour = int(parts[0])
-            end_minute = int(parts[1]) if len(parts) > 1 else 0
-            # Validate hour
-            if end_hour < 0 or end_hour > 23:
-                print(f"⚠️ Invalid end_time hour: {end_hour}, defaulting to 23")
-                end_hour = 23
-            end_time_obj = datetime_time(end_hour, end_minute)
+            end_time_obj = parse_event_time(end_time, 23, "end_time")
         else:
             # Default to end of day
             end_time_obj = datetime_time(23, 59)
@@ -1982,10 +2361,34 @@ def calculate_event_status(event_date, start_time, end_time):
                 return "ongoing"
 
     except Exception as e:
-        print(f"⚠️ Error calculating event status: {e}")
+        logger.warning("⚠️ Error calculating event status: %s", e)
         # Default to upcoming if we can't determine
         return "upcoming"
 
+def event_status_date_clause(status: str):
+    """
+    SQL pre-filter on Event.event_date for a status computed by calculate_event_status
+
+    Only the date part is pushed down (it decides every event not happening today);
+    same-day events still go through calculate_event_status for the time-of-day check.
+
+    Args:
+        status: 'upcoming', 'ongoing' or 'completed'
+
+    Returns:
+        SQLAlchemy clause, or None if status is not one of the above
+    """
+    today = datetime.combine(get_ph_time().date(), datetime_time(0, 0))
+    tomorrow = today + timedelta(days=1)
+
+    if status == "upcoming":
+        return Event.event_date >= today
+    if status == "ongoing":
+        return (Event.event_date >= today) & (Event.event_date < tomorrow)
+    if status == "completed":
+        return Event.event_date < tomorrow
+    return None
+
 @app.post("/api/events")
 async def create_event(
     request: CreateEventRequest,
@@ -1993,7 +2396,7 @@ async def create_event(
 ):
     """Create a new event with participants"""
     try:
-        print(f"\n📅 Creating event: {request.name}")
+        logger.debug("📅 Creating event: %s", request.name)
 
         # Parse event date
         event_date = datetime.strptime(request.event_date, "%Y-%m-%d")
@@ -2014,29 +2417,13 @@ async def create_event(
         db.commit()
         db.refresh(event)
 
-        # Add participants
-        participants_added = []
-        for emp_id in request.participant_ids:
-            # Verify employee exists
-            employee = db.query(Employee).filter(
-                Employee.employee_id == emp_id,
-                Employee.is_active == True
-            ).first()
-
-            if employee:
-                participant = EventParticipant(
-                    id=str(uuid.uuid4()),
-                    event_id=event.id,
-                    employee_id=emp_id,
-                    is_required=True,
-                    status="invited"
-                )
-                db.add(participant)
-                participants_added.append(emp_id)
+        # Add participants (active employees only)
+        participants_added = add_invited_participants(db, event.id, request.participant_ids)
 
         db.commit()
+        events_cache.invalidate()
 
-        print(f"✅ Event created: {event.name} with {len(participants_added)} participants")
+        logger.info("✅ Event created: %s with %d participants", request.name, len(participants_added))
 
         return {
             "success": True,
@@ -2051,7 +2438,7 @@ async def create_event(
         }
 
     except Exception as e:
-        print(f"❌ Error creating event: {e}")
+        logger.error("❌ Error creating event: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2062,32 +2449,60 @@ async def get_all_events(
 ):
     """Get all events with optional status filter (calculates real-time status)"""
     try:
-        query = db.query(Event).filter(Event.is_active == True)
+        cache_key = ("events", status)
+        cached = events_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Only the columns the listing renders (skips status, created_by, updated_at, is_active)
+        query = db.query(Event).options(load_only(
+            Event.id, Event.name, Event.description, Event.event_date, Event.start_time,
+            Event.end_time, Event.location, Event.created_at
+        )).filter(Event.is_active == True)
+
+        # Let the database drop events whose date already rules out the requested status
+        if status:
+            date_clause = event_status_date_clause(status)
+            if date_clause is not None:
+                query = query.filter(date_clause)
+
         events = query.order_by(Event.event_date.desc()).all()
 
-        # Get participant counts and calculate real-time status
-        event_data = []
+        # Calculate real-time status based on current datetime, skipping events the filter excludes
+        now = get_ph_time().replace(tzinfo=None)
+        listed_events = []
         for event in events:
-            # Calculate real-time status based on current datetime
             real_time_status = calculate_event_status(
                 event.event_date,
                 event.start_time,
-                event.end_time
+                event.end_time,
+                now
             )
-
-            # Skip if status filter doesn't match
             if status and real_time_status != status:
                 continue
+            listed_events.append((event, real_time_status))
+
+        # Participant and attended counts for all listed events (one grouped query)
+        participant_counts = {}
+        if listed_events:
+            participant_counts = {
+                event_id: (total, attended)
+                for event_id, total, attended in db.query(
+                    EventParticipant.event_id,
+                    func.count(EventParticipant.id),
+                    func.sum(case((EventParticipant.status == "attended", 1), else_=0))
+                ).filter(
+                    EventParticipant.event_id.in_([event.id for event, _ in listed_events])
+                ).group_by(EventParticipant.event_id)
+            }
 
-            participants = db.query(EventParticipant).filter(
-                EventParticipant.event_id == event.id
-            ).all()
-
-            attended_count = sum(1 for p in participants if p.status == "attended")
+        event_data = []
+        for event, real_time_status in listed_events:
+            total_participants, attended_count = participant_counts.get(event.id, (0, 0))
 
             # Convert times to strings if they're time objects
-            start_time_str = event.start_time if isinstance(event.start_time, str) else event.start_time.strftime("%H:%M") if event.start_time else "00:00"
-            end_time_str = event.end_time if isinstance(event.end_time, str) else event.end_time.strftime("%H:%M") if event.end_time else "23:59"
+            start_time_str = format_event_time(event.start_time, "00:00")
+            end_time_str = format_event_time(event.end_time, "23:59")
 
             event_data.append({
                 "id": event.id,
@@ -2098,33 +2513,30 @@ async def get_all_events(
                 "end_time": end_time_str,
                 "location": event.location,
                 "status": real_time_status,  # Use calculated status
-                "total_participants": len(participants),
+                "total_participants": total_participants,
                 "attended_count": attended_count,
                 "created_at": event.created_at.isoformat()
             })
 
-        print(f"📅 Found {len(event_data)} events" + (f" with status '{status}'" if status else ""))
+        logger.debug("📅 Found %d events (status filter: %s)", len(event_data), status)
 
-        return {
+        return events_cache.set(cache_key, {
             "success": True,
             "count": len(event_data),
             "events": event_data
-        }
+        })
 
     except Exception as e:
-        print(f"❌ Error fetching events: {e}")
+        logger.error("❌ Error fetching events: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/events/{event_id}")
 async def get_event_details(event_id: str, db: Session = Depends(get_db)):
     """Get detailed information about a specific event"""
     try:
-        event = db.query(Event).filter(
-            Event.id == event_id,
-            Event.is_active == True
-        ).first()
+        event = db.get(Event, event_id)
 
-        if not event:
+        if not event or not event.is_active:
             raise HTTPException(status_code=404, detail="Event not found")
 
         # Calculate real-time status
@@ -2134,27 +2546,24 @@ async def get_event_details(event_id: str, db: Session = Depends(get_db)):
             event.end_time
         )
 
-        # Get participants with employee details
-        participants = db.query(EventParticipant).filter(
+        # Get participants with employee details (one JOIN; participants without an employee are skipped)
+        participants = db.query(EventParticipant, Employee.name, Employee.department).join(
+            Employee, Employee.employee_id == EventParticipant.employee_id
+        ).filter(
             EventParticipant.event_id == event_id
         ).all()
 
         participant_data = []
-        for participant in participants:
-            employee = db.query(Employee).filter(
-                Employee.employee_id == participant.employee_id
-            ).first()
-
-            if employee:
-                participant_data.append({
-                    "id": participant.id,
-                    "employee_id": participant.employee_id,
-                    "employee_name": employee.name,
-                    "department": employee.department,
-                    "status": participant.status,
-                    "attended_at": participant.attended_at.isoformat() if participant.attended_at else None,
-                    "is_required": participant.is_required
-                })
+        for participant, employee_name, department in participants:
+            participant_data.append({
+                "id": participant.id,
+                "employee_id": participant.employee_id,
+                "employee_name": employee_name,
+                "department": department,
+                "status": participant.status,
+                "attended_at": participant.attended_at.isoformat() if participant.attended_at else None,
+                "is_required": participant.is_required
+            })
 
         return {
             "success": True,
@@ -2185,12 +2594,9 @@ async def update_event(
 ):
     """Update an event"""
     try:
-        event = db.query(Event).filter(
-            Event.id == event_id,
-            Event.is_active == True
-        ).first()
+        event = db.get(Event, event_id)
 
-        if not event:
+        if not event or not event.is_active:
             raise HTTPException(status_code=404, detail="Event not found")
 
         # Update fields
@@ -2211,24 +2617,17 @@ async def update_event(
 
         # Update participants if provided
         if request.participant_ids is not None:
-            # Remove existing participants
+            # Remove existing participants (no participant objects are loaded in this session)
             db.query(EventParticipant).filter(
                 EventParticipant.event_id == event_id
-            ).delete()
-
-            # Add new participants
-            for emp_id in request.participant_ids:
-                participant = EventParticipant(
-                    id=str(uuid.uuid4()),
-                    event_id=event_id,
-                    employee_id=emp_id,
-                    is_required=True,
-                    status="invited"
-                )
-                db.add(participant)
+            ).delete(synchronize_session=False)
+
+            # Add new participants (active employees only)
+            add_invited_participants(db, event_id, request.participant_ids)
 
         event.updated_at = get_ph_time()
         db.commit()
+        events_cache.invalidate()
 
         return {
             "success": True,
@@ -2245,23 +2644,24 @@ async def update_event(
 async def delete_event(event_id: str, db: Session = Depends(get_db)):
     """Delete (deactivate) an event"""
     try:
-        event = db.query(Event).filter(
+        # Soft delete in a single UPDATE; no matched row means the event doesn't exist
+        updated = db.query(Event).filter(
             Event.id == event_id
-        ).first()
+        ).update({Event.is_active: False, Event.status: "cancelled"}, synchronize_session=False)
 
-        if not event:
+        if not updated:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        # Soft delete
-        event.is_active = False
-        event.status = "cancelled"
         db.commit()
+        events_cache.invalidate()
 
         return {
             "success": True,
             "message": "Event deleted successfully"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -2278,81 +2678,69 @@ async def send_event_invitations(
     Send invitations for an event
     """
     try:
-        print(f"\n📧 === SENDING EVENT INVITATIONS ===")
-        print(f"Event ID: {request.event_id}")
-        print(f"Emails to invite: {request.emails}")
-        print(f"Base URL: {request.base_url}")
-        print(f"User: {current_user.username}")
+        logger.debug(
+            "📧 Sending event invitations: event=%s emails=%s base_url=%s user=%s",
+            request.event_id, request.emails, request.base_url, current_user.username
+        )
 
         # Verify event exists
-        event = db.query(Event).filter(Event.id == request.event_id).first()
+        event = db.get(Event, request.event_id)
         if not event:
-            print(f"❌ Event not found: {request.event_id}")
+            logger.warning("❌ Event not found: %s", request.event_id)
             raise HTTPException(status_code=404, detail="Event not found")
 
-        print(f"✅ Found event: {event.name}")
+        logger.debug("✅ Found event: %s", event.name)
 
-        successful_sends = []
-        failed_sends = []
+        # Create new invitations and refresh existing ones in one upsert, then commit once
+        expires_at = get_ph_time() + timedelta(days=7)  # 7 days to register
+        invitation_tokens = upsert_event_invitations(
+            db, request.event_id, request.emails, expires_at, current_user.id
+        )
 
-        for email in request.emails:
-            print(f"\n📨 Processing invitation for: {email}")
-            try:
-                # Check if invitation already exists for this email and event
-                existing = db.query(Invitation).filter(
-                    Invitation.email == email,
-                    Invitation.event_id == request.event_id,
-                    Invitation.is_used == False
-                ).first()
+        event_name = event.name
+        event_date = event.event_date
+        event_location = event.location or "To be announced"
 
-                if existing:
-                    # Update expiration if invitation exists
-                    existing.expires_at = get_ph_time() + timedelta(days=7)
-                    invitation_token = existing.token
-                else:
-                    # Create new invitation
-                    invitation_token = secrets.token_urlsafe(32)
-                    invitation = Invitation(
-                        id=str(uuid.uuid4()),
-                        email=email,
-                        token=invitation_token,
-                        expires_at=get_ph_time() + timedelta(days=7),  # 7 days to register
-                        event_id=request.event_id,
-                        created_by=current_user.id,
-                        is_used=False
-                    )
-                    db.add(invitation)
+        db.commit()
+        logger.debug("✅ %d invitation record(s) saved to database", len(invitation_tokens))
 
-                db.commit()
-                print(f"✅ Invitation record saved to database")
+        # Send emails in parallel (sends share the pooled SMTP connections)
+        smtp_slots = asyncio.Semaphore(settings.SMTP_MAX_CONCURRENT_SENDS)
 
-                # Send email
-                print(f"📤 Attempting to send email to: {email}")
-                success = email_service.send_event_invitation(
+        async def send_invitation(email: str) -> bool:
+            async with smtp_slots:
+                logger.debug("📤 Attempting to send email to: %s", email)
+                return await run_in_threadpool(
+                    email_service.send_event_invitation,
                     to_email=email,
-                    event_name=event.name,
-                    event_date=event.event_date,
-                    event_location=event.location or "To be announced",
-                    invitation_token=invitation_token,
+                    event_name=event_name,
+                    event_date=event_date,
+                    event_location=event_location,
+                    invitation_token=invitation_tokens[email],
                     base_url=request.base_url
                 )
 
-                if success:
-                    print(f"✅ Email sent successfully to: {email}")
-                    successful_sends.append(email)
-                else:
-                    print(f"❌ Email failed to send to: {email}")
-                    failed_sends.append(email)
+        results = await asyncio.gather(
+            *(send_invitation(email) for email in request.emails),
+            return_exceptions=True
+        )
 
-            except Exception as e:
-                print(f"❌ Exception while processing {email}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+        successful_sends = []
+        failed_sends = []
+        for email, result in zip(request.emails, results):
+            if isinstance(result, Exception):
+                logger.error("❌ Exception while sending to %s: %s", email, result)
+                failed_sends.append(email)
+            elif result:
+                logger.debug("✅ Email sent successfully to: %s", email)
+                successful_sends.append(email)
+            else:
+                logger.warning("❌ Email failed to send to: %s", email)
                 failed_sends.append(email)
 
-        print(f"\n📊 === INVITATION SUMMARY ===")
-        print(f"✅ Successful: {len(successful_sends)} - {successful_sends}")
-        print(f"❌ Failed: {len(failed_sends)} - {failed_sends}")
+        logger.info("📊 Invitations for event %s: %d sent, %d failed", request.event_id, len(successful_sends), len(failed_sends))
+        if failed_sends:
+            logger.debug("❌ Failed invitations: %s", failed_sends)
 
         return {
             "success": True,
@@ -2377,7 +2765,10 @@ async def get_event_invitations(
     Get all invitations for an event
     """
     try:
-        invitations = db.query(Invitation).filter(
+        # Only invitation columns are rendered; raiseload makes any relationship access
+        # (e.g. inv.event) fail loudly instead of lazy-loading once per row.
+        # Eager-load (joinedload/selectinload) a relationship here if it's ever needed.
+        invitations = db.query(Invitation).options(raiseload('*')).filter(
             Invitation.event_id == event_id
         ).all()
 
@@ -2439,7 +2830,7 @@ async def validate_invitation(
         # Get event details if invitation is for an event
         event_details = None
         if invitation.event_id:
-            event = db.query(Event).filter(Event.id == invitation.event_id).first()
+            event = db.get(Event, invitation.event_id)
             if event:
                 event_details = {
                     "id": event.id,
@@ -2473,7 +2864,7 @@ async def resend_invitation(
     Resend an invitation email
     """
     try:
-        invitation = db.query(Invitation).filter(Invitation.id == invitation_id).first()
+        invitation = db.get(Invitation, invitation_id)
 
         if not invitation:
             raise HTTPException(status_code=404, detail="Invitation not found")
@@ -2486,7 +2877,7 @@ async def resend_invitation(
         db.commit()
 
         # Get event details
-        event = db.query(Event).filter(Event.id == invitation.event_id).first()
+        event = db.get(Event, invitation.event_id) if invitation.event_id else None
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
 
@@ -2523,47 +2914,46 @@ async def mark_event_attendance(
     """Mark attendance for an event participant"""
     try:
         # Verify event exists
-        event = db.query(Event).filter(
+        event_name = db.query(Event.name).filter(
             Event.id == event_id,
             Event.is_active == True
-        ).first()
+        ).scalar()
 
-        if not event:
+        if event_name is None:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        # Find participant record
-        participant = db.query(EventParticipant).filter(
+        # Mark participant as attended (single UPDATE; no matched row means not a participant)
+        current_time = get_ph_time()
+        updated = db.query(EventParticipant).filter(
             EventParticipant.event_id == event_id,
             EventParticipant.employee_id == request.employee_id
-        ).first()
+        ).update({
+            EventParticipant.status: "attended",
+            EventParticipant.attended_at: current_time
+        }, synchronize_session=False)
 
-        if not participant:
+        if not updated:
             raise HTTPException(status_code=404, detail="Participant not found for this event")
 
-        # Mark as attended
-        participant.status = "attended"
-        current_time = get_ph_time()
-        participant.attended_at = current_time
-
         # Calculate attendance status
         status, notes = calculate_attendance_status(current_time)
 
-        # Also create attendance log linked to event
-        attendance_log = AttendanceLog(
-            id=str(uuid.uuid4()),
-            employee_id=request.employee_id,
-            timestamp=current_time,
-            method="event_checkin",
-            event_id=event_id,
-            status=status,
-            notes=notes
-        )
-        db.add(attendance_log)
+        # Also create attendance log linked to event (id from gen_random_uuid() on PostgreSQL)
+        db.execute(insert(AttendanceLog), with_row_ids(db, [{
+            "employee_id": request.employee_id,
+            "timestamp": current_time,
+            "method": "event_checkin",
+            "event_id": event_id,
+            "status": status,
+            "notes": notes
+        }]))
 
         db.commit()
+        events_cache.invalidate()
+        analytics_cache.invalidate()
 
-        status_indicator = f" [{status.upper()}" + (f": {notes}" if notes else "") + "]"
-        print(f"✅ Event attendance marked: {request.employee_id} for event {event.name}{status_indicator}")
+        logger.info("✅ Event attendance marked: %s for event %s [%s%s]",
+                    request.employee_id, event_name, status.upper(), f": {notes}" if notes else "")
 
         return {
             "success": True,
@@ -2580,41 +2970,38 @@ async def mark_event_attendance(
 async def get_event_stats(db: Session = Depends(get_db)):
     """Get event statistics for reports"""
     try:
-        # Total events
-        total_events = db.query(Event).filter(Event.is_active == True).count()
-
-        # Upcoming events
-        upcoming_events = db.query(Event).filter(
-            Event.is_active == True,
-            Event.status == "upcoming",
-            Event.event_date >= get_ph_time()
-        ).count()
-
-        # Completed events
-        completed_events = db.query(Event).filter(
-            Event.is_active == True,
-            Event.status == "completed"
-        ).count()
-
-        # Average attendance rate
-        events = db.query(Event).filter(Event.is_active == True).all()
-        total_attendance_rate = 0
-        event_count = 0
-
-        for event in events:
-            participants = db.query(EventParticipant).filter(
-                EventParticipant.event_id == event.id
-            ).all()
-
-            if len(participants) > 0:
-                attended = sum(1 for p in participants if p.status == "attended")
-                rate = (attended / len(participants)) * 100
-                total_attendance_rate += rate
-                event_count += 1
+        cached = events_cache.get(("stats",))
+        if cached is not None:
+            return cached
+
+        # Total, upcoming and completed events (one query; COUNT skips the CASE's NULLs).
+        # event_date is a naive PH-local DateTime, so compare against naive PH time; an aware
+        # value would be shifted through the database session's time zone.
+        now = get_ph_time().replace(tzinfo=None)
+        total_events, upcoming_events, completed_events = db.query(
+            func.count(Event.id),
+            func.count(case((
+                (Event.status == "upcoming") & (Event.event_date >= now), 1
+            ))),
+            func.count(case((Event.status == "completed", 1)))
+        ).filter(Event.is_active == True).one()
+
+        # Average attendance rate over active events that have participants (one grouped query)
+        rates = [
+            (attended / total) * 100
+            for total, attended in db.query(
+                func.count(EventParticipant.id),
+                func.sum(case((EventParticipant.status == "attended", 1), else_=0))
+            ).join(
+                Event, Event.id == EventParticipant.event_id
+            ).filter(
+                Event.is_active == True
+            ).group_by(EventParticipant.event_id)
+        ]
 
-        avg_attendance_rate = total_attendance_rate / event_count if event_count > 0 else 0
+        avg_attendance_rate = sum(rates) / len(rates) if rates else 0
 
-        return {
+        return events_cache.set(("stats",), {
             "success": True,
             "stats": {
                 "total_events": total_events,
@@ -2622,7 +3009,7 @@ async def get_event_stats(db: Session = Depends(get_db)):
                 "completed_events": completed_events,
                 "average_attendance_rate": round(avg_attendance_rate, 1)
             }
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2631,8 +3018,69 @@ async def get_event_stats(db: Session = Depends(get_db)):
 # EXPORT ENDPOINTS
 # ============================================
 
+def attendance_export_row(log) -> list:
+    """
+    Format an attendance log row for export (ATTENDANCE_EXPORT_COLUMNS order)
+
+    Args:
+        log: Row with employee_id, timestamp, confidence, status, notes, method
+
+    Returns:
+        List of cell values
+    """
+    return [
+        log.employee_id,
+        log.timestamp.strftime('%Y-%m-%d'),
+        log.timestamp.strftime('%I:%M:%S %p'),
+        log.confidence,
+        log.status or 'N/A',
+        log.notes or '',
+        log.method
+    ]
+
+def stream_attendance_csv(statement) -> Iterator[bytes]:
+    """
+    Stream attendance logs as CSV rows from a server-side cursor
+
+    Opens its own session because the request's session is closed before the
+    response body is sent. Columns match ExportService.export_to_csv.
+
+    Args:
+        statement: SELECT of employee_id, timestamp, confidence, status, notes, method
+
+    Returns:
+        Iterator of CSV-encoded lines (header first)
+    """
+    db = SessionLocal()
+    try:
+        logs = db.execute(statement.execution_options(yield_per=1000))
+        yield from iter_csv_rows(chain(
+            [ATTENDANCE_EXPORT_COLUMNS],
+            (attendance_export_row(log) for log in logs)
+        ))
+    finally:
+        db.close()
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Gzip-compress a byte stream on the fly (for Content-Encoding: gzip responses)
+
+    Args:
+        chunks: Uncompressed byte chunks
+
+    Returns:
+        Iterator of gzip-compressed chunks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16+: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
 @app.get("/api/attendance/export")
 async def export_attendance(
+    request: Request,
     format: str = "csv",  # csv, excel, pdf
     date: Optional[str] = None,
     employee_id: Optional[str] = None,
@@ -2654,87 +3102,89 @@ async def export_attendance(
         Downloadable file in specified format
     """
     try:
-        print(f"\n📊 Exporting attendance data as {format.upper()}")
+        logger.debug("📊 Exporting attendance data as %s", format.upper())
 
-        # Build query
-        query = db.query(AttendanceLog)
+        # Build query (only the exported columns)
+        statement = select(
+            AttendanceLog.employee_id,
+            AttendanceLog.timestamp,
+            AttendanceLog.confidence,
+            AttendanceLog.status,
+            AttendanceLog.notes,
+            AttendanceLog.method
+        )
 
         # Apply filters
         if date:
             target_date = datetime.strptime(date, "%Y-%m-%d")
             next_date = target_date + timedelta(days=1)
-            query = query.filter(
+            statement = statement.where(
                 AttendanceLog.timestamp >= target_date,
                 AttendanceLog.timestamp < next_date
             )
         elif start_date and end_date:
             start = datetime.strptime(start_date, "%Y-%m-%d")
             end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-            query = query.filter(
+            statement = statement.where(
                 AttendanceLog.timestamp >= start,
                 AttendanceLog.timestamp < end
             )
 
         if employee_id:
-            query = query.filter(AttendanceLog.employee_id == employee_id)
-
-        # Get logs
-        logs = query.order_by(AttendanceLog.timestamp.desc()).all()
+            statement = statement.where(AttendanceLog.employee_id == employee_id)
 
-        # Get employee details
-        employee_ids = list(set([log.employee_id for log in logs]))
-        employees = db.query(Employee).filter(
-            Employee.employee_id.in_(employee_ids)
-        ).all()
-        employee_map = {emp.employee_id: emp for emp in employees}
-
-        # Prepare data for export
-        export_data = []
-        for log in logs:
-            emp = employee_map.get(log.employee_id)
-            export_data.append({
-                'employee_id': log.employee_id,
-                'employee_name': emp.name if emp else 'Unknown',
-                'timestamp': log.timestamp,
-                'confidence': log.confidence,
-                'status': log.status or 'N/A',
-                'notes': log.notes or '',
-                'method': log.method
-            })
+        statement = statement.order_by(AttendanceLog.timestamp.desc())
 
-        # Generate export based on format
+        # CSV is streamed straight off the cursor instead of being built in memory
         if format.lower() == 'csv':
-            buffer = ExportService.export_to_csv(export_data)
-            media_type = "text/csv"
             filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            logger.debug("✅ Streaming attendance records as CSV")
 
-        elif format.lower() == 'excel':
-            buffer = ExportService.export_to_excel(export_data)
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            body = stream_attendance_csv(statement)
+            headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+
+            # CSV compresses very well; gzip it when the client accepts it (xlsx/pdf are already compressed)
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                body = gzip_chunks(body)
+                headers["Content-Encoding"] = "gzip"
+
+            return StreamingResponse(body, media_type="text/csv", headers=headers)
+
+        # Excel rows go from the cursor straight into the sheet XML (no DataFrame or cell objects)
+        if format.lower() == 'excel':
+            logs = db.execute(statement.execution_options(yield_per=1000))
+            buffer = ExportService.export_to_excel_fastxml(attendance_export_row(log) for log in logs)
             filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            logger.debug("✅ Exported attendance records as EXCEL")
 
-        elif format.lower() == 'pdf':
-            buffer = ExportService.export_to_pdf(export_data, "Attendance Report")
-            media_type = "application/pdf"
-            filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            return StreamingResponse(
+                buffer,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
 
-        else:
-            raise HTTPException(status_code=400, detail="Invalid format. Use: csv, excel, or pdf")
+        # PDF tables are built from the query rows (no intermediate dicts or DataFrame); the document is assembled in memory
+        if format.lower() == 'pdf':
+            logs = db.execute(statement.execution_options(yield_per=500))
+            buffer = ExportService.export_rows_to_pdf(
+                (attendance_export_row(log) for log in logs),
+                "Attendance Report"
+            )
+            filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            logger.debug("✅ Exported attendance records as PDF")
 
-        print(f"✅ Exported {len(export_data)} records as {format.upper()}")
+            return StreamingResponse(
+                buffer,
+                media_type="application/pdf",
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
 
-        return StreamingResponse(
-            buffer,
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        raise HTTPException(status_code=400, detail="Invalid format. Use: csv, excel, or pdf")
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Export error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Export error: %s", e)
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
@@ -2755,36 +3205,28 @@ async def export_event_attendance(
         Downloadable event attendance report
     """
     try:
-        print(f"\n📊 Exporting event attendance for {event_id} as {format.upper()}")
+        logger.debug("📊 Exporting event attendance for %s as %s", event_id, format.upper())
 
         # Get event
-        event = db.query(Event).filter(Event.id == event_id).first()
+        event = db.get(Event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        # Get participants
-        participants = db.query(EventParticipant).filter(
+        # Get participants with employee names (one LEFT JOIN; missing employees become 'Unknown')
+        participants = db.query(
+            EventParticipant.employee_id,
+            Employee.name,
+            EventParticipant.status,
+            EventParticipant.attended_at,
+            EventParticipant.is_required
+        ).outerjoin(
+            Employee, Employee.employee_id == EventParticipant.employee_id
+        ).filter(
             EventParticipant.event_id == event_id
         ).all()
 
-        # Get employee details
-        employee_ids = [p.employee_id for p in participants]
-        employees = db.query(Employee).filter(
-            Employee.employee_id.in_(employee_ids)
-        ).all()
-        employee_map = {emp.employee_id: emp for emp in employees}
-
-        # Prepare participant data
-        participant_data = []
-        for p in participants:
-            emp = employee_map.get(p.employee_id)
-            participant_data.append({
-                'employee_id': p.employee_id,
-                'employee_name': emp.name if emp else 'Unknown',
-                'status': p.status,
-                'attended_at': p.attended_at.strftime('%Y-%m-%d %I:%M %p') if p.attended_at else 'N/A',
-                'is_required': 'Yes' if p.is_required else 'No'
-            })
+        # Prepare participant data (built per column, not per row)
+        participant_data = EventExportService.prepare_participant_data(participants)
 
         # Event data
         event_data = {
@@ -2814,7 +3256,7 @@ async def export_event_attendance(
 
         filename = f"{event.name.replace(' ', '_')}_attendance.{extension}"
 
-        print(f"✅ Exported event attendance with {len(participant_data)} participants")
+        logger.debug("✅ Exported event attendance with %s participants", len(participant_data))
 
         return StreamingResponse(
             buffer,
@@ -2825,134 +3267,201 @@ async def export_event_attendance(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Event export error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Event export error: %s", e)
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 # ============================================
 # ANALYTICS ENDPOINTS
 # ============================================
 
+ONE_DAY = timedelta(days=1)
+
+def get_daily_attendance_counts(db: Session, first_day: date_type, last_day: date_type) -> Dict[date_type, dict]:
+    """
+    Per-day attendance counts over a date range (one GROUP BY query)
+
+    Days without attendance are left out; callers fill them with zeros.
+
+    Args:
+        db: Database session
+        first_day: First day of the range
+        last_day: Last day of the range (inclusive)
+
+    Returns:
+        Dict of day -> {total, unique_employees, on_time, late, half_day}
+    """
+    day = func.date(AttendanceLog.timestamp, type_=Date)
+    status = func.coalesce(AttendanceLog.status, 'on_time')
+
+    rows = db.query(
+        day,
+        func.count(AttendanceLog.id),
+        func.count(func.distinct(AttendanceLog.employee_id)),
+        func.sum(case((status == 'on_time', 1), else_=0)),
+        func.sum(case((status == 'late', 1), else_=0)),
+        func.sum(case((status == 'half_day', 1), else_=0))
+    ).filter(
+        AttendanceLog.timestamp >= datetime.combine(first_day, datetime_time.min),
+        AttendanceLog.timestamp < datetime.combine(last_day + ONE_DAY, datetime_time.min)
+    ).group_by(day).all()
+
+    return {
+        log_day: {
+            'total': total,
+            'unique_employees': unique_employees,
+            'on_time': on_time,
+            'late': late,
+            'half_day': half_day
+        }
+        for log_day, total, unique_employees, on_time, late, half_day in rows
+    }
+
+def get_hourly_attendance_counts(db: Session, day: date_type) -> Dict[int, int]:
+    """
+    Check-ins per hour of one day (one GROUP BY query)
+
+    Args:
+        db: Database session
+        day: Day to count
+
+    Returns:
+        Dict of hour -> check-ins (hours without check-ins are left out)
+    """
+    day_start = datetime.combine(day, datetime_time.min)
+    log_hour = extract('hour', AttendanceLog.timestamp)
+
+    return {
+        int(hour): count
+        for hour, count in db.query(log_hour, func.count(AttendanceLog.id)).filter(
+            AttendanceLog.timestamp >= day_start,
+            AttendanceLog.timestamp < day_start + ONE_DAY
+        ).group_by(log_hour)
+    }
+
+def get_top_employees(db: Session, since: datetime, limit: int = 5) -> List[dict]:
+    """
+    Employees with the most check-ins since a given time (names joined in, one query)
+
+    Args:
+        db: Database session
+        since: Start of the counting window
+        limit: Number of employees to return
+
+    Returns:
+        List of {employee_id, name, check_ins}, most check-ins first
+    """
+    check_ins = func.count(AttendanceLog.id)
+
+    return [
+        {
+            'employee_id': emp_id,
+            'name': name,
+            'check_ins': count
+        }
+        for emp_id, name, count in db.query(
+            Employee.employee_id,
+            Employee.name,
+            check_ins
+        ).join(
+            AttendanceLog, AttendanceLog.employee_id == Employee.employee_id
+        ).filter(
+            AttendanceLog.timestamp >= since
+        ).group_by(Employee.employee_id, Employee.name).order_by(check_ins.desc()).limit(limit)
+    ]
+
+def count_active_employees(db: Session) -> int:
+    """Number of active employees"""
+    return db.scalar(select(func.count(Employee.id)).where(Employee.is_active == True))
+
+def run_with_session(query_func, *args):
+    """
+    Run a query helper on its own short-lived session
+
+    Sessions aren't thread-safe, so each query run concurrently in the thread pool gets one.
+
+    Args:
+        query_func: Function taking (db, *args)
+        *args: Remaining arguments for query_func
+
+    Returns:
+        Whatever query_func returns
+    """
+    db = SessionLocal()
+    try:
+        return query_func(db, *args)
+    finally:
+        db.close()
+
 @app.get("/api/analytics/overview")
-async def get_analytics_overview(db: Session = Depends(get_db)):
+async def get_analytics_overview():
     """
     Get comprehensive analytics overview
 
     Returns: Dashboard metrics, trends, and statistics
     """
     try:
-        from datetime import timedelta
-        from sqlalchemy import func, extract
+        today = get_ph_time().date()
 
-        print("\n📊 Generating analytics overview...")
+        # Dashboards poll this; serve today's overview from cache until it expires or attendance is logged
+        cache_key = ("overview", today)
+        cached = analytics_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        today = get_ph_time().date()
+        logger.debug("📊 Generating analytics overview...")
         yesterday = today - timedelta(days=1)
-        week_ago = today - timedelta(days=7)
         month_ago = today - timedelta(days=30)
+        month_start = datetime.combine(month_ago, datetime_time.min)
+
+        # The four aggregates are independent, so they run concurrently in the thread pool,
+        # each on its own pooled connection (wall time is the slowest query, not the sum).
+        # Per-day counts cover the last 7 days; today and yesterday come from there too.
+        daily_counts, total_employees, hourly_distribution, top_employees = await asyncio.gather(
+            run_in_threadpool(run_with_session, get_daily_attendance_counts, today - timedelta(days=6), today),
+            run_in_threadpool(run_with_session, count_active_employees),
+            run_in_threadpool(run_with_session, get_hourly_attendance_counts, today),
+            run_in_threadpool(run_with_session, get_top_employees, month_start)
+        )
+        no_attendance = {'total': 0, 'unique_employees': 0, 'on_time': 0, 'late': 0, 'half_day': 0}
 
-        # Today's attendance
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
-
-        today_attendance = db.query(AttendanceLog).filter(
-            AttendanceLog.timestamp >= today_start,
-            AttendanceLog.timestamp <= today_end
-        ).count()
+        # Today's attendance, with unique employees and status breakdown counted in SQL
+        today_counts = daily_counts.get(today, no_attendance)
+        today_attendance = today_counts['total']
+        unique_today = today_counts['unique_employees']
 
         # Yesterday's attendance
-        yesterday_start = datetime.combine(yesterday, datetime.min.time())
-        yesterday_end = datetime.combine(yesterday, datetime.max.time())
-
-        yesterday_attendance = db.query(AttendanceLog).filter(
-            AttendanceLog.timestamp >= yesterday_start,
-            AttendanceLog.timestamp <= yesterday_end
-        ).count()
-
-        # Total employees
-        total_employees = db.query(Employee).filter(Employee.is_active == True).count()
-
-        # Unique employees today
-        today_logs = db.query(AttendanceLog).filter(
-            AttendanceLog.timestamp >= today_start,
-            AttendanceLog.timestamp <= today_end
-        ).all()
-        unique_today = len(set([log.employee_id for log in today_logs]))
+        yesterday_attendance = daily_counts.get(yesterday, no_attendance)['total']
 
         # Attendance rate
         attendance_rate = (unique_today / total_employees * 100) if total_employees > 0 else 0
 
-        # Status breakdown (today)
-        status_counts = {
-            'on_time': 0,
-            'late': 0,
-            'half_day': 0
-        }
-
-        for log in today_logs:
-            status = log.status or 'on_time'
-            if status in status_counts:
-                status_counts[status] += 1
-
         # Last 7 days trend
         daily_trend = []
-        for i in range(6, -1, -1):
-            day = today - timedelta(days=i)
-            day_start = datetime.combine(day, datetime.min.time())
-            day_end = datetime.combine(day, datetime.max.time())
-
-            day_count = db.query(AttendanceLog).filter(
-                AttendanceLog.timestamp >= day_start,
-                AttendanceLog.timestamp <= day_end
-            ).count()
-
+        day = today - timedelta(days=6)
+        for _ in range(7):
             daily_trend.append({
-                'date': day.strftime('%Y-%m-%d'),
+                'date': day.isoformat(),
                 'day_name': day.strftime('%a'),
-                'count': day_count
+                'count': daily_counts[day]['total'] if day in daily_counts else 0
             })
+            day += ONE_DAY
 
         # Hourly distribution (today)
-        hourly_distribution = {}
-        for log in today_logs:
-            hour = log.timestamp.hour
-            hourly_distribution[hour] = hourly_distribution.get(hour, 0) + 1
-
         hourly_data = [
             {'hour': hour, 'count': hourly_distribution.get(hour, 0)}
             for hour in range(24)
         ]
 
-        # Top employees (by check-ins this month)
-        month_start = datetime.combine(month_ago, datetime.min.time())
-        month_logs = db.query(
-            AttendanceLog.employee_id,
-            func.count(AttendanceLog.id).label('count')
-        ).filter(
-            AttendanceLog.timestamp >= month_start
-        ).group_by(AttendanceLog.employee_id).order_by(func.count(AttendanceLog.id).desc()).limit(5).all()
-
-        top_employees = []
-        for emp_id, count in month_logs:
-            emp = db.query(Employee).filter(Employee.employee_id == emp_id).first()
-            if emp:
-                top_employees.append({
-                    'employee_id': emp_id,
-                    'name': emp.name,
-                    'check_ins': count
-                })
-
-        return {
+        return analytics_cache.set(cache_key, {
             "success": True,
             "data": {
                 "today": {
                     "total_check_ins": today_attendance,
                     "unique_employees": unique_today,
                     "attendance_rate": round(attendance_rate, 1),
-                    "on_time": status_counts['on_time'],
-                    "late": status_counts['late'],
-                    "half_day": status_counts['half_day']
+                    "on_time": today_counts['on_time'],
+                    "late": today_counts['late'],
+                    "half_day": today_counts['half_day']
                 },
                 "comparison": {
                     "yesterday": yesterday_attendance,
@@ -2969,12 +3478,10 @@ async def get_analytics_overview(db: Session = Depends(get_db)):
                 "top_employees": top_employees,
                 "total_employees": total_employees
             }
-        }
+        })
 
     except Exception as e:
-        print(f"❌ Analytics error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Analytics error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2992,41 +3499,30 @@ async def get_attendance_trends(
     Returns: Daily attendance data with status breakdown
     """
     try:
-        from datetime import timedelta
-
-        print(f"\n📈 Generating {days}-day attendance trends...")
+        logger.debug("📈 Generating %s-day attendance trends...", days)
 
         today = get_ph_time().date()
         start_date = today - timedelta(days=days)
 
-        trends = []
-        for i in range(days, -1, -1):
-            day = today - timedelta(days=i)
-            day_start = datetime.combine(day, datetime.min.time())
-            day_end = datetime.combine(day, datetime.max.time())
-
-            logs = db.query(AttendanceLog).filter(
-                AttendanceLog.timestamp >= day_start,
-                AttendanceLog.timestamp <= day_end
-            ).all()
-
-            status_breakdown = {
-                'on_time': sum(1 for log in logs if (log.status or 'on_time') == 'on_time'),
-                'late': sum(1 for log in logs if (log.status or 'on_time') == 'late'),
-                'half_day': sum(1 for log in logs if (log.status or 'on_time') == 'half_day')
-            }
+        # All days in one grouped query; days without attendance are zero-filled here
+        daily_counts = get_daily_attendance_counts(db, start_date, today)
+        no_attendance = {'total': 0, 'unique_employees': 0, 'on_time': 0, 'late': 0, 'half_day': 0}
 
-            unique_employees = len(set([log.employee_id for log in logs]))
+        trends = []
+        day = start_date
+        for _ in range(days + 1):
+            counts = daily_counts.get(day, no_attendance)
 
             trends.append({
-                'date': day.strftime('%Y-%m-%d'),
+                'date': day.isoformat(),
                 'day_name': day.strftime('%a'),
-                'total': len(logs),
-                'unique_employees': unique_employees,
-                'on_time': status_breakdown['on_time'],
-                'late': status_breakdown['late'],
-                'half_day': status_breakdown['half_day']
+                'total': counts['total'],
+                'unique_employees': counts['unique_employees'],
+                'on_time': counts['on_time'],
+                'late': counts['late'],
+                'half_day': counts['half_day']
             })
+            day += ONE_DAY
 
         return {
             "success": True,
@@ -3035,7 +3531,7 @@ async def get_attendance_trends(
         }
 
     except Exception as e:
-        print(f"❌ Trends error: {e}")
+        logger.error("❌ Trends error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3047,53 +3543,39 @@ async def get_department_statistics(db: Session = Depends(get_db)):
     Returns: Department-wise attendance rates and counts
     """
     try:
-        from datetime import timedelta
-
-        print("\n🏢 Generating department statistics...")
+        logger.debug("🏢 Generating department statistics...")
 
         today = get_ph_time().date()
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
-
-        # Get all departments
-        employees = db.query(Employee).filter(Employee.is_active == True).all()
-        departments = {}
-
-        for emp in employees:
-            dept = emp.department or 'Unknown'
-            if dept not in departments:
-                departments[dept] = {
-                    'total_employees': 0,
-                    'present_today': set(),
-                    'total_check_ins': 0
-                }
-            departments[dept]['total_employees'] += 1
-
-        # Get today's attendance
-        today_logs = db.query(AttendanceLog).filter(
-            AttendanceLog.timestamp >= today_start,
-            AttendanceLog.timestamp <= today_end
-        ).all()
-
-        for log in today_logs:
-            emp = db.query(Employee).filter(Employee.employee_id == log.employee_id).first()
-            if emp:
-                dept = emp.department or 'Unknown'
-                if dept in departments:
-                    departments[dept]['present_today'].add(log.employee_id)
-                    departments[dept]['total_check_ins'] += 1
+        today_start = datetime.combine(today, datetime_time.min)
+        tomorrow_start = today_start + timedelta(days=1)
+
+        # Active employees per department with today's attendance joined in (one grouped query)
+        department = func.coalesce(Employee.department, 'Unknown')
+        departments = db.query(
+            department,
+            func.count(func.distinct(Employee.id)),
+            func.count(func.distinct(AttendanceLog.employee_id)),
+            func.count(AttendanceLog.id)
+        ).outerjoin(
+            AttendanceLog, and_(
+                AttendanceLog.employee_id == Employee.employee_id,
+                AttendanceLog.timestamp >= today_start,
+                AttendanceLog.timestamp < tomorrow_start
+            )
+        ).filter(
+            Employee.is_active == True
+        ).group_by(department).all()
 
         # Calculate statistics
         dept_stats = []
-        for dept_name, data in departments.items():
-            present_count = len(data['present_today'])
-            attendance_rate = (present_count / data['total_employees'] * 100) if data['total_employees'] > 0 else 0
+        for dept_name, total_employees, present_count, total_check_ins in departments:
+            attendance_rate = (present_count / total_employees * 100) if total_employees > 0 else 0
 
             dept_stats.append({
                 'department': dept_name,
-                'total_employees': data['total_employees'],
+                'total_employees': total_employees,
                 'present_today': present_count,
-                'total_check_ins': data['total_check_ins'],
+                'total_check_ins': total_check_ins,
                 'attendance_rate': round(attendance_rate, 1)
             })
 
@@ -3106,7 +3588,7 @@ async def get_department_statistics(db: Session = Depends(get_db)):
         }
 
     except Exception as e:
-        print(f"❌ Department stats error: {e}")
+        logger.error("❌ Department stats error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3126,47 +3608,40 @@ async def get_employee_performance(
     Returns: Employee performance rankings
     """
     try:
-        from datetime import timedelta
-        from sqlalchemy import func
-
-        print(f"\n🏆 Generating employee performance (last {days} days)...")
+        logger.debug("🏆 Generating employee performance (last %s days)...", days)
 
         today = get_ph_time().date()
         start_date = today - timedelta(days=days)
-        start_datetime = datetime.combine(start_date, datetime.min.time())
+        start_datetime = datetime.combine(start_date, datetime_time.min)
 
-        # Get attendance counts per employee
+        # Attendance counts and status breakdown per employee, with employee details joined in (one query)
+        status = func.coalesce(AttendanceLog.status, 'on_time')
         attendance_counts = db.query(
             AttendanceLog.employee_id,
+            Employee.name,
+            Employee.department,
             func.count(AttendanceLog.id).label('total_check_ins'),
-            func.count(func.distinct(func.date(AttendanceLog.timestamp))).label('days_present')
+            func.count(func.distinct(func.date(AttendanceLog.timestamp))).label('days_present'),
+            func.sum(case((status == 'on_time', 1), else_=0)).label('on_time'),
+            func.sum(case((status == 'late', 1), else_=0)).label('late')
+        ).join(
+            Employee, Employee.employee_id == AttendanceLog.employee_id
         ).filter(
             AttendanceLog.timestamp >= start_datetime
-        ).group_by(AttendanceLog.employee_id).all()
+        ).group_by(AttendanceLog.employee_id, Employee.name, Employee.department).all()
 
         performance = []
-        for emp_id, total_check_ins, days_present in attendance_counts:
-            emp = db.query(Employee).filter(Employee.employee_id == emp_id).first()
-            if emp:
-                # Get status breakdown
-                logs = db.query(AttendanceLog).filter(
-                    AttendanceLog.employee_id == emp_id,
-                    AttendanceLog.timestamp >= start_datetime
-                ).all()
-
-                on_time = sum(1 for log in logs if (log.status or 'on_time') == 'on_time')
-                late = sum(1 for log in logs if (log.status or 'on_time') == 'late')
-
-                performance.append({
-                    'employee_id': emp_id,
-                    'name': emp.name,
-                    'department': emp.department,
-                    'total_check_ins': total_check_ins,
-                    'days_present': days_present,
-                    'on_time_count': on_time,
-                    'late_count': late,
-                    'punctuality_rate': round((on_time / total_check_ins * 100) if total_check_ins > 0 else 0, 1)
-                })
+        for emp_id, name, department, total_check_ins, days_present, on_time, late in attendance_counts:
+            performance.append({
+                'employee_id': emp_id,
+                'name': name,
+                'department': department,
+                'total_check_ins': total_check_ins,
+                'days_present': days_present,
+                'on_time_count': on_time,
+                'late_count': late,
+                'punctuality_rate': round((on_time / total_check_ins * 100) if total_check_ins > 0 else 0, 1)
+            })
 
         # Sort by days present and punctuality
         performance.sort(key=lambda x: (x['days_present'], x['punctuality_rate']), reverse=True)
@@ -3179,7 +3654,7 @@ async def get_employee_performance(
         }
 
     except Exception as e:
-        print(f"❌ Performance error: {e}")
+        logger.error("❌ Performance error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3201,26 +3676,28 @@ async def get_locations(
     Returns: List of locations with GPS coordinates
     """
     try:
-        print(f"\n📍 Fetching locations (include_inactive={include_inactive})...")
-
-        query = db.query(Location)
+        logger.debug("📍 Fetching locations (include_inactive=%s)...", include_inactive)
+
+        # Plain column rows: no ORM instances or identity-map bookkeeping for a read-only listing
+        statement = select(
+            Location.id,
+            Location.name,
+            Location.address,
+            Location.latitude,
+            Location.longitude,
+            Location.radius_meters,
+            Location.is_active,
+            Location.created_at
+        )
         if not include_inactive:
-            query = query.filter(Location.is_active == True)
-
-        locations = query.all()
-
-        result = [{
-            "id": loc.id,
-            "name": loc.name,
-            "address": loc.address,
-            "latitude": loc.latitude,
-            "longitude": loc.longitude,
-            "radius_meters": loc.radius_meters,
-            "is_active": loc.is_active,
-            "created_at": loc.created_at.isoformat() if loc.created_at else None
-        } for loc in locations]
-
-        print(f"✅ Found {len(result)} location(s)")
+            statement = statement.where(Location.is_active == True)
+
+        result = [
+            {**row, "created_at": row["created_at"].isoformat() if row["created_at"] else None}
+            for row in db.execute(statement).mappings()
+        ]
+
+        logger.debug("✅ Found %s location(s)", len(result))
         return {
             "success": True,
             "count": len(result),
@@ -3228,7 +3705,7 @@ async def get_locations(
         }
 
     except Exception as e:
-        print(f"❌ Error fetching locations: {e}")
+        logger.error("❌ Error fetching locations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3259,48 +3736,42 @@ async def create_location(
         if not AuthService.check_permission(current_user.role, "admin"):
             raise HTTPException(status_code=403, detail="Admin access required")
 
-        print(f"\n📍 Creating new location: {name}")
+        logger.info("📍 Creating new location: %s", name)
 
         # Validate coordinates
         if not GeoService.validate_coordinates(latitude, longitude):
             raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
 
-        # Create location
-        new_location = Location(
-            id=str(uuid.uuid4()),
-            name=name,
-            address=address,
-            latitude=latitude,
-            longitude=longitude,
-            radius_meters=radius_meters,
-            created_by=current_user.id,
-            is_active=True
-        )
-
-        db.add(new_location)
+        # Create location; RETURNING hands back the row without a refresh SELECT
+        new_location = db.execute(
+            insert(Location)
+            .values(
+                id=str(uuid.uuid4()),
+                name=name,
+                address=address,
+                latitude=latitude,
+                longitude=longitude,
+                radius_meters=radius_meters,
+                created_by=current_user.id,
+                is_active=True
+            )
+            .returning(*LOCATION_RESPONSE_COLUMNS)
+        ).mappings().one()
         db.commit()
-        db.refresh(new_location)
+        invalidate_locations_cache()
 
-        print(f"✅ Location created: {new_location.name} at ({latitude}, {longitude})")
+        logger.info("✅ Location created: %s at (%s, %s)", name, latitude, longitude)
 
         return {
             "success": True,
             "message": "Location created successfully",
-            "location": {
-                "id": new_location.id,
-                "name": new_location.name,
-                "address": new_location.address,
-                "latitude": new_location.latitude,
-                "longitude": new_location.longitude,
-                "radius_meters": new_location.radius_meters,
-                "is_active": new_location.is_active
-            }
+            "location": dict(new_location)
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error creating location: {e}")
+        logger.error("❌ Error creating location: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3327,55 +3798,55 @@ async def update_location(
         if not AuthService.check_permission(current_user.role, "admin"):
             raise HTTPException(status_code=403, detail="Admin access required")
 
-        print(f"\n📍 Updating location: {location_id}")
+        logger.info("📍 Updating location: %s", location_id)
 
-        location = db.query(Location).filter(Location.id == location_id).first()
-        if not location:
-            raise HTTPException(status_code=404, detail="Location not found")
-
-        # Update fields
+        # Stored coordinates are already in range, so each new value is checked against 0
+        changes = {"updated_at": get_ph_time()}
         if name is not None:
-            location.name = name
+            changes["name"] = name
         if address is not None:
-            location.address = address
+            changes["address"] = address
         if latitude is not None:
-            if not GeoService.validate_coordinates(latitude, location.longitude):
+            if not GeoService.validate_coordinates(latitude, 0.0):
                 raise HTTPException(status_code=400, detail="Invalid latitude")
-            location.latitude = latitude
+            changes["latitude"] = latitude
         if longitude is not None:
-            if not GeoService.validate_coordinates(location.latitude, longitude):
+            if not GeoService.validate_coordinates(0.0, longitude):
                 raise HTTPException(status_code=400, detail="Invalid longitude")
-            location.longitude = longitude
+            changes["longitude"] = longitude
         if radius_meters is not None:
             if radius_meters < 0:
                 raise HTTPException(status_code=400, detail="Radius must be positive")
-            location.radius_meters = radius_meters
+            changes["radius_meters"] = radius_meters
         if is_active is not None:
-            location.is_active = is_active
+            changes["is_active"] = is_active
+
+        # One UPDATE ... RETURNING instead of load, flush and refresh
+        location = db.execute(
+            update(Location)
+            .where(Location.id == location_id)
+            .values(**changes)
+            .returning(*LOCATION_RESPONSE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).mappings().one_or_none()
+        if location is None:
+            raise HTTPException(status_code=404, detail="Location not found")
 
         db.commit()
-        db.refresh(location)
+        invalidate_locations_cache()
 
-        print(f"✅ Location updated: {location.name}")
+        logger.info("✅ Location updated: %s", location["name"])
 
         return {
             "success": True,
             "message": "Location updated successfully",
-            "location": {
-                "id": location.id,
-                "name": location.name,
-                "address": location.address,
-                "latitude": location.latitude,
-                "longitude": location.longitude,
-                "radius_meters": location.radius_meters,
-                "is_active": location.is_active
-            }
+            "location": dict(location)
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error updating location: {e}")
+        logger.error("❌ Error updating location: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3396,17 +3867,18 @@ async def delete_location(
         if not AuthService.check_permission(current_user.role, "admin"):
             raise HTTPException(status_code=403, detail="Admin access required")
 
-        print(f"\n📍 Deleting location: {location_id}")
+        logger.info("📍 Deleting location: %s", location_id)
 
-        location = db.query(Location).filter(Location.id == location_id).first()
+        location = db.get(Location, location_id)
         if not location:
             raise HTTPException(status_code=404, detail="Location not found")
 
         location_name = location.name
         db.delete(location)
         db.commit()
+        invalidate_locations_cache()
 
-        print(f"✅ Location deleted: {location_name}")
+        logger.info("✅ Location deleted: %s", location_name)
 
         return {
             "success": True,
@@ -3416,7 +3888,7 @@ async def delete_location(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error deleting location: {e}")
+        logger.error("❌ Error deleting location: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -3456,7 +3928,7 @@ async def get_notification_status(current_user: User = Depends(get_current_user)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting notification status: {e}")
+        logger.error("❌ Error getting notification status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3507,15 +3979,97 @@ async def send_test_email(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error sending test email: {e}")
+        logger.error("❌ Error sending test email: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def get_daily_summary_counts(db: Session, today: date_type) -> tuple:
+    """
+    Active employee total plus today's distinct and late check-in counts
+
+    Args:
+        db: Database session
+        today: PH date to summarize
+
+    Returns:
+        Tuple of (total_employees, present_count, late_count)
+    """
+    start_of_day = datetime.combine(today, datetime_time.min)
+
+    # One round-trip (the attendance aggregates are served by ix_attendance_ts_emp)
+    return tuple(db.execute(
+        select(
+            select(func.count(Employee.id)).where(Employee.is_active == True).scalar_subquery(),
+            func.count(func.distinct(AttendanceLog.employee_id)),
+            func.count(case((AttendanceLog.status == "late", 1)))
+        ).where(AttendanceLog.timestamp >= start_of_day)
+    ).one())
+
+def get_late_employees(db: Session, today: date_type) -> List[dict]:
+    """
+    Late arrivals for the daily summary email (names joined in, one query)
+
+    Args:
+        db: Database session
+        today: PH date to summarize
+
+    Returns:
+        List of dicts with name, time and minutes_late
+    """
+    start_of_day = datetime.combine(today, datetime_time.min)
+
+    late_employees = []
+    for name, timestamp, notes in db.execute(
+        select(Employee.name, AttendanceLog.timestamp, AttendanceLog.notes).join(
+            Employee, Employee.employee_id == AttendanceLog.employee_id
+        ).where(
+            AttendanceLog.timestamp >= start_of_day,
+            AttendanceLog.status == "late",
+            AttendanceLog.notes.isnot(None),
+            AttendanceLog.notes != ""
+        )
+    ):
+        match = MINUTES_LATE_RE.search(notes)
+        minutes_late = int(match.group(1)) if match else 0
+
+        late_employees.append({
+            'name': name,
+            'time': timestamp.strftime('%I:%M %p'),
+            'minutes_late': minutes_late
+        })
+
+    return late_employees
+
+async def get_daily_summary_stats(today: date_type) -> dict:
+    """
+    Attendance totals and late arrivals for the daily summary email
+
+    The counts and the late-employee list run concurrently, each on its own session.
+
+    Args:
+        today: PH date to summarize
+
+    Returns:
+        Dict with total_employees, present_count, late_count, absent_count and late_employees
+    """
+    (total_employees, present_count, late_count), late_employees = await asyncio.gather(
+        run_in_threadpool(run_with_session, get_daily_summary_counts, today),
+        run_in_threadpool(run_with_session, get_late_employees, today)
+    )
+
+    return {
+        "total_employees": total_employees,
+        "present_count": present_count,
+        "late_count": late_count,
+        "absent_count": total_employees - present_count,
+        "late_employees": late_employees
+    }
+
+
 @app.post("/api/notifications/daily-summary")
 async def send_daily_summary_now(
     admin_email: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Manually trigger daily summary email (Admin only)
@@ -3541,49 +4095,20 @@ async def send_daily_summary_now(
         if not recipient_email:
             raise HTTPException(status_code=400, detail="No email address provided")
 
-        # Get today's statistics
-        today = get_ph_time().date()
-        start_of_day = datetime.combine(today, datetime.min.time())
-
-        # Get total employees
-        total_employees = db.query(Employee).filter(Employee.is_active == True).count()
+        now = get_ph_time()
+        today = now.date()
 
-        # Get today's attendance
-        today_logs = db.query(AttendanceLog).filter(
-            AttendanceLog.timestamp >= start_of_day
-        ).all()
-
-        # Calculate statistics
-        employee_ids_present = set(log.employee_id for log in today_logs)
-        present_count = len(employee_ids_present)
-        late_count = sum(1 for log in today_logs if log.status == "late")
-        absent_count = total_employees - present_count
-
-        # Get late employees with details
-        late_employees = []
-        for log in today_logs:
-            if log.status == "late" and log.notes:
-                import re
-                match = re.search(r'(\d+) minutes', log.notes)
-                minutes_late = int(match.group(1)) if match else 0
-
-                emp = db.query(Employee).filter(Employee.employee_id == log.employee_id).first()
-                if emp:
-                    late_employees.append({
-                        'name': emp.name,
-                        'time': log.timestamp.strftime('%I:%M %p'),
-                        'minutes_late': minutes_late
-                    })
+        # Get today's statistics (cached with the analytics responses, dropped on every attendance write)
+        cache_key = ("daily_summary", today)
+        summary = analytics_cache.get(cache_key)
+        if summary is None:
+            summary = analytics_cache.set(cache_key, await get_daily_summary_stats(today))
 
         # Send summary
         success = NotificationService.send_daily_summary(
             admin_email=recipient_email,
-            date=get_ph_time(),
-            total_employees=total_employees,
-            present_count=present_count,
-            late_count=late_count,
-            absent_count=absent_count,
-            late_employees=late_employees
+            date=now,
+            **summary
         )
 
         if success:
@@ -3591,10 +4116,10 @@ async def send_daily_summary_now(
                 "success": True,
                 "message": f"Daily summary sent to {recipient_email}",
                 "stats": {
-                    "total_employees": total_employees,
-                    "present": present_count,
-                    "late": late_count,
-                    "absent": absent_count
+                    "total_employees": summary["total_employees"],
+                    "present": summary["present_count"],
+                    "late": summary["late_count"],
+                    "absent": summary["absent_count"]
                 }
             }
         else:
@@ -3603,7 +4128,7 @@ async def send_daily_summary_now(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error sending daily summary: {e}")
+        logger.error("❌ Error sending daily summary: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3615,9 +4140,51 @@ class InvitationRequest(BaseModel):
     email: str
     event_id: Optional[str] = None  # Optional event ID if invitation is for an event
 
+def send_invitation_email(
+    email: str,
+    token: str,
+    event_name: Optional[str] = None,
+    event_date: Optional[datetime] = None,
+    event_location: Optional[str] = None
+):
+    """
+    Send a registration invitation email (run as a background task after the invitation is saved)
+
+    Args:
+        email: Recipient email address
+        token: Invitation token for the registration link
+        event_name: Event name, if the invitation is for an event
+        event_date: Event date, if the invitation is for an event
+        event_location: Event location, if the invitation is for an event
+    """
+    email_sent = False
+
+    if event_name is not None:
+        # Use new email service for event invitations with better templates
+        email_sent = email_service.send_event_invitation(
+            to_email=email,
+            event_name=event_name,
+            event_date=event_date,
+            event_location=event_location,
+            invitation_token=token,
+            base_url=FRONTEND_URL
+        )
+    elif NotificationService.is_enabled():
+        # Use notification service for general invitations
+        email_sent = NotificationService.send_registration_invitation(
+            recipient_email=email,
+            invitation_token=token,
+            frontend_url=FRONTEND_URL,
+            event=None
+        )
+
+    if not email_sent:
+        logger.warning("⚠️ Warning: Failed to send invitation email to %s", email)
+
 @app.post("/api/invitations/send")
 async def send_invitation(
     request: InvitationRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -3639,22 +4206,28 @@ async def send_invitation(
         if not email or '@' not in email:
             raise HTTPException(status_code=400, detail="Invalid email address")
 
-        # Check if email already has an active invitation
-        existing_invitation = db.query(Invitation).filter(
-            Invitation.email == email,
-            Invitation.is_used == False,
-            Invitation.expires_at > get_ph_time()
-        ).first()
+        # Check for an active invitation and an existing employee in one round-trip
+        # (served by uq_invitation_open_email_event and the employees.email index)
+        now = get_ph_time()
+        has_active_invitation, has_employee = db.execute(
+            select(
+                exists().where(
+                    Invitation.email == email,
+                    Invitation.is_used == False,
+                    Invitation.expires_at > now
+                ),
+                exists().where(Employee.email == email)
+            )
+        ).one()
 
-        if existing_invitation:
+        if has_active_invitation:
             raise HTTPException(
                 status_code=400,
                 detail="An active invitation already exists for this email"
             )
 
         # Check if employee with this email already exists
-        existing_employee = db.query(Employee).filter(Employee.email == email).first()
-        if existing_employee:
+        if has_employee:
             raise HTTPException(
                 status_code=400,
                 detail="An employee with this email already exists"
@@ -3663,7 +4236,7 @@ async def send_invitation(
         # If event_id is provided, validate it exists
         event = None
         if request.event_id:
-            event = db.query(Event).filter(Event.id == request.event_id).first()
+            event = db.get(Event, request.event_id)
             if not event:
                 raise HTTPException(status_code=404, detail="Event not found")
 
@@ -3675,7 +4248,7 @@ async def send_invitation(
             id=str(uuid.uuid4()),
             email=email,
             token=token,
-            expires_at=get_ph_time() + timedelta(days=7),
+            expires_at=now + timedelta(days=7),
             is_used=False,
             created_by=current_user.id,
             event_id=request.event_id  # Link to event if provided
@@ -3684,41 +4257,33 @@ async def send_invitation(
         db.add(invitation)
         db.commit()
 
-        # Send invitation email
-        email_sent = False
-        frontend_url = settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else "http://localhost"
-
+        # Send invitation email after the response goes out (SMTP can take seconds)
+        email_queued = True
         if event:
-            # Use new email service for event invitations with better templates
-            email_sent = email_service.send_event_invitation(
-                to_email=email,
+            background_tasks.add_task(
+                send_invitation_email,
+                email,
+                token,
                 event_name=event.name,
                 event_date=event.event_date,
-                event_location=event.location or "To be announced",
-                invitation_token=token,
-                base_url=frontend_url
+                event_location=event.location or "To be announced"
             )
         elif NotificationService.is_enabled():
-            # Use notification service for general invitations
-            email_sent = NotificationService.send_registration_invitation(
-                recipient_email=email,
-                invitation_token=token,
-                frontend_url=frontend_url,
-                event=None
-            )
-
-        if not email_sent:
-            print(f"⚠️ Warning: Failed to send invitation email to {email}")
+            background_tasks.add_task(send_invitation_email, email, token)
+        else:
+            # General invitations go through the notification service, which is switched off
+            email_queued = False
 
         return {
             "success": True,
-            "message": f"Invitation sent to {email}",
+            "message": f"Invitation sent to {email}" if email_queued else f"Invitation created for {email} (email notifications are disabled)",
+            "email_queued": email_queued,
             "invitation": {
                 "id": invitation.id,
                 "email": email,
                 "token": token,
                 "expires_at": invitation.expires_at.isoformat(),
-                "registration_link": f"{settings.FRONTEND_URL if hasattr(settings, 'FRONTEND_URL') else 'http://localhost'}/#/register?token={token}"
+                "registration_link": f"{FRONTEND_URL}/#/register?token={token}"
             }
         }
 
@@ -3726,7 +4291,7 @@ async def send_invitation(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error sending invitation: {e}")
+        logger.error("❌ Error sending invitation: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3770,7 +4335,7 @@ async def validate_invitation(
         # Get event details if invitation is linked to an event
         event_info = None
         if invitation.event_id:
-            event = db.query(Event).filter(Event.id == invitation.event_id).first()
+            event = db.get(Event, invitation.event_id)
             if event:
                 event_info = {
                     "id": event.id,
@@ -3789,7 +4354,7 @@ async def validate_invitation(
         }
 
     except Exception as e:
-        print(f"❌ Error validating invitation: {e}")
+        logger.error("❌ Error validating invitation: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3814,31 +4379,28 @@ async def mark_invitation_used(
         if not invitation:
             raise HTTPException(status_code=404, detail="Invitation not found")
 
+        now = get_ph_time()
         invitation.is_used = True
-        invitation.used_at = get_ph_time()
+        invitation.used_at = now
         invitation.employee_id = employee_id
 
         # If invitation was for an event, automatically add employee as participant
         if invitation.event_id:
-            # Check if participant already exists
-            existing_participant = db.query(EventParticipant).filter(
-                EventParticipant.event_id == invitation.event_id,
-                EventParticipant.employee_id == employee_id
-            ).first()
-
-            if not existing_participant:
-                participant = EventParticipant(
-                    id=str(uuid.uuid4()),
-                    event_id=invitation.event_id,
-                    employee_id=employee_id,
-                    status="registered",  # Automatically set to registered since they completed registration
-                    created_at=get_ph_time()
-                )
-                db.add(participant)
-                print(f"✅ Auto-added employee {employee_id} to event {invitation.event_id}")
+            # Add as participant (no-op if already one)
+            add_event_participant(
+                db,
+                invitation.event_id,
+                employee_id,
+                status="registered",  # Automatically set to registered since they completed registration
+                created_at=now
+            )
+            logger.info("✅ Auto-added employee %s to event %s", employee_id, invitation.event_id)
 
         db.commit()
 
+        if invitation.event_id:
+            events_cache.invalidate()
+
         return {
             "success": True,
             "message": "Invitation marked as used",
@@ -3849,7 +4411,7 @@ async def mark_invitation_used(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error marking invitation as used: {e}")
+        logger.error("❌ Error marking invitation as used: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -3879,6 +4441,14 @@ class EventCameraLink(BaseModel):
     camera_id: str
     is_primary: Optional[bool] = False
 
+def is_ipv4_address(value: str) -> bool:
+    """Return True if value is a bare IPv4 address (each octet 0-255)"""
+    try:
+        ipaddress.IPv4Address(value)
+        return True
+    except ValueError:
+        return False
+
 @app.post("/api/cameras")
 async def create_camera(
     request: CameraCreate,
@@ -3887,9 +4457,6 @@ async def create_camera(
 ):
     """Create a new camera with auto-configuration for Dahua cameras"""
     try:
-        import re
-        import urllib.parse
-
         # Validate camera type
         if request.camera_type not in ['rtsp', 'http', 'webcam']:
             raise HTTPException(
@@ -3902,20 +4469,18 @@ async def create_camera(
         # AUTO-CONFIGURE DAHUA CAMERAS
         if request.camera_type == 'rtsp':
             # Check if stream_url is just an IP address
-            ip_pattern = r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$'
-
-            if stream_url and re.match(ip_pattern, stream_url):
+            if stream_url and is_ipv4_address(stream_url):
                 # Just an IP - build Dahua RTSP URL automatically
                 username = request.username or "admin"
                 password = request.password or "admin"
 
                 # URL-encode password if it contains special characters
-                password_encoded = urllib.parse.quote(password)
+                password_encoded = quote(password)
 
                 # Build standard Dahua RTSP URL
                 stream_url = f"rtsp://{username}:{password_encoded}@{stream_url}:554/cam/realmonitor?channel=1&subtype=0"
 
-                print(f"🔧 Auto-configured Dahua camera URL for IP: {request.stream_url}")
+                logger.info("🔧 Auto-configured Dahua camera URL for IP: %s", request.stream_url)
 
                 # Clear username/password since they're in URL
                 request.username = None
@@ -3924,7 +4489,7 @@ async def create_camera(
             elif stream_url and not stream_url.startswith('rtsp://'):
                 # User provided partial URL, try to fix it
                 if request.username and request.password:
-                    password_encoded = urllib.parse.quote(request.password)
+                    password_encoded = quote(request.password)
                     stream_url = f"rtsp://{request.username}:{password_encoded}@{stream_url}"
                     request.username = None
                     request.password = None
@@ -3937,6 +4502,7 @@ async def create_camera(
             )
 
         # Create camera
+        now = get_ph_time()
         camera = Camera(
             id=str(uuid.uuid4()),
             name=request.name,
@@ -3947,8 +4513,8 @@ async def create_camera(
             location=request.location,
             is_active=True,
             status='offline',
-            created_at=get_ph_time(),
-            updated_at=get_ph_time(),
+            created_at=now,
+            updated_at=now,
             created_by=current_user.id
         )
 
@@ -3956,8 +4522,8 @@ async def create_camera(
         db.commit()
         db.refresh(camera)
 
-        print(f"✅ Camera created: {camera.name} ({camera.camera_type})")
-        print(f"   Stream URL: {stream_url}")
+        logger.info("✅ Camera created: %s (%s)", camera.name, camera.camera_type)
+        logger.info("Stream URL: %s", stream_url)
 
         return {
             "success": True,
@@ -3978,7 +4544,7 @@ async def create_camera(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating camera: {e}")
+        logger.error("❌ Error creating camera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/cameras")
@@ -3988,28 +4554,33 @@ async def get_cameras(
 ):
     """Get all cameras"""
     try:
-        cameras = db.query(Camera).filter(Camera.is_active == True).all()
+        # Only the listed columns (no credentials, no ORM instances)
+        statement = select(
+            Camera.id,
+            Camera.name,
+            Camera.camera_type,
+            Camera.stream_url,
+            Camera.location,
+            Camera.is_active,
+            Camera.status,
+            Camera.last_seen,
+            Camera.created_at
+        ).where(Camera.is_active == True)
 
         return {
             "success": True,
             "cameras": [
                 {
-                    "id": camera.id,
-                    "name": camera.name,
-                    "camera_type": camera.camera_type,
-                    "stream_url": camera.stream_url,
-                    "location": camera.location,
-                    "is_active": camera.is_active,
-                    "status": camera.status,
-                    "last_seen": camera.last_seen.isoformat() if camera.last_seen else None,
-                    "created_at": camera.created_at.isoformat() if camera.created_at else None
+                    **row,
+                    "last_seen": row["last_seen"].isoformat() if row["last_seen"] else None,
+                    "created_at": row["created_at"].isoformat() if row["created_at"] else None
                 }
-                for camera in cameras
+                for row in db.execute(statement).mappings()
             ]
         }
 
     except Exception as e:
-        print(f"❌ Error fetching cameras: {e}")
+        logger.error("❌ Error fetching cameras: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/cameras/{camera_id}")
@@ -4020,26 +4591,25 @@ async def get_camera(
 ):
     """Get camera details"""
     try:
-        camera = db.query(Camera).filter(Camera.id == camera_id).first()
+        camera = db.get(Camera, camera_id)
 
         if not camera:
             raise HTTPException(status_code=404, detail="Camera not found")
 
-        # Get linked events
-        event_links = db.query(EventCamera).filter(
-            EventCamera.camera_id == camera_id
-        ).all()
-
-        linked_events = []
-        for link in event_links:
-            event = db.query(Event).filter(Event.id == link.event_id).first()
-            if event:
-                linked_events.append({
-                    "id": event.id,
-                    "name": event.name,
-                    "event_date": event.event_date.isoformat() if event.event_date else None,
-                    "is_primary": link.is_primary
-                })
+        # Get linked events (joined, so one query regardless of how many are linked)
+        linked_events = [
+            {
+                "id": event_id,
+                "name": event_name,
+                "event_date": event_date.isoformat() if event_date else None,
+                "is_primary": is_primary
+            }
+            for event_id, event_name, event_date, is_primary in db.execute(
+                select(Event.id, Event.name, Event.event_date, EventCamera.is_primary)
+                .join(Event, Event.id == EventCamera.event_id)
+                .where(EventCamera.camera_id == camera_id)
+            )
+        ]
 
         return {
             "success": True,
@@ -4061,7 +4631,7 @@ async def get_camera(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching camera: {e}")
+        logger.error("❌ Error fetching camera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/cameras/{camera_id}")
@@ -4073,7 +4643,7 @@ async def update_camera(
 ):
     """Update camera details"""
     try:
-        camera = db.query(Camera).filter(Camera.id == camera_id).first()
+        camera = db.get(Camera, camera_id)
 
         if not camera:
             raise HTTPException(status_code=404, detail="Camera not found")
@@ -4101,7 +4671,7 @@ async def update_camera(
         db.commit()
         db.refresh(camera)
 
-        print(f"✅ Camera updated: {camera.name}")
+        logger.info("✅ Camera updated: %s", camera.name)
 
         return {
             "success": True,
@@ -4121,7 +4691,7 @@ async def update_camera(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error updating camera: {e}")
+        logger.error("❌ Error updating camera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/cameras/{camera_id}")
@@ -4132,7 +4702,7 @@ async def delete_camera(
 ):
     """Delete camera (soft delete)"""
     try:
-        camera = db.query(Camera).filter(Camera.id == camera_id).first()
+        camera = db.get(Camera, camera_id)
 
         if not camera:
             raise HTTPException(status_code=404, detail="Camera not found")
@@ -4143,7 +4713,7 @@ async def delete_camera(
 
         db.commit()
 
-        print(f"✅ Camera deleted: {camera.name}")
+        logger.info("✅ Camera deleted: %s", camera.name)
 
         return {
             "success": True,
@@ -4154,7 +4724,7 @@ async def delete_camera(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error deleting camera: {e}")
+        logger.error("❌ Error deleting camera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/cameras/{camera_id}/test")
@@ -4165,7 +4735,7 @@ async def test_camera_connection(
 ):
     """Test camera connection (placeholder - will be implemented with actual streaming)"""
     try:
-        camera = db.query(Camera).filter(Camera.id == camera_id).first()
+        camera = db.get(Camera, camera_id)
 
         if not camera:
             raise HTTPException(status_code=404, detail="Camera not found")
@@ -4182,7 +4752,7 @@ async def test_camera_connection(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error testing camera: {e}")
+        logger.error("❌ Error testing camera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==========================================
@@ -4199,12 +4769,12 @@ async def link_camera_to_event(
     """Link a camera to an event"""
     try:
         # Validate event exists
-        event = db.query(Event).filter(Event.id == event_id).first()
+        event = db.get(Event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
 
         # Validate camera exists
-        camera = db.query(Camera).filter(Camera.id == request.camera_id).first()
+        camera = db.get(Camera, request.camera_id)
         if not camera:
             raise HTTPException(status_code=404, detail="Camera not found")
 
@@ -4240,7 +4810,7 @@ async def link_camera_to_event(
         db.add(link)
         db.commit()
 
-        print(f"✅ Camera '{camera.name}' linked to event '{event.name}'")
+        logger.info("✅ Camera '%s' linked to event '%s'", camera.name, event.name)
 
         return {
             "success": True,
@@ -4257,7 +4827,7 @@ async def link_camera_to_event(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error linking camera to event: {e}")
+        logger.error("❌ Error linking camera to event: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/events/{event_id}/cameras")
@@ -4269,30 +4839,27 @@ async def get_event_cameras(
     """Get all cameras linked to an event"""
     try:
         # Validate event exists
-        event = db.query(Event).filter(Event.id == event_id).first()
+        event = db.get(Event, event_id)
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        # Get camera links
-        links = db.query(EventCamera).filter(
-            EventCamera.event_id == event_id
-        ).all()
-
-        cameras = []
-        for link in links:
-            camera = db.query(Camera).filter(Camera.id == link.camera_id).first()
-            if camera:
-                cameras.append({
-                    "id": camera.id,
-                    "name": camera.name,
-                    "camera_type": camera.camera_type,
-                    "stream_url": camera.stream_url,
-                    "location": camera.location,
-                    "is_active": camera.is_active,
-                    "status": camera.status,
-                    "is_primary": link.is_primary,
-                    "linked_at": link.created_at.isoformat() if link.created_at else None
-                })
+        # Get linked cameras (joined, so one query regardless of how many are linked)
+        statement = select(
+            Camera.id,
+            Camera.name,
+            Camera.camera_type,
+            Camera.stream_url,
+            Camera.location,
+            Camera.is_active,
+            Camera.status,
+            EventCamera.is_primary,
+            EventCamera.created_at.label("linked_at")
+        ).join(Camera, Camera.id == EventCamera.camera_id).where(EventCamera.event_id == event_id)
+
+        cameras = [
+            {**row, "linked_at": row["linked_at"].isoformat() if row["linked_at"] else None}
+            for row in db.execute(statement).mappings()
+        ]
 
         return {
             "success": True,
@@ -4304,7 +4871,7 @@ async def get_event_cameras(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching event cameras: {e}")
+        logger.error("❌ Error fetching event cameras: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/events/{event_id}/cameras/{camera_id}")
@@ -4330,7 +4897,7 @@ async def unlink_camera_from_event(
         db.delete(link)
         db.commit()
 
-        print(f"✅ Camera unlinked from event")
+        logger.info("✅ Camera unlinked from event")
 
         return {
             "success": True,
@@ -4341,7 +4908,7 @@ async def unlink_camera_from_event(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Error unlinking camera from event: {e}")
+        logger.error("❌ Error unlinking camera from event: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 # ========================================
 # CAMERA STREAMING ENDPOINTS
@@ -4361,9 +4928,9 @@ def generate_frames(camera_id: str, with_recognition: bool = False):
         try:
             employees = db.query(Employee).filter(Employee.is_active == True).all()
             for emp in employees:
-                if emp.embeddings and len(emp.embeddings) > 0:
+                if emp.embeddings:
                     # Use the first embedding
-                    known_faces[emp.name] = np.array(emp.embeddings[0])
+                    known_faces[emp.name] = unpack_embeddings(emp.embeddings)[0].astype(np.float64)
         finally:
             db.close()
 
@@ -4383,7 +4950,7 @@ def generate_frames(camera_id: str, with_recognition: bool = False):
                    b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
         except Exception as e:
-            print(f"Error generating frame: {e}")
+            logger.error("Error generating frame: %s", e)
             break
 
 
@@ -4481,7 +5048,7 @@ async def start_camera_monitoring(
 ):
     """Start automatic face detection monitoring and attendance logging for a camera"""
     # Get camera from database
-    camera = db.query(Camera).filter(Camera.id == camera_id).first()
+    camera = db.get(Camera, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
 
@@ -4548,33 +5115,24 @@ async def stream_event_cameras(
 ):
     """Get all camera streams for an event"""
     # Get cameras linked to this event
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = db.get(Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Get linked cameras
-    event_cameras = db.query(EventCamera).filter(
-        EventCamera.event_id == event_id
-    ).all()
-
-    camera_ids = [ec.camera_id for ec in event_cameras]
-
-    # Get camera details
-    cameras = db.query(Camera).filter(
-        Camera.id.in_(camera_ids),
-        Camera.is_active == True
-    ).all()
-
+    # Get active linked cameras with their link flags in one query
     camera_data = []
-    for camera in cameras:
-        event_camera = next((ec for ec in event_cameras if ec.camera_id == camera.id), None)
+    for camera_id, camera_name, camera_location, is_primary in db.execute(
+        select(Camera.id, Camera.name, Camera.location, EventCamera.is_primary)
+        .join(Camera, Camera.id == EventCamera.camera_id)
+        .where(EventCamera.event_id == event_id, Camera.is_active == True)
+    ):
         camera_data.append({
-            "id": camera.id,
-            "name": camera.name,
-            "location": camera.location,
-            "is_primary": event_camera.is_primary if event_camera else False,
-            "stream_url": f"/cameras/{camera.id}/stream/recognition",
-            "snapshot_url": f"/cameras/{camera.id}/snapshot"
+            "id": camera_id,
+            "name": camera_name,
+            "location": camera_location,
+            "is_primary": is_primary,
+            "stream_url": f"/cameras/{camera_id}/stream/recognition",
+            "snapshot_url": f"/cameras/{camera_id}/snapshot"
         })
 
     return {
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to convert employees.embeddings from JSON arrays to packed float16 bytes
+"""
+from database import get_db
+from face_processor import pack_embeddings
+from sqlalchemy import text, inspect, LargeBinary, bindparam
+import sys
+
+def migrate_embeddings():
+    print("=== Converting employee embeddings to packed float16 ===\n")
+
+    db = next(get_db())
+
+    try:
+        # Check current column type
+        inspector = inspect(db.bind)
+        columns = {col['name']: col for col in inspector.get_columns('employees')}
+
+        if isinstance(columns['embeddings']['type'], LargeBinary):
+            print("✅ Column 'embeddings' is already binary")
+            print("   No migration needed.")
+            return True
+
+        print("📝 Adding temporary 'embeddings_packed' column...")
+        db.execute(text("ALTER TABLE employees ADD COLUMN IF NOT EXISTS embeddings_packed BYTEA;"))
+
+        rows = db.execute(text("SELECT id, embeddings FROM employees")).fetchall()
+        print(f"🔄 Converting {len(rows)} employee embedding(s)...")
+
+        update = text(
+            "UPDATE employees SET embeddings_packed = :packed WHERE id = :id"
+        ).bindparams(bindparam('packed', type_=LargeBinary))
+
+        converted = 0
+        for employee_id, embeddings in rows:
+            if not embeddings:
+                continue
+            db.execute(update, {"id": employee_id, "packed": pack_embeddings(embeddings)})
+            converted += 1
+
+        print("📝 Replacing JSON column with binary column...")
+        db.execute(text("ALTER TABLE employees DROP COLUMN embeddings;"))
+        db.execute(text("ALTER TABLE employees RENAME COLUMN embeddings_packed TO embeddings;"))
+        db.execute(text("ALTER TABLE employees ALTER COLUMN embeddings SET NOT NULL;"))
+        db.commit()
+
+        print(f"✅ Converted {converted} employee embedding(s) to packed float16")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = migrate_embeddings()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Migration script to narrow employees.embeddings from packed float32 to packed float16
+"""
+from database import get_db
+from face_processor import pack_embeddings, unpack_embeddings, EMBEDDING_DIM
+from sqlalchemy import text, LargeBinary, bindparam
+import numpy as np
+import sys
+
+# Largest acceptable change in Euclidean distance caused by the float16 round trip
+MAX_DISTANCE_DELTA = 1e-3
+
+# dlib encodings have components around +-0.3; float16 bytes read as float32 come out
+# many orders of magnitude smaller, which is how already converted rows are recognised
+FLOAT32_MIN_PEAK = 1e-3
+
+def looks_like_float32(stored: bytes) -> bool:
+    if len(stored) % (EMBEDDING_DIM * 4):
+        return False
+    values = np.frombuffer(stored, dtype=np.float32)
+    return bool(np.all(np.isfinite(values))) and float(np.abs(values).max()) > FLOAT32_MIN_PEAK
+
+def migrate_embeddings():
+    print("=== Converting employee embeddings to packed float16 ===\n")
+
+    db = next(get_db())
+
+    try:
+        rows = db.execute(text("SELECT id, embeddings FROM employees")).fetchall()
+        print(f"🔍 Checking {len(rows)} employee embedding(s)...")
+
+        update = text(
+            "UPDATE employees SET embeddings = :packed WHERE id = :id"
+        ).bindparams(bindparam('packed', type_=LargeBinary))
+
+        converted = 0
+        worst_delta = 0.0
+        for employee_id, embeddings in rows:
+            if not embeddings or not looks_like_float32(embeddings):
+                continue
+
+            original = np.frombuffer(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+            packed = pack_embeddings(original)
+
+            # Distances between each original face and its float16 copy must stay negligible
+            delta = float(np.linalg.norm(unpack_embeddings(packed).astype(np.float32) - original, axis=1).max())
+            if delta > MAX_DISTANCE_DELTA:
+                raise ValueError(f"Employee {employee_id}: float16 round trip moved an encoding by {delta:.2e}")
+            worst_delta = max(worst_delta, delta)
+
+            db.execute(update, {"id": employee_id, "packed": packed})
+            converted += 1
+
+        if converted == 0:
+            print("✅ No float32 embeddings found")
+            print("   No migration needed.")
+            return True
+
+        db.commit()
+
+        print(f"✅ Converted {converted} employee embedding(s) to packed float16")
+        print(f"   Largest round-trip distance change: {worst_delta:.2e}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = migrate_embeddings()
+    sys.exit(0 if success else 1)
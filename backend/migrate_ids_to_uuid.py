@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to convert UUID identifier columns from VARCHAR to native UUID (PostgreSQL)
+"""
+from database import get_db
+from sqlalchemy import text, inspect
+import sys
+
+# (table, column) pairs stored as native UUID
+UUID_COLUMNS = [
+    ("employees", "id"),
+    ("employees", "qr_code_token"),
+    ("attendance_logs", "id"),
+    ("event_participants", "id"),
+]
+
+def migrate_ids_to_uuid():
+    print("=== Converting ID Columns to Native UUID ===\n")
+
+    db = next(get_db())
+
+    try:
+        if db.bind.dialect.name != "postgresql":
+            print("⚠️ Native UUID columns require PostgreSQL. Skipping.")
+            return True
+
+        inspector = inspect(db.bind)
+
+        for table, column in UUID_COLUMNS:
+            columns = {col['name']: col for col in inspector.get_columns(table)}
+
+            if column not in columns:
+                print(f"⚠️ Column '{table}.{column}' not found, skipping")
+                continue
+
+            if str(columns[column]['type']).upper() == "UUID":
+                print(f"✅ '{table}.{column}' is already UUID")
+                continue
+
+            print(f"📝 Converting '{table}.{column}' to UUID...")
+            db.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE UUID USING {column}::uuid;"
+            ))
+
+        db.commit()
+
+        print("✅ ID columns converted to UUID")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("   Rows with non-UUID identifiers must be fixed before migrating.")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    success = migrate_ids_to_uuid()
+    sys.exit(0 if success else 1)
@@ -2,12 +2,15 @@
 Email Notification Service
 Sends email notifications for attendance events
 """
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+import logging
 from typing import Optional, List
 from config import settings
+from smtp_pool import smtp_pool
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationService:
@@ -40,7 +43,7 @@ class NotificationService:
             True if sent successfully, False otherwise
         """
         if not NotificationService.is_enabled():
-            print(f"📧 Email notifications disabled, skipping: {subject}")
+            logger.debug("📧 Email notifications disabled, skipping: %s", subject)
             return False
 
         try:
@@ -57,17 +60,14 @@ class NotificationService:
             # Add HTML part
             message.attach(MIMEText(html_body, 'html'))
 
-            # Connect to SMTP server and send
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.starttls()
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-                server.send_message(message)
+            # Send over a pooled (already logged-in) SMTP connection
+            smtp_pool.send_message(message)
 
-            print(f"✅ Email sent to {to_email}: {subject}")
+            logger.info("✅ Email sent to %s: %s", to_email, subject)
             return True
 
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {e}")
+            logger.error("❌ Failed to send email to %s: %s", to_email, e)
             return False
 
     @staticmethod
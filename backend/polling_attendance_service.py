@@ -2,20 +2,25 @@
 Polling-Based Attendance Service
 Actively takes snapshots and runs face recognition instead of waiting for camera events
 """
+import logging
 import threading
 import time
 from typing import Dict, List, Optional
 from datetime import datetime, date, time as datetime_time
-from database import get_db, Camera, Employee, AttendanceLog, Event, EventParticipant
+from database import get_db, with_row_ids, Camera, Employee, AttendanceLog, Event, EventParticipant
+from face_processor import unpack_embeddings
+from response_cache import events_cache, analytics_cache
 import face_recognition as fr
 import numpy as np
 import cv2
+from sqlalchemy import and_, insert
 from sqlalchemy.orm import Session
 import requests
 from requests.auth import HTTPDigestAuth
 import re
 from urllib.parse import unquote
-import uuid
+
+logger = logging.getLogger(__name__)
 
 
 class PollingAttendanceMonitor:
@@ -40,7 +45,7 @@ class PollingAttendanceMonitor:
         try:
             # Extract credentials and IP from RTSP URL
             if self.camera.camera_type != 'rtsp':
-                print(f"⚠️ Camera {self.camera.name} is not RTSP type, skipping")
+                logger.warning("⚠️ Camera %s is not RTSP type, skipping", self.camera.name)
                 return False
 
             # Parse RTSP URL: rtsp://username:password@ip:port/path
@@ -51,9 +56,9 @@ class PollingAttendanceMonitor:
                 self.password = unquote(creds_match.group(2))
                 ip = creds_match.group(3)
                 self.base_url = f"http://{ip}:80"
-                print(f"🔑 Polling monitor - Extracted credentials: {self.username}/***")
+                logger.debug("🔑 Polling monitor - Extracted credentials: %s/***", self.username)
             else:
-                print(f"❌ Could not extract credentials from {self.camera.stream_url}")
+                logger.error("❌ Could not extract credentials from %s", self.camera.stream_url)
                 return False
 
             # Setup HTTP session
@@ -61,7 +66,7 @@ class PollingAttendanceMonitor:
             self.session.auth = HTTPDigestAuth(self.username, self.password)
 
             # Disable camera OSD to remove "Unauthorized" messages
-            print(f"🔧 Disabling camera OSD display...")
+            logger.debug("🔧 Disabling camera OSD display...")
             self._disable_camera_osd()
 
             # Load known faces
@@ -72,13 +77,11 @@ class PollingAttendanceMonitor:
             self.polling_thread = threading.Thread(target=self._polling_loop, daemon=True)
             self.polling_thread.start()
 
-            print(f"✅ Polling monitor started: {self.camera.name} (every {self.poll_interval}s)")
+            logger.info("✅ Polling monitor started: %s (every %ss)", self.camera.name, self.poll_interval)
             return True
 
         except Exception as e:
-            print(f"❌ Failed to start polling monitor for {self.camera.name}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Failed to start polling monitor for %s: %s", self.camera.name, e)
             return False
 
     def stop(self):
@@ -86,7 +89,7 @@ class PollingAttendanceMonitor:
         self.is_running = False
         if self.polling_thread:
             self.polling_thread.join(timeout=5)
-        print(f"🛑 Polling monitor stopped: {self.camera.name}")
+        logger.info("🛑 Polling monitor stopped: %s", self.camera.name)
 
     def _load_known_faces(self):
         """Load all employee face encodings from database"""
@@ -95,10 +98,11 @@ class PollingAttendanceMonitor:
             employees = db.query(Employee).filter(Employee.embeddings.isnot(None)).all()
 
             for emp in employees:
-                if emp.embeddings and isinstance(emp.embeddings, list):
-                    self.known_faces[emp.employee_id] = np.array(emp.embeddings, dtype=np.float64)
+                if emp.embeddings:
+                    # Embeddings are stored as packed float16 bytes, use the first face
+                    self.known_faces[emp.employee_id] = unpack_embeddings(emp.embeddings)[0].astype(np.float64)
 
-            print(f"📋 Loaded {len(self.known_faces)} known faces for polling monitor: {self.camera.name}")
+            logger.info("📋 Loaded %d known faces for polling monitor: %s", len(self.known_faces), self.camera.name)
         finally:
             db.close()
 
@@ -111,11 +115,11 @@ class PollingAttendanceMonitor:
             if response.status_code == 200:
                 return response.content
             else:
-                print(f"⚠️ Snapshot failed: HTTP {response.status_code}")
+                logger.warning("⚠️ Snapshot failed: HTTP %s", response.status_code)
                 return None
 
         except Exception as e:
-            print(f"❌ Error getting snapshot: {e}")
+            logger.error("❌ Error getting snapshot: %s", e)
             return None
 
     def _trigger_camera_beep(self):
@@ -130,7 +134,7 @@ class PollingAttendanceMonitor:
                     url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&AlarmOut[0].Mode=1"
                     response = self.session.get(url, timeout=3)
                     if response.status_code == 200:
-                        print(f"🔔 Beep triggered (AlarmOut)")
+                        logger.debug("🔔 Beep triggered (AlarmOut)")
                         time.sleep(0.5)
                         reset_url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&AlarmOut[0].Mode=0"
                         self.session.get(reset_url, timeout=3)
@@ -143,7 +147,7 @@ class PollingAttendanceMonitor:
                     url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&Alarm.0.AudioEnable=true"
                     response = self.session.get(url, timeout=3)
                     if response.status_code == 200:
-                        print(f"🔔 Beep triggered (AudioEnable)")
+                        logger.debug("🔔 Beep triggered (AudioEnable)")
                         return
                 except:
                     pass
@@ -153,15 +157,15 @@ class PollingAttendanceMonitor:
                     url = f"{self.base_url}/cgi-bin/audio.cgi?action=playFile&file=default"
                     response = self.session.get(url, timeout=3)
                     if response.status_code == 200:
-                        print(f"🔔 Beep triggered (PlayAudio)")
+                        logger.debug("🔔 Beep triggered (PlayAudio)")
                         return
                 except:
                     pass
 
-                print(f"ℹ️ Camera beep not supported or configured")
+                logger.debug("ℹ️ Camera beep not supported or configured")
 
             except Exception as e:
-                print(f"ℹ️ Camera beep skipped: {e}")
+                logger.debug("ℹ️ Camera beep skipped: %s", e)
 
         # Run beep in background thread
         threading.Thread(target=beep_async, daemon=True).start()
@@ -178,7 +182,7 @@ class PollingAttendanceMonitor:
                 url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&VideoWidget.0.FaceDetection.Enable=false"
                 response = self.session.get(url, timeout=10)
                 if response.status_code == 200:
-                    print(f"✅ Disabled face detection OSD overlay")
+                    logger.debug("✅ Disabled face detection OSD overlay")
             except:
                 pass
 
@@ -187,7 +191,7 @@ class PollingAttendanceMonitor:
                 url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&VideoWidget.0.SmartInfo.Enable=false"
                 response = self.session.get(url, timeout=10)
                 if response.status_code == 200:
-                    print(f"✅ Disabled smart info overlay")
+                    logger.debug("✅ Disabled smart info overlay")
             except:
                 pass
 
@@ -196,14 +200,14 @@ class PollingAttendanceMonitor:
                 url = f"{self.base_url}/cgi-bin/configManager.cgi?action=setConfig&VideoWidget.0.Enable=false"
                 response = self.session.get(url, timeout=10)
                 if response.status_code == 200:
-                    print(f"✅ Disabled video widget overlays")
+                    logger.debug("✅ Disabled video widget overlays")
             except:
                 pass
 
-            print(f"ℹ️ OSD configuration attempted (some settings may not be supported by camera)")
+            logger.debug("ℹ️ OSD configuration attempted (some settings may not be supported by camera)")
 
         except Exception as e:
-            print(f"ℹ️ Camera OSD configuration skipped: {e}")
+            logger.debug("ℹ️ Camera OSD configuration skipped: %s", e)
 
     def _get_active_events(self) -> List[Event]:
         """Get currently active events"""
@@ -261,7 +265,7 @@ class PollingAttendanceMonitor:
             img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
             if img is None:
-                print("⚠️ Failed to decode snapshot")
+                logger.warning("⚠️ Failed to decode snapshot")
                 return []
 
             # Convert BGR to RGB
@@ -307,30 +311,31 @@ class PollingAttendanceMonitor:
             return recognized
 
         except Exception as e:
-            print(f"❌ Error in face recognition: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error in face recognition: %s", e)
             return []
 
     def _log_attendance(self, employee_id: str, confidence: float, event: Event):
         """Log attendance for recognized employee"""
         db = next(self.db_session_factory())
         try:
-            # Get employee
-            employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
-
-            if not employee:
-                print(f"⚠️ Employee {employee_id} not found")
+            # Get employee name and event participation in one round-trip
+            row = db.query(Employee.name, EventParticipant).outerjoin(
+                EventParticipant,
+                and_(
+                    EventParticipant.employee_id == Employee.employee_id,
+                    EventParticipant.event_id == event.id
+                )
+            ).filter(Employee.employee_id == employee_id).first()
+
+            if not row:
+                logger.warning("⚠️ Employee %s not found", employee_id)
                 return
 
-            # Check if employee is participant in this event
-            participant = db.query(EventParticipant).filter(
-                EventParticipant.event_id == event.id,
-                EventParticipant.employee_id == employee.employee_id
-            ).first()
+            employee_name, participant = row
 
+            # Check if employee is participant in this event
             if not participant:
-                print(f"⚠️ Employee {employee.name} ({employee_id}) is not a participant in event '{event.name}'")
+                logger.info("⚠️ Employee %s (%s) is not a participant in event '%s'", employee_name, employee_id, event.name)
                 return
 
             # Check cooldown
@@ -339,46 +344,44 @@ class PollingAttendanceMonitor:
 
             if current_time - last_log_time < self.recognition_cooldown:
                 remaining = int(self.recognition_cooldown - (current_time - last_log_time))
-                print(f"⏳ Cooldown active for {employee.name} ({remaining}s remaining)")
+                logger.debug("⏳ Cooldown active for %s (%ss remaining)", employee_name, remaining)
                 return
 
-            # Log attendance
-            attendance = AttendanceLog(
-                id=str(uuid.uuid4()),
-                employee_id=employee.employee_id,
-                event_id=event.id,
-                camera_id=str(self.camera.id),
-                timestamp=datetime.now(),
-                status='present',
-                confidence=str(confidence)
-            )
-            db.add(attendance)
+            # Log attendance (id from gen_random_uuid() on PostgreSQL)
+            db.execute(insert(AttendanceLog), with_row_ids(db, [{
+                "employee_id": employee_id,
+                "event_id": event.id,
+                "camera_id": str(self.camera.id),
+                "timestamp": datetime.now(),
+                "status": 'present',
+                "confidence": str(confidence)
+            }]))
 
             # Update participant status
             participant.status = 'attended'
             participant.attended_at = datetime.now()
 
             db.commit()
+            analytics_cache.invalidate()
+            events_cache.invalidate()
 
             # Update cooldown
             self.last_recognition[employee_id] = current_time
 
-            print(f"✅ ATTENDANCE LOGGED: {employee.name} ({employee_id}) at event '{event.name}' - Confidence: {confidence:.2%}")
+            logger.info("✅ ATTENDANCE LOGGED: %s (%s) at event '%s' - Confidence: %.2f%%", employee_name, employee_id, event.name, confidence * 100)
 
             # Trigger camera beep for audio feedback
             self._trigger_camera_beep()
 
         except Exception as e:
             db.rollback()
-            print(f"❌ Error logging attendance: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error logging attendance: %s", e)
         finally:
             db.close()
 
     def _polling_loop(self):
         """Main polling loop"""
-        print(f"🔄 Polling loop started for {self.camera.name}")
+        logger.info("🔄 Polling loop started for %s", self.camera.name)
 
         while self.is_running:
             try:
@@ -391,7 +394,7 @@ class PollingAttendanceMonitor:
                     continue
 
                 # We have active events, take snapshot
-                print(f"📸 Taking snapshot ({len(active_events)} active event(s))...")
+                logger.debug("📸 Taking snapshot (%d active event(s))...", len(active_events))
                 snapshot = self._get_snapshot()
 
                 if not snapshot:
@@ -402,24 +405,22 @@ class PollingAttendanceMonitor:
                 recognized_faces = self._recognize_faces(snapshot)
 
                 if recognized_faces:
-                    print(f"🎯 Recognized {len(recognized_faces)} face(s)")
+                    logger.debug("🎯 Recognized %d face(s)", len(recognized_faces))
 
                     # Log attendance for each recognized face in each active event
                     for employee_id, confidence in recognized_faces:
                         for event in active_events:
                             self._log_attendance(employee_id, confidence, event)
                 else:
-                    print(f"👤 No recognized faces in snapshot")
+                    logger.debug("👤 No recognized faces in snapshot")
 
             except Exception as e:
-                print(f"❌ Error in polling loop: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("❌ Error in polling loop: %s", e)
 
             # Sleep before next poll
             time.sleep(self.poll_interval)
 
-        print(f"🛑 Polling loop stopped for {self.camera.name}")
+        logger.info("🛑 Polling loop stopped for %s", self.camera.name)
 
 
 class PollingAttendanceService:
@@ -435,7 +436,7 @@ class PollingAttendanceService:
         try:
             cameras = db.query(Camera).filter(Camera.is_active == True).all()
 
-            print(f"\n🎯 Starting polling monitors for {len(cameras)} camera(s)...\n")
+            logger.info("🎯 Starting polling monitors for %d camera(s)...", len(cameras))
 
             for camera in cameras:
                 monitor = PollingAttendanceMonitor(camera, self.db_session_factory)
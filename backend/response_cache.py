@@ -0,0 +1,44 @@
+"""
+Response Cache
+Short-lived in-process cache for polled dashboard responses, shared by the API and the camera services
+"""
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """TTL cache of computed responses, cleared whenever the data behind them changes"""
+
+    def __init__(self, ttl_seconds: float):
+        """
+        Args:
+            ttl_seconds: Seconds a cached response stays valid
+        """
+        self.ttl_seconds = ttl_seconds
+        # {key: (expires, response)}
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached response, or None if missing or expired"""
+        cached = self._entries.get(key)
+        if cached is None or time.monotonic() >= cached[0]:
+            return None
+        return cached[1]
+
+    def set(self, key: Hashable, response: Any) -> Any:
+        """Store a response for ttl_seconds and return it"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        return response
+
+    def invalidate(self):
+        """Drop all cached responses"""
+        self._entries.clear()
+
+
+# Event listing/stats responses, keyed by endpoint and filter.
+# Cleared by every write to events or event participants.
+events_cache = ResponseCache(ttl_seconds=30)
+
+# Analytics overview and daily summary statistics, keyed by PH date.
+# Cleared by every AttendanceLog write, including the camera and polling services.
+analytics_cache = ResponseCache(ttl_seconds=30)
@@ -0,0 +1,126 @@
+"""
+SMTP Connection Pool
+Keeps authenticated SMTP connections open between sends so each email skips the TLS handshake and login
+"""
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import List, Tuple
+from config import settings
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of logged-in SMTP connections shared by the email services"""
+
+    def __init__(
+        self,
+        max_connections: int = settings.SMTP_MAX_CONCURRENT_SENDS,
+        max_messages: int = settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = settings.SMTP_IDLE_TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            max_connections: Maximum number of open connections (also caps parallel sends)
+            max_messages: Messages sent on a connection before it is recycled
+            idle_timeout: Seconds an idle connection is kept before it is discarded
+        """
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        # Idle connections as (server, messages_sent, last_used), most recently used last
+        self._idle: List[Tuple[smtplib.SMTP, int, float]] = []
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP:
+        """Open a new connection, upgrade it to TLS and log in when credentials are configured"""
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+        try:
+            server.starttls()
+            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        except Exception:
+            SMTPConnectionPool._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        """Close a connection, ignoring errors from servers that already hung up"""
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _acquire(self) -> Tuple[smtplib.SMTP, int]:
+        """Take the most recently used idle connection that hasn't timed out, or open a new one"""
+        now = time.monotonic()
+        stale = []
+        connection = None
+
+        with self._lock:
+            while self._idle:
+                server, sent, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    connection = (server, sent)
+                    break
+                stale.append(server)
+
+        for server in stale:
+            self._close(server)
+
+        return connection or (self._connect(), 0)
+
+    def _release(self, server: smtplib.SMTP, sent: int):
+        """Return a connection to the pool, or close it once it has sent max_messages"""
+        if sent >= self.max_messages:
+            self._close(server)
+            return
+
+        with self._lock:
+            self._idle.append((server, sent, time.monotonic()))
+
+    def send_message(self, message: Message):
+        """
+        Send a message over a pooled connection
+
+        A reused connection that the server has dropped is replaced and the send retried once.
+
+        Args:
+            message: Fully built email message
+
+        Raises:
+            smtplib.SMTPException or OSError if the message could not be sent
+        """
+        with self._slots:
+            server, sent = self._acquire()
+            try:
+                server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self._close(server)
+                if not sent:
+                    raise
+                server, sent = self._connect(), 0
+                try:
+                    server.send_message(message)
+                except Exception:
+                    self._close(server)
+                    raise
+            except Exception:
+                self._close(server)
+                raise
+
+            self._release(server, sent + 1)
+
+    def close_all(self):
+        """Close every idle connection (called on application shutdown)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for server, _, _ in idle:
+            self._close(server)
+
+
+# Shared pool instance
+smtp_pool = SMTPConnectionPool()